@@ -0,0 +1,167 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+import yaml
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, "src"))
+
+from benchmarks.synthetic import SCALES, write_sources
+from data_ingestion import ingest_data
+from data_transformation import transform_data
+from data_validation import validate_data
+from analysis import run_analysis
+
+BASELINES = os.path.join(ROOT, "benchmarks", "baselines.json")
+DATA_DIR = os.path.join(ROOT, "benchmarks", ".data")
+CONFIG_PATH = os.path.join(ROOT, "config", "pipeline_config.yaml")
+
+# Tolerancia por defecto (fracción) y holgura absoluta mínima: en escalas
+# pequeñas unas décimas de segundo de ruido del runner no son regresiones
+DEFAULT_TOLERANCE = 0.5
+MIN_SLACK_S = 0.1
+DEFAULT_REPEAT = 3
+
+
+def _timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def run_scale(scale: str, data_dir: str = DATA_DIR, seed: int = 0,
+              config_path: str = CONFIG_PATH) -> dict:
+    """Genera (o reutiliza) los datos sintéticos de `scale` y mide cada
+    etapa por separado. Devuelve `{etapa: segundos}`."""
+    scale_dir = os.path.join(data_dir, scale)
+    steam_file, twitch_file = write_sources(os.path.join(scale_dir, "input"),
+                                            SCALES[scale], seed)
+
+    # Misma configuración del proyecto, con salidas dentro del directorio
+    # de la escala
+    with open(config_path, "r", encoding="utf-8") as fh:
+        cfg = yaml.safe_load(fh)
+    cfg.setdefault("paths", {}).update(
+        raw_data=os.path.join(scale_dir, "raw") + "/",
+        processed_data=os.path.join(scale_dir, "processed") + "/")
+    bench_config = os.path.join(scale_dir, "config.yaml")
+    with open(bench_config, "w", encoding="utf-8") as fh:
+        yaml.safe_dump(cfg, fh)
+
+    timings = {}
+    timings["ingest_data"], (steam_df, twitch_df) = _timed(
+        ingest_data, steam_file, twitch_file, config_path=bench_config)
+    timings["transform_data"], merged = _timed(
+        transform_data, steam_df, twitch_df, config_path=bench_config)
+    del steam_df, twitch_df
+    timings["validate_data"], _ = _timed(validate_data, merged)
+    timings["run_analysis"], _ = _timed(run_analysis, merged, config_path=bench_config,
+                                        force=True)
+    return {k: round(v, 4) for k, v in timings.items()}
+
+
+def machine_info() -> dict:
+    """Rasgos de la máquina que condicionan los tiempos. Una línea base sólo
+    es comparable en una máquina con los mismos valores."""
+    return {"system": platform.system(), "arch": platform.machine(),
+            "cpus": os.cpu_count(),
+            "python": ".".join(platform.python_version_tuple()[:2])}
+
+
+def baseline_problems(results: dict, baselines: dict, machine: dict) -> list:
+    """Motivos por los que `results` no se puede comparar con `baselines`:
+    línea base inexistente, de otra máquina o sin alguna escala o etapa."""
+    if not baselines:
+        return [f"No hay línea base ({BASELINES})."]
+    if baselines.get("machine") != machine:
+        return [f"La línea base es de otra máquina ({baselines.get('machine')}); "
+                f"esta es {machine}."]
+    problems = []
+    for scale, stages in results.items():
+        known = baselines.get("scales", {}).get(scale, {})
+        missing = [stage for stage in stages if stage not in known]
+        if missing:
+            problems.append(f"Sin línea base para {scale}: {', '.join(missing)}.")
+    return problems
+
+
+def compare(results: dict, baselines: dict, tolerance: float,
+            min_slack: float = MIN_SLACK_S) -> list:
+    """Etapas más lentas que su línea base por encima de `tolerance`
+    (0.5 = 50 % más lento) y de `min_slack` segundos."""
+    regressions = []
+    for scale, stages in results.items():
+        for stage, seconds in stages.items():
+            base = baselines.get("scales", {}).get(scale, {}).get(stage)
+            if base and seconds > max(base * (1 + tolerance), base + min_slack):
+                regressions.append((scale, stage, base, seconds))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Mide las etapas del pipeline con datos sintéticos.")
+    parser.add_argument("--scales", nargs="+", default=["10k"], choices=list(SCALES))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="fracción de lentitud tolerada respecto a la línea base")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT,
+                        help="mediciones por escala; se toma el mínimo de cada etapa")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="guarda los tiempos medidos como nueva línea base")
+    parser.add_argument("--strict", action="store_true",
+                        help="falla también si no hay una línea base comparable")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for scale in args.scales:
+        print(f"Escala {scale} ({SCALES[scale]:,} filas)...")
+        # El mínimo de varias mediciones es lo menos sensible al ruido
+        runs = [run_scale(scale, args.data_dir, args.seed) for _ in range(max(1, args.repeat))]
+        results[scale] = {stage: min(r[stage] for r in runs) for stage in runs[0]}
+        for stage, seconds in results[scale].items():
+            print(f"  {stage:<16}{seconds:>10.3f}s")
+
+    baselines = {}
+    if os.path.exists(BASELINES):
+        with open(BASELINES, "r", encoding="utf-8") as fh:
+            baselines = json.load(fh)
+    machine = machine_info()
+
+    if args.update_baseline:
+        # Los tiempos de otra máquina no sirven de referencia: se reemplazan
+        if baselines.get("machine") != machine:
+            baselines = {"machine": machine, "scales": {}}
+        baselines["scales"].update(results)
+        with open(BASELINES, "w", encoding="utf-8") as fh:
+            json.dump(baselines, fh, indent=2)
+        print("✔ Línea base actualizada:", BASELINES)
+        return 0
+
+    # Sin una línea base comparable no se puede afirmar que no haya
+    # regresiones: se avisa (y con --strict se falla)
+    problems = baseline_problems(results, baselines, machine)
+    if problems:
+        for problem in problems:
+            print("⚠", problem)
+        # Anotación visible en el resumen de GitHub Actions
+        print("::warning::Benchmarks sin comparar: no hay línea base para esta máquina. "
+              "Genérala con --update-baseline (workflow_dispatch en el CI).")
+        return 2 if args.strict else 0
+
+    regressions = compare(results, baselines, args.tolerance)
+    for scale, stage, base, seconds in regressions:
+        print(f"✘ Regresión en {stage} ({scale}): {seconds:.3f}s vs {base:.3f}s de base")
+    if not regressions:
+        print("✔ Sin regresiones respecto a la línea base.")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+import os
+import numpy as np
+import pandas as pd
+
+
+SCALES = {
+    "10k": 10_000,
+    "1m": 1_000_000,
+    "10m": 10_000_000,
+}
+
+# Géneros de la tienda; incluye uno con apóstrofo para cubrir el caso en
+# que Python serializa el texto entre comillas dobles
+GENRES = [
+    ("1", "Action"), ("25", "Adventure"), ("23", "Indie"), ("4", "Casual"),
+    ("2", "Strategy"), ("3", "RPG"), ("28", "Simulation"), ("9", "Racing"),
+    ("18", "Sports"), ("29", "Massively Multiplayer"), ("37", "Free to Play"),
+    ("70", "Early Access"), ("99", "Hack 'n' Slash"),
+]
+CURRENCIES = ["USD", "EUR", "GBP", "BRL"]
+MONTHS = 24
+CHUNK_ROWS = 250_000
+
+# Generadores deterministas con el formato de los CSV reales de Steam y
+# Twitch (disponibles sólo vía Git LFS): con la misma semilla y escala
+# siempre producen exactamente el mismo contenido.
+
+
+def _genre_entries():
+    out = []
+    for gid, desc in GENRES:
+        quoted = f'"{desc}"' if "'" in desc else f"'{desc}'"
+        out.append(f"{{'id': '{gid}', 'description': {quoted}}}")
+    return np.array(out, dtype=object)
+
+
+def steam_name(ids: np.ndarray) -> pd.Series:
+    """Nombre del juego de Steam con identificador `ids`."""
+    return "Game " + pd.Series(ids).astype(str)
+
+
+def make_steam(n: int, seed: int = 0, start: int = 0) -> pd.DataFrame:
+    """Filas `start` ... `start + n` del catálogo sintético de Steam."""
+    rng = np.random.default_rng([seed, 0, start])
+    ids = np.arange(start, start + n)
+    entries = _genre_entries()
+
+    first = rng.integers(0, len(entries), n)
+    second = rng.integers(0, len(entries), n)
+    has_two = rng.random(n) < 0.5
+    genres = pd.Series("[" + entries[first]) + np.where(has_two, ", " + entries[second], "") + "]"
+    genres[rng.random(n) < 0.02] = np.nan
+
+    is_free = rng.random(n) < 0.1
+    initial = rng.choice([99, 499, 999, 1499, 1999, 2999, 5999], n)
+    discount = np.where(rng.random(n) < 0.2, rng.choice([10, 25, 50, 75], n), 0)
+    final = (initial * (100 - discount)) // 100
+    currency = np.array(CURRENCIES, dtype=object)[rng.integers(0, len(CURRENCIES), n)]
+    price = pd.Series(
+        "{'currency': '" + currency + "', 'initial': " + initial.astype(str)
+        + ", 'final': " + final.astype(str).astype(object)
+        + ", 'discount_percent': " + discount.astype(str).astype(object)
+        + ", 'initial_formatted': '', 'final_formatted': '$"
+        + (final / 100).round(2).astype(str).astype(object) + "'}"
+    )
+    price[is_free] = np.nan
+
+    years = rng.integers(2006, 2020, n).astype(str).astype(object)
+    days = rng.integers(1, 29, n).astype(str).astype(object)
+    release = "{'coming_soon': False, 'date': '" + days + " Jul, " + years + "'}"
+
+    return pd.DataFrame({
+        "type": "game",
+        "name": steam_name(ids),
+        "steam_appid": ids + 10,
+        "required_age": 0,
+        "is_free": is_free,
+        "detailed_description": np.where(ids % 50 == 0,
+                                         "Línea uno\n\"Línea\" dos, con coma", "Descripción"),
+        "price_overview": price,
+        "genres": genres,
+        "release_date": pd.Series(release),
+    })
+
+
+def make_twitch(n: int, steam_rows: int, seed: int = 0) -> pd.DataFrame:
+    """`n` filas mensuales de Twitch (`MONTHS` meses por juego). El 70 % de
+    los juegos existe en el catálogo sintético de Steam de `steam_rows`."""
+    rng = np.random.default_rng([seed, 1, 0])
+    n_games = max(1, n // MONTHS)
+    in_steam = rng.random(n_games) < 0.7
+    steam_ids = rng.choice(steam_rows, n_games, replace=n_games > steam_rows)
+    names = np.where(in_steam, steam_name(steam_ids).to_numpy(),
+                     ("Twitch Only " + pd.Series(np.arange(n_games)).astype(str)).to_numpy())
+
+    game = np.resize(np.arange(n_games), n)
+    period = np.arange(n) // n_games
+    hours = rng.lognormal(10, 2, n).round().astype(np.int64)
+    streamed = (hours / rng.uniform(5, 50, n)).round().astype(np.int64)
+    avg_viewers = (hours / 720).round().astype(np.int64)
+    avg_channels = np.maximum(1, (streamed / 720).round().astype(np.int64))
+    return pd.DataFrame({
+        "Rank": np.arange(n) % 200 + 1,
+        "Game": names[game],
+        "Month": period % 12 + 1,
+        "Year": 2016 + period // 12,
+        "Hours_watched": hours,
+        "Hours_streamed": streamed,
+        "Peak_viewers": avg_viewers * rng.integers(2, 10, n),
+        "Peak_channels": avg_channels * rng.integers(2, 10, n),
+        "Streamers": avg_channels * rng.integers(5, 50, n),
+        "Avg_viewers": avg_viewers,
+        "Avg_channels": avg_channels,
+        "Avg_viewer_ratio": (avg_viewers / avg_channels).round(2),
+    })
+
+
+def write_sources(out_dir: str, rows: int, seed: int = 0):
+    """Escribe `steam_app_data.csv` y `Twitch_game_data.csv` con `rows` filas
+    cada uno (Steam por bloques, para no tener todo en memoria). Devuelve
+    las rutas `(steam, twitch)`; si ya existen para la misma escala y
+    semilla se reutilizan."""
+    os.makedirs(out_dir, exist_ok=True)
+    steam_file = os.path.join(out_dir, "steam_app_data.csv")
+    twitch_file = os.path.join(out_dir, "Twitch_game_data.csv")
+    marker = os.path.join(out_dir, ".generated")
+    stamp = f"{rows}:{seed}"
+    if os.path.exists(marker):
+        with open(marker) as fh:
+            if fh.read() == stamp:
+                return steam_file, twitch_file
+
+    for start in range(0, rows, CHUNK_ROWS):
+        chunk = make_steam(min(CHUNK_ROWS, rows - start), seed, start)
+        chunk.to_csv(steam_file, index=False, encoding="latin1",
+                     mode="w" if start == 0 else "a", header=(start == 0))
+    make_twitch(rows, rows, seed).to_csv(twitch_file, index=False, encoding="latin1")
+
+    with open(marker, "w") as fh:
+        fh.write(stamp)
+    return steam_file, twitch_file
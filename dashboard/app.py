@@ -1,7 +1,7 @@
 import streamlit as st
 import pandas as pd
-import unidecode
 import plotly.express as px
+from data_access import cube_for, cube_mean, load_genre_cube, load_top_games
 
 st.set_page_config(page_title="Steam + Twitch Dashboard", layout="wide")
 
@@ -10,65 +10,12 @@ st.sidebar.success("Selecciona un análisis o aplica filtros.")
 
 
 # -----------------------------------------------------------
-# CARGA DE DATOS + LIMPIEZA
+# CARGA DE DATOS
 # -----------------------------------------------------------
-@st.cache_data
-def load_data():
-
-    df = pd.read_csv(
-        r"C:\Users\kimbo\Downloads\merged_data.csv",
-        low_memory=False,
-        encoding="latin1"
-    )
-
-    # Normalizar texto
-    df["game"] = df["game"].astype(str).str.lower()
-
-    # Normalizar género según tu lista final
-    def normalize_genre(g):
-        if not isinstance(g, str):
-            return "Desconocido"
-
-        g_clean = unidecode.unidecode(g).lower().strip()
-
-        mapper = {
-            "accion": "Acción",
-            "akcji": "Acción",
-            "casual": "Casual",
-            "rpg": "RPG",
-            "indie": "Indie",
-            "mmo": "MMO",
-            "avent": "Aventura",
-            "przyg": "Aventura",
-            "abente": "Aventura",
-            "estrateg": "Estrategia",
-            "sport": "Deportes",
-            "simu": "Simulación",
-            "race": "Carreras",
-            "adult": "Contenido Adulto",
-            "access": "Acceso Anticipado",
-            "early": "Acceso Anticipado"
-        }
-
-        for key, value in mapper.items():
-            if key in g_clean:
-                return value
-
-        return "Acción"
-
-    df["genre"] = df["genre"].apply(normalize_genre)
-
-    # columnas numéricas
-    for col in [
-        "hours_watched", "hours_streamed", "avg_viewers",
-        "avg_channels", "peak_viewers", "price"
-    ]:
-        df[col] = pd.to_numeric(df[col], errors="coerce")
-
-    return df
-
-
-df = load_data()
+# Agregados por género precalculados por el pipeline: los KPIs y el gráfico
+# no recorren las filas del dataset (ver dashboard/data_access.py)
+cube = load_genre_cube()
+top_games = load_top_games()
 
 
 # -----------------------------------------------------------
@@ -76,10 +23,10 @@ df = load_data()
 # -----------------------------------------------------------
 st.sidebar.header("Filtros")
 
-genres = sorted(df["genre"].dropna().unique())
+genres = sorted(cube["genre"].dropna().unique())
 selected = st.sidebar.multiselect("Filtrar por género", genres)
 
-df_filtered = df[df["genre"].isin(selected)] if selected else df.copy()
+cube_filtered = cube_for(cube, selected)
 
 
 # -----------------------------------------------------------
@@ -89,9 +36,9 @@ st.subheader("Indicadores generales")
 
 col1, col2, col3 = st.columns(3)
 
-col1.metric("Juegos Totales", len(df_filtered))
-col2.metric("Horas vistas promedio", f"{df_filtered['hours_watched'].mean():,.0f}")
-col3.metric("Precio promedio", f"${df_filtered['price'].mean():.2f}")
+col1.metric("Juegos Totales", int(cube_filtered["n_games"].sum()))
+col2.metric("Horas vistas promedio", f"{cube_mean(cube_filtered, 'hours_watched'):,.0f}")
+col3.metric("Precio promedio", f"${cube_mean(cube_filtered, 'price'):.2f}")
 
 
 # -----------------------------------------------------------
@@ -100,10 +47,9 @@ col3.metric("Precio promedio", f"${df_filtered['price'].mean():.2f}")
 st.subheader("Horas vistas por género")
 
 df_genre = (
-    df_filtered.groupby("genre")["hours_watched"]
-    .sum()
-    .sort_values(ascending=False)
-    .reset_index()
+    cube_filtered[["genre", "hours_watched_sum"]]
+    .rename(columns={"hours_watched_sum": "hours_watched"})
+    .sort_values("hours_watched", ascending=False)
 )
 
 fig = px.bar(
@@ -120,8 +66,9 @@ st.plotly_chart(fig, use_container_width=True)
 # -----------------------------------------------------------
 st.subheader("Top 10 juegos más vistos")
 
+# El top 10 de la selección está dentro de los top 10 de cada género
 st.dataframe(
-    df_filtered[["name", "genre", "hours_watched", "avg_viewers", "price"]]
+    cube_for(top_games, selected)
     .sort_values("hours_watched", ascending=False)
     .head(10)
 )
@@ -0,0 +1,113 @@
+import os
+import sys
+import yaml
+import pandas as pd
+import pyarrow as pa
+import streamlit as st
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT, "src"))
+
+from data_transformation import dashboard_genres
+from storage import find_table, read_table
+
+CONFIG_PATH = os.path.join(ROOT, "config", "pipeline_config.yaml")
+
+
+# -----------------------------------------------------------
+# CARGA DE DATOS
+# -----------------------------------------------------------
+def _load_config(config_path: str = CONFIG_PATH) -> dict:
+    if os.path.exists(config_path):
+        with open(config_path, "r", encoding="utf-8") as fh:
+            return yaml.safe_load(fh)
+    return {}
+
+
+def _processed_table(name: str, cfg: dict):
+    processed = cfg.get("paths", {}).get("processed_data", "data/processed/")
+    base = os.path.join(ROOT, processed, name)
+    found = find_table(base)
+    if found is None:
+        raise FileNotFoundError(
+            f"No existe la tabla {base}.\n"
+            "Sugerencia: ejecuta primero `python src/orchestrator.py`."
+        )
+    return found
+
+
+def merged_data_path(config_path: str = CONFIG_PATH):
+    """`(ruta, formato)` del dataset combinado según la configuración.
+
+    Usa `dashboard.data_file` si está definido; si no, el `merged_data` que
+    el pipeline guarda en `paths.processed_data`.
+    """
+    cfg = _load_config(config_path)
+    data_file = cfg.get("dashboard", {}).get("data_file")
+    if data_file:
+        path = os.path.join(ROOT, data_file)
+        ext = os.path.splitext(path)[1].lstrip(".")
+        return path, {"arrow": "feather", "ipc": "feather"}.get(ext, ext)
+    return _processed_table("merged_data", cfg)
+
+
+def _arrow_strings(arrow_type):
+    # Mantener los textos en buffers de Arrow en lugar de copiarlos a objetos
+    if pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type):
+        return pd.StringDtype("pyarrow")
+    return None
+
+
+@st.cache_resource
+def load_merged() -> pd.DataFrame:
+    """Dataset combinado compartido por todas las páginas y sesiones.
+
+    Se carga una sola vez por proceso. Los archivos Feather/Parquet se
+    mapean en memoria y se convierten sin copiar las columnas numéricas ni
+    los textos, así que el consumo no crece con el número de páginas o
+    usuarios. El DataFrame es compartido: las páginas no deben modificarlo
+    (filtrar o usar `assign` crea objetos nuevos).
+
+    `genre` lleva las etiquetas del dashboard, las mismas claves que
+    `genre_cube` y `top_games`.
+    """
+    path, fmt = merged_data_path()
+    if fmt == "feather":
+        with pa.memory_map(path) as source:
+            table = pa.ipc.open_file(source).read_all()
+    elif fmt == "parquet":
+        import pyarrow.parquet as pq
+        table = pq.read_table(path, memory_map=True)
+    else:
+        table = pa.Table.from_pandas(read_table(os.path.splitext(path)[0], fmt=fmt),
+                                     preserve_index=False)
+
+    df = table.to_pandas(split_blocks=True, types_mapper=_arrow_strings)
+    df["genre"] = dashboard_genres(df["genre"])
+    return df
+
+
+@st.cache_resource
+def load_genre_cube() -> pd.DataFrame:
+    """Agregados por género (`genre_cube`) calculados por el pipeline."""
+    path, fmt = _processed_table("genre_cube", _load_config())
+    return read_table(os.path.splitext(path)[0], fmt=fmt)
+
+
+@st.cache_resource
+def load_top_games() -> pd.DataFrame:
+    """Top de juegos más vistos de cada género (`top_games`)."""
+    path, fmt = _processed_table("top_games", _load_config())
+    return read_table(os.path.splitext(path)[0], fmt=fmt)
+
+
+def cube_for(cube: pd.DataFrame, genres=None) -> pd.DataFrame:
+    """Filas del cubo para los géneros seleccionados (todos si no hay)."""
+    return cube[cube["genre"].isin(genres)] if genres else cube
+
+
+def cube_mean(cube: pd.DataFrame, metric: str) -> float:
+    """Media de `metric` sobre las filas del cubo, a partir de sumas y
+    conteos por género."""
+    count = cube[f"{metric}_count"].sum()
+    return cube[f"{metric}_sum"].sum() / count if count else float("nan")
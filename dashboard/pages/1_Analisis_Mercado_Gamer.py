@@ -1,108 +1,20 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-import unidecode
-from scipy.stats import spearmanr, kruskal
+from scipy.stats import spearmanr
+from data_access import cube_for, load_genre_cube, load_merged
+from nonparametric import RankedGroups
 
 st.set_page_config(layout="wide")
 
 st.title("Análisis Estadístico — Steam + Twitch")
 
 # -----------------------------------------------------------
-# CARGA DE DATOS + LIMPIEZA
+# CARGA DE DATOS
 # -----------------------------------------------------------
-@st.cache_data
-def load_data():
-
-    df = pd.read_csv(
-        r"C:\Users\kimbo\Downloads\merged_data.csv",
-        low_memory=False,
-        encoding="latin1"
-    )
-
-    # Normalizar game
-    df["game"] = df["game"].astype(str).str.lower()
-
-    # ------ FUNCIÓN MEJORADA PARA NORMALIZAR GÉNEROS ------
-    def normalize_genre(g):
-        if not isinstance(g, str):
-            return "Desconocido"
-
-        g_clean = unidecode.unidecode(g).lower().strip()
-
-        # Diccionario extendido
-        mapper = {
-            # Acción
-            "accion": "Acción",
-            "accia3n": "Acción",
-            "akcja": "Acción",
-            "akana": "Acción",
-
-            # Aventura
-            "aventura": "Aventura",
-            "abenteuer": "Aventura",
-            "aventure": "Aventura",
-            "przygodowe": "Aventura",
-
-            # Casual
-            "casual": "Casual",
-
-            # RPG
-            "rpg": "RPG",
-            "rollenspiel": "RPG",
-
-            # MMO
-            "mmo": "MMO",
-
-            # Indie
-            "indie": "Indie",
-
-            # Estrategia
-            "estrategia": "Estrategia",
-
-            # Simulación
-            "simulacion": "Simulación",
-
-            # Deportes
-            "deportes": "Deportes",
-
-            # Carreras
-            "carreras": "Carreras",
-
-            # Adultos
-            "contenido adulto": "Contenido Adulto",
-
-            # Acceso anticipado
-            "acceso anticipado": "Acceso Anticipado",
-            "early access": "Acceso Anticipado",
-        }
-
-        # Coincidencia por clave
-        for key, value in mapper.items():
-            if key in g_clean:
-                return value
-
-        # Si está corrupto (muchos símbolos raros)
-        if any(char.isdigit() or char in "!*>/<" for char in g_clean):
-            return "Desconocido"
-
-        # Caso general
-        return g_clean.capitalize()
-
-    df["genre"] = df["genre"].apply(normalize_genre)
-
-    # Convertir numéricos
-    for col in [
-        "hours_watched", "hours_streamed", "avg_viewers",
-        "avg_channels", "peak_viewers", "price"
-    ]:
-        df[col] = pd.to_numeric(df[col], errors="coerce")
-
-    return df
-
-
-# cargar
-df = load_data()
+# Una sola copia compartida por proceso (ver dashboard/data_access.py)
+df = load_merged()
+cube = load_genre_cube()
 
 
 # --------------------------------------------------
@@ -152,21 +64,31 @@ st.plotly_chart(fig1, use_container_width=True)
 # ====================================================
 st.subheader("2️ Prueba Kruskal-Wallis por género")
 
-groups = [g["avg_viewers"].dropna() for _, g in filtered_df.groupby("genre")]
-
-if len(groups) > 1:
-    stat, pval = kruskal(*groups)
+# `avg_viewers` se rankea una sola vez para H y para las comparaciones
+ranked = RankedGroups(filtered_df["avg_viewers"], filtered_df["genre"])
+stat, pval = ranked.kruskal()
 
+if stat is not None:
     st.write(f"**H-statistic:** {stat:.4f}")
     st.write(f"**P-value:** {pval:.6f}")
+
+    # Comparaciones por pares (Dunn, corrección de Holm)
+    posthoc = ranked.posthoc(correction="holm", mann_whitney=False)
+    st.write("**Comparaciones por pares (Dunn, Holm):**")
+    st.dataframe(
+        posthoc[["group_a", "group_b", "statistic", "p_adjusted", "reject"]]
+        .rename(columns={"group_a": "Género A", "group_b": "Género B", "statistic": "z",
+                         "p_adjusted": "P-value ajustado", "reject": "Significativo"})
+        .sort_values("P-value ajustado"),
+        use_container_width=True,
+    )
 else:
     st.info("No hay suficientes géneros seleccionados para ejecutar Kruskal-Wallis.")
 
 viewer_genre = (
-    filtered_df.groupby("genre")["avg_viewers"]
-    .mean()
-    .sort_values(ascending=False)
-    .reset_index()
+    cube_for(cube, selected_genres)[["genre", "avg_viewers_mean"]]
+    .rename(columns={"avg_viewers_mean": "avg_viewers"})
+    .sort_values("avg_viewers", ascending=False)
 )
 
 fig2 = px.bar(
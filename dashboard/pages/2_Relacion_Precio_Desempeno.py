@@ -1,137 +1,19 @@
 import os
-import ast
 import streamlit as st
 import pandas as pd
 import plotly.express as px
 import statsmodels.api as sm
-import unidecode
+from data_access import load_genre_cube, load_merged
 
 st.title("Dashboard — Precio, Desempeño y Endorsers")
 
 # -----------------------------------------------------------
-# CARGA DE DATOS + LIMPIEZA
+# CARGA DE DATOS
 # -----------------------------------------------------------
-@st.cache_data
-def load_data():
+# Una sola copia compartida por proceso (ver dashboard/data_access.py)
+df = load_merged()
+cube = load_genre_cube()
 
-    df = pd.read_csv(
-        r"C:\Users\kimbo\Downloads\merged_data.csv",
-        low_memory=False,
-        encoding="latin1"
-    )
-
-    # Normalizar game
-    df["game"] = df["game"].astype(str).str.lower()
-
-    # ------ FUNCIÓN MEJORADA PARA NORMALIZAR GÉNEROS ------
-    def normalize_genre(g):
-        if not isinstance(g, str):
-            return "Desconocido"
-
-        g_clean = unidecode.unidecode(g).lower().strip()
-
-        # Diccionario extendido
-        mapper = {
-            # Acción
-            "accion": "Acción",
-            "accia3n": "Acción",
-            "akcja": "Acción",
-            "akana": "Acción",
-
-            # Aventura
-            "aventura": "Aventura",
-            "abenteuer": "Aventura",
-            "aventure": "Aventura",
-            "przygodowe": "Aventura",
-
-            # Casual
-            "casual": "Casual",
-
-            # RPG
-            "rpg": "RPG",
-            "rollenspiel": "RPG",
-
-            # MMO
-            "mmo": "MMO",
-
-            # Indie
-            "indie": "Indie",
-
-            # Estrategia
-            "estrategia": "Estrategia",
-
-            # Simulación
-            "simulacion": "Simulación",
-
-            # Deportes
-            "deportes": "Deportes",
-
-            # Carreras
-            "carreras": "Carreras",
-
-            # Adultos
-            "contenido adulto": "Contenido Adulto",
-
-            # Acceso anticipado
-            "acceso anticipado": "Acceso Anticipado",
-            "Aassapso": "Acceso Anticipado",
-            "early access": "Acceso Anticipado",
-        }
-
-        # Coincidencia por clave
-        for key, value in mapper.items():
-            if key in g_clean:
-                return value
-
-        # Si está corrupto (muchos símbolos raros)
-        if any(char.isdigit() or char in "!*>/<" for char in g_clean):
-            return "Desconocido"
-
-        # Caso general
-        return g_clean.capitalize()
-
-    df["genre"] = df["genre"].apply(normalize_genre)
-
-    # Convertir numéricos
-    for col in [
-        "hours_watched", "hours_streamed", "avg_viewers",
-        "avg_channels", "peak_viewers", "price"
-    ]:
-        df[col] = pd.to_numeric(df[col], errors="coerce")
-
-    return df
-
-
-# cargar
-df = load_data()
-
-
-
-
-# -----------------------------------------------------------
-# EXTRAER PRICES CORRECTAMENTE
-# -----------------------------------------------------------
-def extract_price_fields(row):
-    try:
-        d = row if isinstance(row, dict) else ast.literal_eval(str(row))
-        return pd.Series([
-            d.get("final", None),
-            d.get("initial", None),
-            d.get("discount_percent", None),
-            d.get("currency", None),
-        ])
-    except:
-        return pd.Series([None, None, None, None])
-
-if "price_overview" in df.columns:
-    df[["price_final", "price_initial", "discount_percent", "currency"]] = \
-        df["price_overview"].apply(extract_price_fields)
-
-    df["price"] = pd.to_numeric(df["price_final"], errors="coerce")
-    df["sale_spike"] = pd.to_numeric(df["discount_percent"], errors="coerce")
-else:
-    df["price"] = None
-    df["sale_spike"] = None
 
 # -----------------------------------------------------------
 # FILTROS
@@ -144,6 +26,13 @@ selected = st.sidebar.multiselect("Filtrar por género", genres)
 if selected:
     df = df[df["genre"].isin(selected)]
 
+# -----------------------------------------------------------
+# PRECIOS: el pipeline ya guarda price_final / price_initial /
+# discount_percent / currency como columnas tipadas. `assign` crea un
+# DataFrame nuevo sin modificar la copia compartida.
+# -----------------------------------------------------------
+df = df.assign(sale_spike=df["discount_percent"] if "discount_percent" in df.columns else None)
+
 # -----------------------------------------------------------
 # 1. PRECIO VS VIEWERS
 # -----------------------------------------------------------
@@ -165,14 +54,24 @@ st.plotly_chart(fig, use_container_width=True)
 # -----------------------------------------------------------
 st.subheader("Géneros con mayor proporción de juegos populares")
 
-df["popular"] = df["avg_viewers"] > df["avg_viewers"].median()
-
-rate = (
-    df.groupby("genre")["popular"]
-    .mean()
-    .sort_values(ascending=False)
-    .reset_index()
-)
+# Populares: avg_viewers por encima de la mediana de la selección. Sin
+# filtro es la mediana global, que ya viene contada en el cubo. Con filtro
+# la mediana depende de los géneros elegidos y el cubo no la puede combinar
+# (sólo guarda cuantiles por género), así que se calcula sobre las filas.
+if selected:
+    popular = (df["avg_viewers"] > df["avg_viewers"].median()).rename("popular")
+    rate = (
+        popular.groupby(df["genre"], observed=True)
+        .mean()
+        .sort_values(ascending=False)
+        .reset_index()
+    )
+else:
+    rate = (
+        cube.assign(popular=cube["popular_count"] / cube["n_games"])
+        [["genre", "popular"]]
+        .sort_values("popular", ascending=False)
+    )
 
 fig2 = px.bar(
     rate,
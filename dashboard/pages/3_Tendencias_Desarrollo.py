@@ -3,101 +3,15 @@ import pandas as pd
 import plotly.express as px
 from sklearn.cluster import KMeans, DBSCAN
 from sklearn.preprocessing import StandardScaler
-import unidecode
+from data_access import load_merged
 
 st.title("Tendencias de Desarrollo")
 
 # -----------------------------------------------------------
-# CARGA DE DATOS + LIMPIEZA
+# CARGA DE DATOS
 # -----------------------------------------------------------
-@st.cache_data
-def load_data():
-
-    df = pd.read_csv(
-        r"C:\Users\kimbo\Downloads\merged_data.csv",
-        low_memory=False,
-        encoding="latin1"
-    )
-
-    # Normalizar game
-    df["game"] = df["game"].astype(str).str.lower()
-
-    # Normalizar género
-    def normalize_genre(g):
-        if not isinstance(g, str):
-            return "Desconocido"
-
-        g_clean = unidecode.unidecode(g).lower().strip()
-
-        mapper = {
-            # Acción
-            "accion": "Acción",
-            "accia3n": "Acción",
-            "akcja": "Acción",
-            "akana": "Acción",
-
-            # Aventura
-            "aventura": "Aventura",
-            "abenteuer": "Aventura",
-            "aventure": "Aventura",
-            "przygodowe": "Aventura",
-
-            # Casual
-            "casual": "Casual",
-
-            # RPG
-            "rpg": "RPG",
-            "rollenspiel": "RPG",
-
-            # MMO
-            "mmo": "MMO",
-
-            # Indie
-            "indie": "Indie",
-
-            # Estrategia
-            "estrategia": "Estrategia",
-
-            # Simulación
-            "simulacion": "Simulación",
-
-            # Deportes
-            "deportes": "Deportes",
-
-            # Carreras
-            "carreras": "Carreras",
-
-            # Adultos
-            "contenido adulto": "Contenido Adulto",
-
-            # Acceso anticipado
-            "acceso anticipado": "Acceso Anticipado",
-            "early access": "Acceso Anticipado",
-        }
-
-        for key, value in mapper.items():
-            if key in g_clean:
-                return value
-
-        return g_clean.capitalize()
-
-    df["genre"] = df["genre"].apply(normalize_genre)
-
-    # Variables numéricas a número
-    numeric_cols = [
-        "hours_watched", "hours_streamed", "avg_viewers",
-        "avg_channels", "peak_viewers", "price"
-    ]
-
-    for col in numeric_cols:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors="coerce")
-
-    return df
-
-
-# cargar
-df = load_data()
+# Una sola copia compartida por proceso (ver dashboard/data_access.py)
+df = load_merged()
 
 # --------------------------------------------------
 # FILTROS
@@ -1,13 +1,17 @@
-import pandas as pd
 import os
+import sys
 
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
 
-def main(path="data/processed/merged_data.csv", n=10):
-    if not os.path.exists(path):
-        print("No se encontró:", path)
+from storage import find_table, read_table
+
+
+def main(base="data/processed/merged_data", n=10):
+    if find_table(base) is None:
+        print("No se encontró:", base)
         return
 
-    df = pd.read_csv(path)
+    df = read_table(base)
     print("Filas totales:", len(df))
     print("Columnas:", list(df.columns))
 
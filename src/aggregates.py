@@ -0,0 +1,207 @@
+import os
+import json
+import pandas as pd
+import join_keys
+from pipeline_cache import code_digest
+from storage import find_table, read_table, write_table
+
+
+# Métricas resumidas por género en el cubo del dashboard
+CUBE_METRICS = ["hours_watched", "avg_viewers", "price"]
+CUBE_QUANTILES = [0.1, 0.25, 0.5, 0.75, 0.9]
+TOP_N = 10
+
+
+def build_genre_cube(df: pd.DataFrame) -> pd.DataFrame:
+    """Resumen por género del dataset combinado, una fila por género.
+
+    Para cada métrica de `CUBE_METRICS` guarda `<m>_count` (no nulos),
+    `<m>_sum`, `<m>_mean` y los cuantiles `<m>_p10` ... `<m>_p90`. Además
+    `n_games` y `popular_count`: juegos con `avg_viewers` por encima de la
+    mediana global (`popular_threshold`).
+
+    Los conteos y sumas se pueden sumar entre géneros para obtener KPIs de
+    cualquier selección sin volver a recorrer las filas.
+    """
+    grouped = df.groupby("genre", observed=True)
+    parts = {"n_games": grouped.size()}
+
+    for metric in [m for m in CUBE_METRICS if m in df.columns]:
+        col = grouped[metric]
+        parts[f"{metric}_count"] = col.count()
+        parts[f"{metric}_sum"] = col.sum()
+        parts[f"{metric}_mean"] = col.mean()
+        # Sin géneros (p. ej. un merge vacío) no hay columnas de cuantiles
+        quantiles = col.quantile(CUBE_QUANTILES).unstack().reindex(columns=CUBE_QUANTILES)
+        for q in CUBE_QUANTILES:
+            parts[f"{metric}_p{round(q * 100)}"] = quantiles[q]
+
+    if "avg_viewers" in df.columns:
+        threshold = df["avg_viewers"].median()
+        popular = df["avg_viewers"] > threshold
+        parts["popular_count"] = popular.groupby(df["genre"], observed=True).sum()
+
+    cube = pd.DataFrame(parts)
+    cube.index.name = "genre"
+    cube = cube.reset_index()
+    if "avg_viewers" in df.columns:
+        cube["popular_threshold"] = threshold
+    return cube
+
+
+def build_top_games(df: pd.DataFrame, by: str = "hours_watched",
+                    n: int = TOP_N) -> pd.DataFrame:
+    """Los `n` juegos con mayor `by` de cada género.
+
+    El top `n` de cualquier selección de géneros está contenido en la unión
+    de los top `n` de cada uno.
+    """
+    cols = [c for c in ["name", "genre", "hours_watched", "avg_viewers", "price"]
+            if c in df.columns]
+    ranked = df.sort_values(by, ascending=False)
+    return ranked.groupby("genre", observed=True).head(n)[cols].reset_index(drop=True)
+
+
+# Métricas de Twitch por juego y cómo se resumen entre meses
+TWITCH_AGGREGATES = {
+    "hours_watched": "sum",
+    "hours_streamed": "sum",
+    "peak_viewers": "max",
+    "peak_channels": "max",
+    "streamers": "sum",
+    "avg_viewers": "mean",
+    "avg_channels": "mean",
+    "avg_viewer_ratio": "mean",
+}
+
+TWITCH_PERIOD_COLUMNS = ["year", "month"]
+
+
+def _partial_how(column: str) -> str:
+    """Cómo se combinan dos valores parciales de `column`."""
+    base, _, suffix = column.rpartition("_")
+    if suffix in ("sum", "count") and TWITCH_AGGREGATES.get(base) == "mean":
+        return "sum"
+    return TWITCH_AGGREGATES[column]
+
+
+def twitch_partials(df: pd.DataFrame, key: str = "title_key") -> pd.DataFrame:
+    """Agregados parciales de Twitch por `key`, combinables entre sí.
+
+    Las sumas y máximos se guardan tal cual; las medias como `<m>_sum` y
+    `<m>_count` (valores no nulos), así que los parciales de distintos meses
+    se combinan con `merge_partials` sin volver a leer las filas.
+    """
+    specs = {}
+    for col, how in TWITCH_AGGREGATES.items():
+        if col not in df.columns:
+            continue
+        if how == "mean":
+            specs[f"{col}_sum"] = (col, "sum")
+            specs[f"{col}_count"] = (col, "count")
+        else:
+            specs[col] = (col, how)
+    codes, uniques = pd.factorize(df[key])
+    valid = codes >= 0
+    if specs:
+        partials = df[valid].groupby(codes[valid], sort=True).agg(**specs)
+    else:
+        partials = pd.DataFrame(index=pd.RangeIndex(len(uniques)))
+    partials.insert(0, key, uniques[partials.index])
+    return partials.reset_index(drop=True)
+
+
+def merge_partials(*parts, key: str = "title_key") -> pd.DataFrame:
+    """Combina agregados parciales de `twitch_partials` por `key`."""
+    parts = [p for p in parts if p is not None and len(p)]
+    if not parts:
+        return pd.DataFrame(columns=[key])
+    if len(parts) == 1:
+        return parts[0]
+    combined = pd.concat(parts, ignore_index=True)
+    how = {c: _partial_how(c) for c in combined.columns if c != key}
+    return combined.groupby(key, sort=False).agg(how).reset_index()
+
+
+def finalize_partials(partials: pd.DataFrame, key: str = "title_key") -> pd.DataFrame:
+    """Métricas finales por juego a partir de los parciales (las medias se
+    calculan como suma / conteo)."""
+    out = {key: partials[key]}
+    for col, how in TWITCH_AGGREGATES.items():
+        if how == "mean" and f"{col}_sum" in partials.columns:
+            count = partials[f"{col}_count"]
+            out[col] = partials[f"{col}_sum"] / count.where(count > 0)
+        elif col in partials.columns:
+            out[col] = partials[col]
+    return pd.DataFrame(out)
+
+
+def _periods(df: pd.DataFrame) -> pd.DataFrame:
+    """Columnas de periodo como números (`NaN` si el valor no es válido)."""
+    return pd.DataFrame({c: pd.to_numeric(df[c], errors="coerce")
+                         for c in TWITCH_PERIOD_COLUMNS}, index=df.index)
+
+
+def new_periods(df: pd.DataFrame, seen: pd.DataFrame) -> pd.Series:
+    """Máscara de las filas de `df` cuyo periodo (`year`, `month`) no está
+    entre los ya agregados en `seen`. Las filas con un periodo nulo o no
+    numérico quedan fuera: no se podría saber si ya se incorporaron."""
+    periods = _periods(df)
+    valid = periods.notna().all(axis=1)
+    known = pd.MultiIndex.from_frame(_periods(seen).dropna().astype("int64"))
+    fresh = pd.MultiIndex.from_frame(periods[valid].astype("int64")).isin(known)
+    mask = pd.Series(False, index=df.index)
+    mask[valid.to_numpy()] = ~fresh
+    return mask
+
+
+class TwitchPartialStore:
+    """Agregados parciales de Twitch guardados en `directory`
+    (`twitch_partials`) junto con los periodos ya incorporados
+    (`twitch_periods`), para sumar meses nuevos sin recorrer el histórico.
+
+    Los parciales están indexados por `title_key`, así que el manifiesto
+    (`twitch_partials.json`) guarda la versión de `join_keys` con la que se
+    calcularon: si la normalización de títulos cambia se reconstruyen.
+    """
+
+    def __init__(self, directory: str, fmt: str = "parquet", compression: str = None):
+        self.partials_base = os.path.join(directory, "twitch_partials")
+        self.periods_base = os.path.join(directory, "twitch_periods")
+        self.manifest_path = os.path.join(directory, "twitch_partials.json")
+        self.fmt = fmt
+        self.compression = compression
+
+    @staticmethod
+    def _keys_version() -> str:
+        return code_digest(join_keys)
+
+    def load(self):
+        """`(parciales, periodos)` guardados; vacíos si aún no hay o si se
+        calcularon con otra versión de `join_keys`."""
+        empty = None, pd.DataFrame(columns=TWITCH_PERIOD_COLUMNS)
+        if find_table(self.partials_base) is None or find_table(self.periods_base) is None:
+            return empty
+        manifest = {}
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, "r", encoding="utf-8") as fh:
+                manifest = json.load(fh)
+        if manifest.get("join_keys") != self._keys_version():
+            print("⚠ La normalización de títulos cambió: se reconstruyen los "
+                  "agregados parciales de Twitch.")
+            return empty
+        return read_table(self.partials_base), read_table(self.periods_base)
+
+    def fold(self, rows: pd.DataFrame, stored: pd.DataFrame, periods: pd.DataFrame,
+             key: str = "title_key") -> pd.DataFrame:
+        """Incorpora `rows` (sólo periodos nuevos, ya normalizadas) a los
+        parciales `stored` que devolvió `load` y devuelve los actualizados."""
+        partials = merge_partials(stored, twitch_partials(rows, key), key=key)
+        added = _periods(rows).dropna().drop_duplicates().astype("int64")
+        periods = pd.concat([_periods(periods).dropna().astype("int64"), added],
+                            ignore_index=True)
+        write_table(partials, self.partials_base, self.fmt, self.compression)
+        write_table(periods, self.periods_base, self.fmt, self.compression)
+        with open(self.manifest_path, "w", encoding="utf-8") as fh:
+            json.dump({"join_keys": self._keys_version()}, fh, indent=2)
+        return partials
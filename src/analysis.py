@@ -1,12 +1,337 @@
 import os
+import sys
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
 import yaml
+import numpy as np
 import pandas as pd
-from scipy.stats import spearmanr, kruskal
+from scipy.stats import kendalltau, spearmanr
+from scipy.special import erfc
+from scipy.stats import t as t_dist
+import labels
+import nonparametric
+import resampling
+from labels import ALL_GENRES
+from nonparametric import RankedGroups
+from pipeline_cache import PipelineCache, code_digest, stage_key
+from resampling import kruskal_resampling, spearman_resampling
+
+
+# Métricas de la matriz de correlaciones (sólo se usan las que existan)
+CORRELATION_COLUMNS = ["price", "hours_watched", "hours_streamed", "peak_viewers",
+                       "avg_viewers", "streamers", "avg_channels"]
+
+# Hasta este tamaño de grupo Kendall se calcula con la matriz de signos por
+# pares (O(n²)); por encima es más rápido `kendalltau` (O(n log n)) por pareja
+KENDALL_MATRIX_MAX_ROWS = 300
+
+
+def _spearman_block(ranks: np.ndarray):
+    """Matriz de Spearman de un bloque ya rankeado: correlación de Pearson
+    de los rangos con un único producto de matrices."""
+    centered = ranks - ranks.mean(axis=0)
+    cross = centered.T @ centered
+    scale = np.sqrt(np.diag(cross))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        coef = np.clip(cross / np.outer(scale, scale), -1.0, 1.0)
+        # Mismo contraste t que `scipy.stats.spearmanr`
+        dof = len(ranks) - 2
+        t = coef * np.sqrt(dof / ((1.0 + coef) * (1.0 - coef)))
+    return coef, 2 * t_dist.sf(np.abs(t), dof)
+
+
+def _tie_sums(column: np.ndarray):
+    """Sumas de empates que usa la varianza de la tau-b de Kendall."""
+    t = np.unique(column, return_counts=True)[1].astype(np.float64)
+    t = t[t > 1]
+    return ((t * (t - 1) / 2).sum(), (t * (t - 1) * (t - 2)).sum(),
+            (t * (t - 1) * (2 * t + 5)).sum())
+
+
+def _kendall_block(values: np.ndarray):
+    """Matriz tau-b de Kendall de un bloque y sus p-valores asintóticos.
+
+    En grupos pequeños se toman los signos de las diferencias por pares de
+    todas las columnas a la vez: concordantes menos discordantes es
+    `signos.T @ signos` y la diagonal cuenta los pares sin empate de cada
+    columna. En grupos grandes se usa `kendalltau` por pareja.
+    """
+    n, k = values.shape
+    if n > KENDALL_MATRIX_MAX_ROWS:
+        coef, p = np.eye(k), np.zeros((k, k))
+        for i, j in zip(*np.triu_indices(k, k=1)):
+            coef[i, j], p[i, j] = kendalltau(values[:, i], values[:, j], method="asymptotic")
+        return coef, p
+
+    upper = np.triu_indices(n, k=1)
+    signs = np.sign(values[upper[1]] - values[upper[0]])
+    cross = signs.T @ signs
+    untied = np.diag(cross)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        coef = np.clip(cross / np.sqrt(np.outer(untied, untied)), -1.0, 1.0)
+        # Varianza con corrección por empates (como `scipy.stats.kendalltau`)
+        ties = np.array([_tie_sums(values[:, j]) for j in range(k)]).reshape(k, 3)
+        xtie, x0, x1 = ties[:, 0], ties[:, 1], ties[:, 2]
+        m = n * (n - 1.0)
+        var = ((m * (2 * n + 5) - x1[:, None] - x1[None, :]) / 18
+               + 2 * np.outer(xtie, xtie) / m + np.outer(x0, x0) / (9 * m * (n - 2)))
+        p = erfc(np.abs(cross / np.sqrt(var)) / np.sqrt(2))
+    return coef, p
+
+
+def correlation_matrix(df: pd.DataFrame, columns=None, by: str = None,
+                       kendall: bool = False, min_rows: int = 3) -> pd.DataFrame:
+    """Correlaciones por rangos entre todas las parejas de `columns`, para
+    el total y para cada grupo de `by` (p. ej. `genre`).
+
+    Cada columna se rankea una sola vez dentro de su grupo (un único
+    `groupby().rank()` para todas) y la matriz completa de Spearman de cada
+    grupo sale de un producto de matrices; con `kendall=True` se añade la
+    tau-b de Kendall. Se usan las filas sin nulos en ninguna métrica y se
+    omiten los grupos con menos de `min_rows` filas.
+
+    Devuelve una tabla larga: `genre`, `method`, `x`, `y`, `n`, `coef`,
+    `p_value` (una fila por pareja y grupo).
+    """
+    columns = [c for c in (columns or CORRELATION_COLUMNS)
+               if c in df.columns and df[c].notna().any()]
+    values = np.column_stack([pd.to_numeric(df[c], errors="coerce")
+                              .to_numpy(dtype=np.float64, na_value=np.nan)
+                              for c in columns]) if columns else np.empty((len(df), 0))
+    complete = ~np.isnan(values).any(axis=1)
+    labels = [pd.Series(ALL_GENRES, index=df.index)]
+    if by is not None and by in df.columns:
+        labels.append(df[by].astype(object))
+
+    pairs = np.triu_indices(len(columns), k=1)
+    tables = []
+    for label in labels:
+        keep = complete & label.notna().to_numpy()
+        codes, groups = pd.factorize(label[keep], sort=True)
+        data = values[keep]
+        ranks = (pd.DataFrame(data).groupby(codes).rank().to_numpy()
+                 if len(data) else data)
+        # Filas contiguas por grupo: cada grupo es una rebanada
+        order = np.argsort(codes, kind="stable")
+        bounds = np.concatenate([[0], np.cumsum(np.bincount(codes, minlength=len(groups)))])
+        for g, group in enumerate(groups):
+            rows = order[bounds[g]:bounds[g + 1]]
+            if len(rows) < min_rows:
+                continue
+            results = [("spearman", *_spearman_block(ranks[rows]))]
+            if kendall:
+                results.append(("kendall", *_kendall_block(data[rows])))
+            for method, coef, p in results:
+                tables.append(pd.DataFrame({
+                    "genre": group, "method": method,
+                    "x": [columns[i] for i in pairs[0]], "y": [columns[j] for j in pairs[1]],
+                    "n": len(rows), "coef": coef[pairs], "p_value": p[pairs],
+                }))
+    if not tables:
+        return pd.DataFrame(columns=["genre", "method", "x", "y", "n", "coef", "p_value"])
+    return pd.concat(tables, ignore_index=True)
+
+
+# -----------------------------------------------------------
+# REGISTRO DE ANÁLISIS
+# -----------------------------------------------------------
+# Nombre -> función, columnas del dataset que usa, opción de la
+# configuración que lo activa, claves de `analysis` que afectan al resultado
+# y tablas que produce
+ANALYSES = {}
+
+
+def register_analysis(name: str, columns, flag, config_keys=(), tables=()):
+    """Registra un análisis para `run_analysis`.
+
+    La función recibe el dataset (sólo con `columns`) y el bloque `analysis`
+    de la configuración, y devuelve un dict: los valores escalares van al
+    resumen `analysis_results.csv` y los DataFrame se guardan como
+    `analysis_<clave>.csv` (las claves se declaran en `tables`, para borrar
+    esas tablas cuando el análisis se desactiva). `flag` es la ruta de la
+    opción que lo activa (p. ej. `("posthoc", "enabled")`); si no está en la
+    configuración el análisis se ejecuta.
+    """
+    def decorator(func):
+        ANALYSES[name] = {"func": func, "columns": list(columns), "flag": tuple(flag),
+                          "config_keys": list(config_keys), "tables": list(tables)}
+        return func
+    return decorator
+
+
+def enabled_analyses(analysis_cfg: dict):
+    """Nombres de los análisis registrados que la configuración activa."""
+    names = []
+    for name, spec in ANALYSES.items():
+        value = analysis_cfg
+        for key in spec["flag"]:
+            value = value.get(key, True) if isinstance(value, dict) else value
+        if value:
+            names.append(name)
+    return names
+
+
+def analysis_columns(cfg: dict):
+    """Columnas del dataset combinado que necesitan los análisis activos."""
+    analysis_cfg = cfg.get("analysis", {}) or {}
+    return list(dict.fromkeys(c for name in enabled_analyses(analysis_cfg)
+                              for c in ANALYSES[name]["columns"]))
+
+
+def _resampling(analysis_cfg: dict, func, *args):
+    """Intervalos bootstrap y p-valores por permutaciones, si están activos
+    en `analysis.resampling` (las colas pesadas de las métricas de Twitch
+    hacen poco fiables los asintóticos)."""
+    resampling_cfg = analysis_cfg.get("resampling", {}) or {}
+    if not resampling_cfg.get("enabled", False):
+        return {}
+    options = {k: resampling_cfg[k] for k in ("n_resamples", "confidence", "seed", "workers")
+               if resampling_cfg.get(k) is not None}
+    return func(*args, **options)
+
+
+def _share_resampling_workers(analysis_cfg: dict, pending, threads: int) -> dict:
+    """Configuración con `resampling.workers` repartido entre los análisis
+    con remuestreo que corren a la vez en el pool de hilos: cada uno lanza
+    su propio pool de procesos, y sin repartir sumarían varias veces los
+    núcleos. El total es `resampling.workers` (por defecto, los núcleos)."""
+    resampling_cfg = analysis_cfg.get("resampling", {}) or {}
+    concurrent = min(threads, sum("resampling" in ANALYSES[name]["config_keys"]
+                                  for name in pending))
+    if not resampling_cfg.get("enabled", False) or concurrent <= 1:
+        return analysis_cfg
+    budget = resampling_cfg.get("workers") or os.cpu_count() or 1
+    return dict(analysis_cfg,
+                resampling=dict(resampling_cfg, workers=max(1, budget // concurrent)))
+
+
+@register_analysis("spearman", ["hours_watched", "avg_viewers"], flag=("use_spearman",),
+                   config_keys=["resampling"])
+def spearman_analysis(df: pd.DataFrame, analysis_cfg: dict) -> dict:
+    corr, p = spearmanr(df["hours_watched"], df["avg_viewers"], nan_policy="omit")
+    result = {"corr": float(corr), "p": float(p)}
+    result.update(_resampling(analysis_cfg, spearman_resampling,
+                              df["hours_watched"], df["avg_viewers"]))
+    return result
+
+
+@register_analysis("kruskal", ["avg_viewers", "genre"], flag=("use_kruskal",),
+                   config_keys=["resampling"])
+def kruskal_analysis(df: pd.DataFrame, analysis_cfg: dict) -> dict:
+    # Kruskal-Wallis por género si hay al menos 2 grupos: `avg_viewers` se
+    # rankea una vez y H sale de las sumas de rangos por género
+    ranked = RankedGroups(df["avg_viewers"], df["genre"])
+    stat, p = ranked.kruskal()
+    result = {"stat": stat, "p": p}
+    result.update(_resampling(analysis_cfg, kruskal_resampling, ranked.groups()))
+    return result
+
+
+@register_analysis("posthoc", ["avg_viewers", "genre"], flag=("posthoc", "enabled"),
+                   config_keys=["posthoc"], tables=["posthoc"])
+def posthoc_analysis(df: pd.DataFrame, analysis_cfg: dict) -> dict:
+    # Comparaciones por pares entre géneros (Dunn y Mann-Whitney) con
+    # corrección por comparaciones múltiples
+    posthoc_cfg = analysis_cfg.get("posthoc", {}) or {}
+    ranked = RankedGroups(df["avg_viewers"], df["genre"])
+    return {"posthoc": ranked.posthoc(correction=posthoc_cfg.get("correction", "holm"),
+                                      alpha=posthoc_cfg.get("alpha", 0.05),
+                                      mann_whitney=posthoc_cfg.get("mann_whitney", True))}
+
+
+@register_analysis("correlations", CORRELATION_COLUMNS + ["genre"],
+                   flag=("correlation_matrix",), config_keys=["kendall", "min_group_rows"],
+                   tables=["correlations"])
+def correlations_analysis(df: pd.DataFrame, analysis_cfg: dict) -> dict:
+    # Matriz de correlaciones por rangos (total y por género)
+    return {"correlations": correlation_matrix(
+        df, by="genre", kendall=analysis_cfg.get("kendall", False),
+        min_rows=analysis_cfg.get("min_group_rows", 3))}
+
+
+# -----------------------------------------------------------
+# ALMACÉN DE RESULTADOS
+# -----------------------------------------------------------
+SUMMARY_COLUMNS = ["analysis", "statistic", "value"]
+
+
+def data_digest(df: pd.DataFrame, columns) -> str:
+    """Hash del contenido de `columns` (las que existan en `df`)."""
+    h = hashlib.sha256()
+    for col in columns:
+        if col in df.columns:
+            h.update(str(col).encode("utf-8"))
+            h.update(pd.util.hash_pandas_object(df[col], index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+class ResultsStore:
+    """Resultados de los análisis en `directory`.
+
+    Cada tabla se guarda como `analysis_<tabla>.csv` y los valores escalares
+    de todos los análisis en el resumen largo `analysis_results.csv`
+    (análisis, estadístico, valor). Un manifiesto guarda para cada análisis
+    la clave de sus entradas (datos de sus columnas, configuración y código)
+    y sus escalares, así que un análisis sin cambios no se vuelve a
+    ejecutar.
+    """
+
+    def __init__(self, directory: str, enabled: bool = True):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.cache = PipelineCache(os.path.join(directory, ".analysis_cache.json"),
+                                   enabled=enabled)
+
+    def table_path(self, table: str) -> str:
+        return os.path.join(self.directory, f"analysis_{table}.csv")
+
+    def lookup(self, name: str, key: str):
+        """Escalares guardados del análisis si sigue vigente, si no `None`."""
+        entry = self.cache.lookup(name, key)
+        return None if entry is None else entry["data"].get("stats", {})
+
+    def save(self, name: str, key: str, outputs: dict) -> dict:
+        """Guarda las tablas del análisis y devuelve sus escalares."""
+        stats, paths = {}, []
+        for out, value in outputs.items():
+            if isinstance(value, pd.DataFrame):
+                paths.append(self.table_path(out))
+                value.to_csv(paths[-1], index=False)
+            else:
+                stats[out] = None if value is None or pd.isna(value) else float(value)
+        self.cache.store(name, key, paths, data={"stats": stats})
+        return stats
+
+    def discard(self, name: str, tables=()):
+        """Borra las tablas de un análisis desactivado, para que no queden
+        en el directorio como si fueran resultados actuales."""
+        for table in tables:
+            if os.path.exists(self.table_path(table)):
+                os.remove(self.table_path(table))
+        self.cache.drop(name)
+
+    def write_summary(self, stats: dict) -> pd.DataFrame:
+        summary = pd.DataFrame([(name, stat, value) for name, values in stats.items()
+                                for stat, value in values.items()], columns=SUMMARY_COLUMNS)
+        summary.to_csv(os.path.join(self.directory, "analysis_results.csv"), index=False)
+        return summary
+
+    def read_summary(self) -> pd.DataFrame:
+        return pd.read_csv(os.path.join(self.directory, "analysis_results.csv"))
+
+    def read_table(self, table: str) -> pd.DataFrame:
+        return pd.read_csv(self.table_path(table))
 
 
 def run_analysis(df: pd.DataFrame, output: str = None,
-                 config_path: str = "config/pipeline_config.yaml"):
-    """Corre los análisis definidos en la configuración y guarda resultados.
+                 config_path: str = "config/pipeline_config.yaml", force: bool = False):
+    """Corre los análisis activos en la configuración y guarda resultados.
+
+    Los análisis registrados se ejecutan a la vez en un pool de hilos
+    (`analysis.workers`), y los que remuestrean se reparten los procesos de
+    `analysis.resampling.workers`; los que no cambiaron sus columnas, configuración
+    ni código desde la última ejecución se reutilizan del almacén (salvo
+    con `force=True`). Devuelve el resumen largo de `analysis_results.csv`.
     """
     # Leer config si existe
     if os.path.exists(config_path):
@@ -17,33 +342,52 @@ def run_analysis(df: pd.DataFrame, output: str = None,
 
     output = output or cfg.get("paths", {}).get("processed_data",
                                              "data/processed/")
-    os.makedirs(output, exist_ok=True)
-    out_file = os.path.join(output, "analysis_results.csv")
+    analysis_cfg = cfg.get("analysis", {}) or {}
+    store = ResultsStore(output, enabled=not force)
+    code = code_digest(sys.modules[__name__], nonparametric, resampling, labels)
 
-    # 1. Spearman correlation
-    corr, p_spearman = spearmanr(df["hours_watched"], df["avg_viewers"],
-                                 nan_policy="omit")
+    enabled = enabled_analyses(analysis_cfg)
+    for name in ANALYSES:
+        if name not in enabled:
+            store.discard(name, ANALYSES[name]["tables"])
 
-    # 2. Kruskal-Wallis (por género) si hay al menos 2 grupos
-    groups = [g["avg_viewers"].dropna() for _, g in df.groupby("genre")]
-    if len([g for g in groups if len(g) > 0]) >= 2:
-        stat, p_kruskal = kruskal(*groups)
-    else:
-        stat, p_kruskal = None, None
+    stats, pending = {}, {}
+    for name in enabled:
+        spec = ANALYSES[name]
+        key = stage_key(name, data_digest(df, spec["columns"]),
+                        {k: analysis_cfg.get(k) for k in spec["config_keys"]}, code)
+        cached = store.lookup(name, key)
+        if cached is not None:
+            print(f"↺ Análisis {name} sin cambios: se reutiliza.")
+            stats[name] = cached
+        else:
+            pending[name] = key
 
-    result = pd.DataFrame({
-        "spearman_corr": [corr],
-        "spearman_p": [p_spearman],
-        "kruskal_stat": [stat],
-        "kruskal_p": [p_kruskal]
-    })
+    if pending:
+        workers = analysis_cfg.get("workers") or min(len(pending), os.cpu_count() or 1)
+        run_cfg = _share_resampling_workers(analysis_cfg, pending, workers)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {name: pool.submit(ANALYSES[name]["func"],
+                                         df[[c for c in ANALYSES[name]["columns"]
+                                             if c in df.columns]], run_cfg)
+                       for name in pending}
+            for name, future in futures.items():
+                stats[name] = store.save(name, pending[name], future.result())
 
-    result.to_csv(out_file, index=False)
-    print("✔ Análisis completado. Guardado en:", out_file)
-
-    return result
+    # Resumen en el orden del registro
+    summary = store.write_summary({name: stats[name] for name in ANALYSES if name in stats})
+    print("✔ Análisis completado. Guardado en:", os.path.join(output, "analysis_results.csv"))
+    return summary
 
 
 if __name__ == "__main__":
-    df = pd.read_csv("data/processed/merged_data.csv")
-    run_analysis(df)
+    from storage import read_table
+
+    config_path = "config/pipeline_config.yaml"
+    if os.path.exists(config_path):
+        with open(config_path, "r", encoding="utf-8") as fh:
+            cfg = yaml.safe_load(fh)
+    else:
+        cfg = {}
+    df = read_table("data/processed/merged_data", columns=analysis_columns(cfg))
+    run_analysis(df, config_path=config_path)
@@ -1,15 +1,230 @@
 import os
+import io
+import csv
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 import yaml
 import pandas as pd
+from storage import TableWriter, read_table, write_table
+
+
+# Columnas de Steam que `transform_data` necesita además de las declaradas
+# en `columns.steam` de la configuración.
+STEAM_TRANSFORM_COLUMNS = ["name", "genres", "price_overview", "is_free",
+                           "year", "month"]
+
+# Tipos explícitos para las columnas de Steam que se cargan en modo streaming.
+# `is_free` se lee como texto y se convierte después para tolerar valores
+# corruptos del CSV original.
+STEAM_DTYPES = {
+    "name": str,
+    "genres": str,
+    "price_overview": str,
+    "release_date": str,
+    "is_free": str,
+}
+
+DEFAULT_CHUNKSIZE = 50_000
+
+# Tamaño aproximado de cada rango de bytes en el modo `parallel`
+DEFAULT_PART_BYTES = 64 * 1024 * 1024
+
+
+def steam_columns(cfg: dict) -> set:
+    """Columnas de Steam a cargar: las de `columns.steam` más las que
+    necesita la transformación."""
+    declared = cfg.get("columns", {}).get("steam", []) or []
+    return set(declared) | set(STEAM_TRANSFORM_COLUMNS)
+
+
+def _coerce_steam_chunk(chunk: pd.DataFrame) -> pd.DataFrame:
+    if "is_free" in chunk.columns:
+        chunk["is_free"] = (chunk["is_free"].str.strip().str.lower()
+                            .map({"true": True, "false": False})
+                            .astype("boolean"))
+    return chunk
+
+
+def iter_steam_chunks(steam_file: str, columns=None,
+                      chunksize: int = DEFAULT_CHUNKSIZE):
+    """Lee el CSV de Steam en bloques de `chunksize` filas cargando sólo
+    `columns` (las que no existan en el archivo se ignoran).
+
+    El consumo de memoria depende del tamaño del bloque y no del archivo.
+    """
+    wanted = set(columns) if columns is not None else None
+    reader = pd.read_csv(
+        steam_file,
+        encoding="latin1",
+        usecols=(lambda c: c in wanted) if wanted is not None else None,
+        dtype={k: v for k, v in STEAM_DTYPES.items()
+               if wanted is None or k in wanted},
+        chunksize=chunksize,
+    )
+    for chunk in reader:
+        yield _coerce_steam_chunk(chunk)
+
+
+def split_csv_ranges(path: str, part_bytes: int = DEFAULT_PART_BYTES):
+    """Divide un CSV en rangos de bytes `(inicio, fin)` que empiezan y
+    terminan en un límite de registro.
+
+    Los campos entre comillas pueden contener saltos de línea, así que un
+    corte sólo es válido en un `\\n` con un número par de comillas antes
+    (las comillas escapadas `""` no cambian la paridad). El archivo se
+    recorre una vez contando comillas por bloques.
+
+    Devuelve `(encabezado, rangos)`; el encabezado no forma parte de ningún
+    rango.
+    """
+    size = os.path.getsize(path)
+    with open(path, "rb") as fh:
+        header = fh.readline()
+        start = fh.tell()
+        ranges = []
+        quotes = 0          # comillas entre `start` y la posición actual
+        pos = start
+        target = start + part_bytes
+        while target < size:
+            # Contar comillas hasta el objetivo
+            fh.seek(pos)
+            while pos < target:
+                block = fh.read(min(1 << 20, target - pos))
+                quotes += block.count(b'"')
+                pos += len(block)
+            # Avanzar hasta el primer salto de línea fuera de comillas
+            cut = None
+            while cut is None:
+                block = fh.read(1 << 20)
+                if not block:
+                    break
+                i = 0
+                while True:
+                    nl = block.find(b"\n", i)
+                    if nl < 0:
+                        quotes += block.count(b'"', i)
+                        pos += len(block)
+                        break
+                    quotes += block.count(b'"', i, nl)
+                    if quotes % 2 == 0:
+                        cut = pos + nl + 1
+                        break
+                    i = nl + 1
+            if cut is None or cut >= size:
+                break
+            ranges.append((start, cut))
+            start = pos = cut
+            quotes = 0
+            target = start + part_bytes
+    if start < size:
+        ranges.append((start, size))
+    return header, ranges
+
+
+def _read_csv_range(path: str, start: int, end: int, names: list,
+                    columns=None) -> pd.DataFrame:
+    """Parsea el rango `[start, end)` de un CSV de Steam (sin encabezado)."""
+    with open(path, "rb") as fh:
+        fh.seek(start)
+        data = fh.read(end - start)
+    usecols = [n for n in names if n in columns] if columns is not None else None
+    chunk = pd.read_csv(
+        io.BytesIO(data),
+        encoding="latin1",
+        header=None,
+        names=names,
+        usecols=usecols,
+        dtype={k: v for k, v in STEAM_DTYPES.items()
+               if usecols is None or k in usecols},
+        low_memory=False,
+    )
+    return _coerce_steam_chunk(chunk)
+
+
+def read_steam_parallel(steam_file: str, columns=None, workers: int = None,
+                        part_bytes: int = DEFAULT_PART_BYTES,
+                        validator=None) -> pd.DataFrame:
+    """Lee el CSV de Steam dividido en rangos de bytes que se parsean en
+    paralelo en `workers` procesos. Sólo carga `columns` si se indican.
+
+    Si se pasa un `validator` (`data_validation.ChunkValidator`), cada parte
+    se valida en cuanto llega y, si falla, se cancelan las pendientes.
+    """
+    header, ranges = split_csv_ranges(steam_file, part_bytes)
+    names = next(csv.reader([header.decode("latin1")]))
+    columns = set(columns) if columns is not None else None
+    parts = []
+    offset = 0
+
+    def add(part):
+        # Índices de fila respecto al archivo completo (como en streaming),
+        # para que las muestras de `ValidationError` no sean ambiguas
+        nonlocal offset
+        part.index = pd.RangeIndex(offset, offset + len(part))
+        offset += len(part)
+        if validator is not None:
+            validator.update(part)
+        parts.append(part)
+
+    if len(ranges) <= 1 or workers == 1:
+        for a, b in ranges:
+            add(_read_csv_range(steam_file, a, b, names, columns))
+    else:
+        # `spawn`: en modo parallel esto corre en un hilo mientras otro lee
+        # Twitch, y un `fork` con otros hilos en marcha puede bloquearse
+        pool = ProcessPoolExecutor(max_workers=workers,
+                                   mp_context=multiprocessing.get_context("spawn"))
+        try:
+            for part in pool.map(_read_csv_range,
+                                 [steam_file] * len(ranges),
+                                 [a for a, _ in ranges],
+                                 [b for _, b in ranges],
+                                 [names] * len(ranges),
+                                 [columns] * len(ranges)):
+                add(part)
+        finally:
+            pool.shutdown(cancel_futures=True)
+    if not parts:
+        return pd.DataFrame(columns=[n for n in names if columns is None or n in columns])
+    return pd.concat(parts, ignore_index=True)
 
 
 def ingest_data(steam_path: str = None, twitch_path: str = None,
                 config_path: str = "config/pipeline_config.yaml",
-                output_dir: str = None):
+                output_dir: str = None, mode: str = None,
+                chunksize: int = None, workers: int = None, validator=None,
+                load: bool = True, sketch=None):
     """Ingesta de datos desde CSV. Si no se proveen rutas, las lee desde
     `config/pipeline_config.yaml`.
 
-    Guarda copias en la carpeta de `raw_data` configurada.
+    `mode` puede ser:
+    - `"full"`: lee el CSV de Steam completo.
+    - `"streaming"`: lee Steam por bloques y sólo las columnas necesarias.
+    - `"parallel"`: procesa Steam y Twitch a la vez y parsea Steam en rangos
+      de bytes repartidos en `workers` procesos (`ingestion.workers`, por
+      defecto todos los núcleos), también con sólo las columnas necesarias.
+    Si no se indica se toma de `ingestion.mode` en la configuración.
+
+    Guarda copias en la carpeta de `raw_data` configurada, en el formato de
+    `storage.raw_format` (`csv`, `parquet` o `feather`).
+
+    Si se pasa un `validator` (`data_validation.ChunkValidator`), Steam se
+    valida bloque a bloque mientras se lee y la ingesta se detiene con
+    `ValidationError` en cuanto se supera algún umbral.
+
+    Si se pasa un `sketch` (`sketches.CatalogueSketch`), cada bloque de
+    Steam actualiza además las estadísticas del catálogo completo.
+
+    Con `load=False` sólo se escriben las copias raw y se devuelve
+    `(None, None)`; en modo `streaming` Steam nunca se tiene completo en
+    memoria (lo usa el backend `polars`, que lee las copias raw).
+
+    Limitación: con `load=True` (backend `pandas`) los bloques de `streaming`
+    se concatenan para devolver el DataFrame completo, porque
+    `transform_data` trabaja sobre Steam entero. El bloque sólo acota la
+    lectura y la escritura de la copia raw: el pico de memoria crece con el
+    tamaño del archivo (aunque sólo con las columnas necesarias). Para
+    acotarlo hay que usar `load=False`.
     """
     # Cargar configuración
     if os.path.exists(config_path):
@@ -20,6 +235,13 @@ def ingest_data(steam_path: str = None, twitch_path: str = None,
 
     raw_dir = cfg.get("paths", {}).get("raw_data", "data/raw/")
     files = cfg.get("files", {})
+    ingestion_cfg = cfg.get("ingestion", {})
+    mode = mode or ingestion_cfg.get("mode", "full")
+    chunksize = chunksize or ingestion_cfg.get("chunksize", DEFAULT_CHUNKSIZE)
+    workers = workers or ingestion_cfg.get("workers")
+    storage_cfg = cfg.get("storage", {})
+    raw_format = storage_cfg.get("raw_format", "csv")
+    compression = storage_cfg.get("compression")
 
     # Determinar rutas finales
     steam_file = steam_path or os.path.join(raw_dir, files.get("steam_dataset", "steam_app_data.csv"))
@@ -41,17 +263,87 @@ def ingest_data(steam_path: str = None, twitch_path: str = None,
             "Sugerencia: sube el CSV al storage y configura el workflow para descargarlo."
         )
 
-    # Leer CSVs
-    steam_df = pd.read_csv(steam_file, encoding="latin1", low_memory=False)
-    twitch_df = pd.read_csv(twitch_file, encoding="latin1", low_memory=False)
+    columns = steam_columns(cfg)
+    if sketch is not None:
+        columns |= set(sketch.COLUMNS)
+
+    steam_out = os.path.join(output_dir, "steam_raw")
+    twitch_out = os.path.join(output_dir, "twitch_raw")
+
+    def ingest_steam():
+        if mode == "streaming":
+            # Cada bloque se guarda en la copia raw apenas se lee
+            chunks = []
+            with TableWriter(steam_out, raw_format, compression) as writer:
+                for chunk in iter_steam_chunks(steam_file, columns, chunksize):
+                    if validator is not None:
+                        validator.update(chunk)
+                    if sketch is not None:
+                        sketch.update(chunk)
+                    writer.write(chunk)
+                    if load:
+                        chunks.append(chunk)
+            if validator is not None:
+                validator.finish()
+            if not load:
+                return None
+            # Con load=True Steam termina completo en memoria (ver docstring)
+            return pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
+        if mode == "parallel":
+            df = read_steam_parallel(steam_file, columns, workers,
+                                     ingestion_cfg.get("part_bytes", DEFAULT_PART_BYTES),
+                                     validator)
+        else:
+            df = pd.read_csv(steam_file, encoding="latin1", low_memory=False)
+            if validator is not None:
+                validator.update(df)
+        if validator is not None:
+            validator.finish()
+        if sketch is not None:
+            sketch.update(df)
+        write_table(df, steam_out, raw_format, compression)
+        return df if load else None
+
+    def ingest_twitch():
+        df = pd.read_csv(twitch_file, encoding="latin1", low_memory=False)
+        # Guardar copia procesada de raw
+        write_table(df, twitch_out, raw_format, compression)
+        return df if load else None
+
+    if mode not in ("full", "streaming", "parallel"):
+        raise ValueError(f"Modo de ingesta no soportado: {mode}")
 
-    # Guardar copias procesadas de raw
-    steam_df.to_csv(os.path.join(output_dir, "steam_raw.csv"), index=False)
-    twitch_df.to_csv(os.path.join(output_dir, "twitch_raw.csv"), index=False)
+    # Leer CSVs
+    if mode == "parallel":
+        # Ambas fuentes son independientes: se leen y guardan a la vez
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            steam_future = pool.submit(ingest_steam)
+            twitch_future = pool.submit(ingest_twitch)
+            steam_df, twitch_df = steam_future.result(), twitch_future.result()
+    else:
+        steam_df = ingest_steam()
+        twitch_df = ingest_twitch()
 
     print("✔ Ingesta completada. Archivos guardados en:", output_dir)
     return steam_df, twitch_df
 
 
+def load_raw_data(config_path: str = "config/pipeline_config.yaml",
+                  steam_cols=None, twitch_cols=None, raw_dir: str = None):
+    """Carga las copias raw guardadas por `ingest_data` leyendo sólo las
+    columnas pedidas. Usa el formato columnar si existe en disco.
+    """
+    if os.path.exists(config_path):
+        with open(config_path, "r", encoding="utf-8") as fh:
+            cfg = yaml.safe_load(fh)
+    else:
+        cfg = {}
+
+    raw_dir = raw_dir or cfg.get("paths", {}).get("raw_data", "data/raw/")
+    steam_df = read_table(os.path.join(raw_dir, "steam_raw"), columns=steam_cols)
+    twitch_df = read_table(os.path.join(raw_dir, "twitch_raw"), columns=twitch_cols)
+    return steam_df, twitch_df
+
+
 if __name__ == "__main__":
     ingest_data()
@@ -1,60 +1,334 @@
 import os
-import json
+import re
+from functools import lru_cache
 import yaml
+import numpy as np
 import pandas as pd
 import unidecode
+from aggregates import (TWITCH_AGGREGATES, TWITCH_PERIOD_COLUMNS, TwitchPartialStore,
+                        build_genre_cube, build_top_games, finalize_partials,
+                        new_periods, twitch_partials)
+from fuzzy_match import DEFAULT_THRESHOLD, recover_unmatched
+from join_keys import KeyIndex, normalize_titles
+from storage import write_table
+
+
+# Primer `description` de la lista de géneros de Steam, p. ej.
+# "[{'id': '1', 'description': 'Action'}, ...]". El valor puede venir entre
+# comillas simples o dobles (Python usa dobles cuando el texto contiene un
+# apóstrofo, p. ej. "Hack 'n' Slash"), así que no se puede reemplazar `'` por
+# `"` y parsear como JSON.
+GENRE_DESCRIPTION_PATTERN = (
+    r"""['"]description['"]\s*:\s*"""
+    r"""(?:'((?:[^'\\]|\\.)*)'|"((?:[^"\\]|\\.)*)")"""
+)
+_GENRE_DESCRIPTION_RE = re.compile(GENRE_DESCRIPTION_PATTERN)
+_ESCAPE_RE = re.compile(r"\\(.)")
 
 
 def extract_genre(x):
-    try:
-        obj = json.loads(x.replace("'", '"'))
-        return obj[0]["description"]
-    except:
+    """Primer género de un valor de `genres` (o `None` si no se puede leer)."""
+    if not isinstance(x, str):
+        return None
+    m = _GENRE_DESCRIPTION_RE.search(x)
+    if m is None:
         return None
+    value = m.group(1) if m.group(1) is not None else m.group(2)
+    return _ESCAPE_RE.sub(r"\1", value)
 
 
-def normalize_genre(g):
-    if not isinstance(g, str):
-        return "Desconocido"
+def extract_genre_column(genres: pd.Series) -> pd.Series:
+    """Versión vectorizada de `extract_genre` para toda la columna `genres`.
+
+    Aplica una sola expresión regular sobre la columna completa en lugar de
+    parsear cada fila con `json.loads`.
+    """
+    parts = genres.astype("string").str.extract(_GENRE_DESCRIPTION_RE)
+    first = parts[0].fillna(parts[1])
+    return first.str.replace(_ESCAPE_RE, r"\1", regex=True)
+
+
+# Subcadena (en minúsculas y sin acentos) -> género normalizado. El orden es
+# la prioridad: si varias claves aparecen en el texto gana la primera.
+GENRE_MAP = {
+    "action": "Acción",
+    "adventure": "Aventura",
+    "casual": "Casual",
+    "simulation": "Simulación",
+    "sport": "Deportes",
+    "rpg": "RPG",
+    "strategy": "Estrategia",
+    "indie": "Indie",
+    "racing": "Carreras",
+    "multiplayer": "MMO",
+    "massively": "MMO",
+    "free to play": "Free To Play",
+    "sexual": "Contenido Adulto",
+    "early access": "Acceso Anticipado",
+}
+
+
+class GenreNormalizer:
+    """Normaliza textos de género según un mapa de subcadenas.
+
+    - Todas las claves se compilan en una sola expresión regular.
+    - Cada texto distinto se normaliza una vez: los resultados quedan en una
+      caché LRU compartida por todas las llamadas.
+    - `normalize_column` factoriza la columna y normaliza sólo sus valores
+      únicos antes de mapearlos de vuelta a las filas.
+
+    `fallback` recibe el texto limpio cuando ninguna clave coincide.
+    """
+
+    def __init__(self, mapping: dict, unknown: str = "Desconocido",
+                 fallback=None, cache_size: int = 4096):
+        self.mapping = dict(mapping)
+        self.unknown = unknown
+        self.fallback = fallback or (lambda g_clean: g_clean.capitalize())
+        keys = list(self.mapping)
+        self._priority = {k: i for i, k in enumerate(keys)}
+        # El lookahead encuentra también coincidencias solapadas, así se
+        # respeta la prioridad del mapa y no sólo la posición en el texto
+        self._pattern = re.compile(
+            "(?=(" + "|".join(re.escape(k) for k in keys) + "))")
+        self.normalize_text = lru_cache(maxsize=cache_size)(self._normalize_text)
+
+    def _normalize_text(self, g: str) -> str:
+        g_clean = unidecode.unidecode(g).lower().strip()
+        found = {m.group(1) for m in self._pattern.finditer(g_clean)}
+        if found:
+            return self.mapping[min(found, key=self._priority.__getitem__)]
+        return self.fallback(g_clean)
+
+    def __call__(self, g):
+        if not isinstance(g, str):
+            return self.unknown
+        return self.normalize_text(g)
+
+    def normalize_column(self, genres: pd.Series) -> pd.Series:
+        """Normaliza una columna completa aplicando la función una sola vez
+        por valor distinto."""
+        codes, uniques = pd.factorize(genres)
+        # El código -1 (nulos) apunta al último elemento: `unknown`
+        labels = np.array([self(u) for u in uniques] + [self.unknown], dtype=object)
+        return pd.Series(labels[codes], index=genres.index, name=genres.name)
+
+
+GENRE_NORMALIZER = GenreNormalizer(GENRE_MAP)
+
+
+# Etiquetas que muestra el dashboard: además de los géneros del pipeline
+# corrige las variantes localizadas de la tienda. Sólo se aplican a los
+# agregados del dashboard y al cargar `merged_data` en sus páginas; el
+# `genre` guardado en `merged_data` (y con él `analysis.py`) no cambia.
+DASHBOARD_GENRE_MAP = {
+    # Acción
+    "accion": "Acción",
+    "accia3n": "Acción",
+    "akcja": "Acción",
+    "akcji": "Acción",
+    "akana": "Acción",
 
-    g_clean = unidecode.unidecode(g).lower().strip()
-
-    mapper = {
-        "action": "Acción",
-        "adventure": "Aventura",
-        "casual": "Casual",
-        "simulation": "Simulación",
-        "sport": "Deportes",
-        "rpg": "RPG",
-        "strategy": "Estrategia",
-        "indie": "Indie",
-        "racing": "Carreras",
-        "multiplayer": "MMO",
-        "massively": "MMO",
-        "free to play": "Free To Play",
-        "sexual": "Contenido Adulto",
-        "early access": "Acceso Anticipado",
-    }
-
-    for key, value in mapper.items():
-        if key in g_clean:
-            return value
+    # Aventura
+    "aventura": "Aventura",
+    "abenteuer": "Aventura",
+    "aventure": "Aventura",
+    "przygodowe": "Aventura",
+    "avent": "Aventura",
+    "przyg": "Aventura",
+    "abente": "Aventura",
 
+    # Casual
+    "casual": "Casual",
+
+    # RPG
+    "rpg": "RPG",
+    "rollenspiel": "RPG",
+
+    # MMO
+    "mmo": "MMO",
+
+    # Indie
+    "indie": "Indie",
+
+    # Estrategia
+    "estrategia": "Estrategia",
+    "estrateg": "Estrategia",
+
+    # Simulación
+    "simulacion": "Simulación",
+    "simu": "Simulación",
+
+    # Deportes
+    "deportes": "Deportes",
+    "sport": "Deportes",
+
+    # Carreras
+    "carreras": "Carreras",
+    "race": "Carreras",
+
+    # Adultos
+    "contenido adulto": "Contenido Adulto",
+    "adult": "Contenido Adulto",
+
+    # Acceso anticipado
+    "acceso anticipado": "Acceso Anticipado",
+    "aassapso": "Acceso Anticipado",
+    "early access": "Acceso Anticipado",
+    "access": "Acceso Anticipado",
+    "early": "Acceso Anticipado",
+}
+
+
+def _dashboard_fallback(g_clean):
+    # Si está corrupto (muchos símbolos raros)
+    if any(char.isdigit() or char in "!*>/<" for char in g_clean):
+        return "Desconocido"
     return g_clean.capitalize()
 
 
-def extract_price(val):
-    try:
-        return float(val.split("'final': ")[1].split(",")[0]) / 100
-    except:
-        return None
+DASHBOARD_GENRES = GenreNormalizer(DASHBOARD_GENRE_MAP, fallback=_dashboard_fallback)
+
+
+def dashboard_genres(genres: pd.Series) -> pd.Series:
+    """Géneros de `merged_data` con las etiquetas que muestra el dashboard."""
+    return DASHBOARD_GENRES.normalize_column(genres).astype("category")
+
+
+def normalize_genre(g):
+    return GENRE_NORMALIZER(g)
+
+
+# Campos de `price_overview` ("{'currency': 'USD', 'initial': 999, 'final':
+# 499, 'discount_percent': 50, ...}") en una sola expresión: cada campo es un
+# lookahead opcional, así el orden de las claves no importa.
+PRICE_OVERVIEW_PATTERN = (
+    r"""^(?:(?=.*?['"]currency['"]\s*:\s*['"]([^'"]*)['"]))?"""
+    r"""(?:(?=.*?['"]initial['"]\s*:\s*(-?\d+)))?"""
+    r"""(?:(?=.*?['"]final['"]\s*:\s*(-?\d+)))?"""
+    r"""(?:(?=.*?['"]discount_percent['"]\s*:\s*(-?\d+)))?"""
+)
+PRICE_COLUMNS = ["price_final", "price_initial", "discount_percent", "currency"]
+
+
+def parse_price_overview(values: pd.Series) -> pd.DataFrame:
+    """Extrae de la columna `price_overview` las columnas tipadas
+    `price_final` y `price_initial` (en unidades de moneda, Steam las guarda
+    en centavos), `discount_percent` y `currency`, recorriendo la columna
+    una sola vez.
+    """
+    parts = values.astype("string").str.extract(PRICE_OVERVIEW_PATTERN)
+    return pd.DataFrame({
+        "price_final": pd.to_numeric(parts[2]).astype("float64") / 100,
+        "price_initial": pd.to_numeric(parts[1]).astype("float64") / 100,
+        "discount_percent": pd.to_numeric(parts[3]).astype("float64"),
+        "currency": parts[0].astype("category"),
+    }, index=values.index)
+
+
+# Columnas que ordenan los registros de un mismo juego (más reciente primero)
+RECENCY_COLUMNS = ["year", "month"]
+
+
+def latest_per_key(df: pd.DataFrame, key: str, order=RECENCY_COLUMNS) -> np.ndarray:
+    """Máscara con el registro más reciente de cada valor de `key`.
+
+    La recencia se mide con las columnas `order` (por defecto año y mes);
+    a igualdad, o si `df` no las tiene, se queda el primer registro. Se
+    resuelve con agregaciones por hash (máximo por clave y primer registro
+    que lo alcanza), sin ordenar la tabla ni copiarla.
+
+    Como el más reciente de un conjunto es el más reciente de sus partes,
+    aplicarla a los supervivientes anteriores más un bloque nuevo equivale a
+    aplicarla a todo el histórico (modos incremental y por bloques).
+    """
+    codes, _ = pd.factorize(df[key], use_na_sentinel=False)
+    if not all(c in df.columns for c in order):
+        return ~pd.Series(codes).duplicated().to_numpy()
+
+    # Posición de cada registro en el orden lexicográfico de `order`
+    rank = np.zeros(len(df), dtype=np.float64)
+    for col in order:
+        values = pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=np.float64,
+                                                                 na_value=np.nan)
+        dense = pd.factorize(values, sort=True)[0]
+        rank = rank * (dense.max() + 2 if len(dense) else 1) + dense + 1
+    best = pd.Series(rank).groupby(codes).max().to_numpy()
+    candidates = np.flatnonzero(rank == best[codes])
+    first = ~pd.Series(codes[candidates]).duplicated().to_numpy()
+    mask = np.zeros(len(df), dtype=bool)
+    mask[candidates[first]] = True
+    return mask
+
+
+# Columnas de texto con pocos valores distintos que se guardan como categorías
+CATEGORICAL_COLUMNS = ["genre", "currency"]
+
+
+def to_analytical_types(df: pd.DataFrame) -> pd.DataFrame:
+    """Tipos compactos para el dataset combinado: categorías para las
+    columnas de `CATEGORICAL_COLUMNS`, enteros reducidos al menor tipo que
+    los contiene y flotantes a `float32` sólo cuando no se pierde precisión.
+    """
+    out = {}
+    for col in df.columns:
+        s = df[col]
+        if col in CATEGORICAL_COLUMNS:
+            s = s.astype("category")
+        elif pd.api.types.is_integer_dtype(s) and not pd.api.types.is_extension_array_dtype(s):
+            s = pd.to_numeric(s, downcast="integer")
+        elif pd.api.types.is_float_dtype(s) and not pd.api.types.is_extension_array_dtype(s):
+            as32 = s.astype("float32")
+            if np.array_equal(as32.to_numpy(dtype="float64"), s.to_numpy(), equal_nan=True):
+                s = as32
+        out[col] = s
+    return pd.DataFrame(out, index=df.index)
+
+
+def report_join(join_stats: dict):
+    """Muestra las estadísticas de la unión Steam↔Twitch."""
+    print(f"✔ Unión Steam↔Twitch: {join_stats['matched']} de {join_stats['left_rows']} "
+          f"juegos de Steam emparejados ({join_stats['match_rate']:.1%}); "
+          f"{join_stats['unmatched_right']} juegos de Twitch sin pareja "
+          f"({join_stats.get('fuzzy_matched', 0)} por similitud de títulos).")
+
+
+def save_outputs(merged: pd.DataFrame, processed_dir: str, fmt: str = "csv",
+                 compression: str = None):
+    """Guarda `merged_data` y, para los KPIs y gráficos del dashboard, los
+    agregados por género `genre_cube` y `top_games`."""
+    write_table(merged, os.path.join(processed_dir, "merged_data"), fmt, compression)
+    # Los agregados usan las etiquetas del dashboard para que sus claves
+    # coincidan con los géneros que muestran las páginas
+    labelled = merged.assign(genre=dashboard_genres(merged["genre"]))
+    write_table(build_genre_cube(labelled), os.path.join(processed_dir, "genre_cube"),
+                fmt, compression)
+    write_table(build_top_games(labelled), os.path.join(processed_dir, "top_games"),
+                fmt, compression)
+    print("✔ Transformación completada. Guardado en:", processed_dir)
 
 
 def transform_data(steam_df, twitch_df, config_path: str = "config/pipeline_config.yaml",
-                   output_dir: str = None):
+                   output_dir: str = None, validator=None):
     """Transforma y normaliza los datasets de Steam y Twitch.
 
     Si `output_dir` no está provisto, se lee desde la configuración.
+
+    Si se pasa un `validator` (`data_validation.ChunkValidator`), Steam se
+    valida ya limpio (con `price` y `genre` calculados) antes de deduplicar
+    y unir con Twitch, para no hacer el merge sobre datos inválidos.
+
+    El resultado se guarda como `merged_data` en el formato de
+    `storage.processed_format` (Feather por defecto), con tipos compactos y
+    un manifiesto `merged_data.schema.json`, para que los lectores no tengan
+    que volver a convertir columnas. Junto a él se guardan los agregados por
+    género `genre_cube` y `top_games` (ver `aggregates.py`).
+
+    Steam y Twitch se unen por la clave de título normalizada de
+    `join_keys.py` (sin marcas ™/®, acentos ni puntuación); las estadísticas
+    de la unión quedan en `merged.attrs["join_stats"]`. Con
+    `matching.fuzzy` los títulos que no coinciden exactamente se emparejan
+    por similitud (ver `fuzzy_match.py`).
     """
     # Leer config si existe
     if os.path.exists(config_path):
@@ -65,97 +339,140 @@ def transform_data(steam_df, twitch_df, config_path: str = "config/pipeline_conf
 
     processed_dir = output_dir or cfg.get("paths", {}).get("processed_data", "data/processed/")
     os.makedirs(processed_dir, exist_ok=True)
+    storage_cfg = cfg.get("storage", {})
+    fmt = storage_cfg.get("processed_format", "csv")
+    compression = storage_cfg.get("processed_compression")
 
     # ---- Steam ----
+    # Las columnas derivadas se calculan como series aparte y las filas se
+    # seleccionan una sola vez al final (filtros combinados en una máscara y
+    # deduplicado): `steam_df` no se modifica ni se copia entero.
+    def steam_column(name):
+        if name in steam_df.columns:
+            return steam_df[name]
+        return pd.Series(None, index=steam_df.index, dtype=object)
+
+    derived = {}
+    genre = GENRE_NORMALIZER.normalize_column(extract_genre_column(steam_column("genres")))
     if "genres" in steam_df.columns:
-        steam_df["genre"] = steam_df["genres"].apply(extract_genre)
-        steam_df["genre"] = steam_df["genre"].apply(normalize_genre)
+        # Rellenar 'genres' con la columna normalizada 'genre' cuando falte
+        derived["genres"] = steam_df["genres"].fillna(genre)
+        derived["genre"] = genre
     else:
-        steam_df["genre"] = None
+        derived["genre"] = pd.Series(None, index=steam_df.index, dtype=object)
 
-    if "name" in steam_df.columns:
-        steam_df["game"] = steam_df["name"].astype(str).str.lower()
-    else:
-        steam_df["game"] = None
+    names = steam_column("name").astype("string")
+    derived["game"] = names.str.lower()
+    derived["title_key"] = normalize_titles(names)
 
     if "price_overview" in steam_df.columns:
-        steam_df["price"] = steam_df["price_overview"].apply(extract_price)
+        prices = parse_price_overview(steam_df["price_overview"])
+        derived.update({c: prices[c] for c in PRICE_COLUMNS})
+        price = prices["price_final"]
     else:
-        steam_df["price"] = None
-
-    # Rellenar 'genres' con la columna normalizada 'genre' cuando falte
-    if "genres" in steam_df.columns:
-        steam_df["genres"] = steam_df["genres"].fillna(steam_df["genre"])
+        price = pd.Series(np.nan, index=steam_df.index)
 
     # Si el juego es gratuito y no tenemos precio, asignar 0
     if "is_free" in steam_df.columns:
         try:
-            steam_df.loc[steam_df["is_free"] == True, "price"] = \
-                steam_df.loc[steam_df["is_free"] == True, "price"].fillna(0)
+            free = (steam_df["is_free"] == True).fillna(False).to_numpy(dtype=bool)
+            price = price.mask(free & price.isna().to_numpy(), 0.0)
         except Exception:
             pass
+    derived["price"] = price
 
-    # Eliminar filas que sigan sin 'price' o sin 'genres'
-    critical_cols = [c for c in ["price", "genres"] if c in steam_df.columns]
-    if critical_cols:
-        steam_df = steam_df.dropna(subset=critical_cols).copy()
+    # Eliminar filas sin 'price', sin 'genres' o sin nombre
+    keep = price.notna()
+    if "genres" in steam_df.columns:
+        keep &= derived["genres"].notna()
+    if "name" in steam_df.columns:
+        keep &= names.notna()
+    rows = np.flatnonzero(keep.to_numpy())
+
+    def steam_view(columns):
+        """Sólo las columnas pedidas de las filas que pasan los filtros."""
+        return pd.DataFrame({c: derived[c] if c in derived else steam_df[c]
+                             for c in columns
+                             if c in derived or c in steam_df.columns}).iloc[rows]
+
+    if validator is not None:
+        validator.update(steam_view(validator.columns))
+        validator.finish()
+
+    # ---- DEDUPLICAR Steam: si hay múltiples filas por juego (por ejemplo por mes/año),
+    # mantener la fila más reciente si existen 'year'/'month', sino mantener la primera.
+    rows = rows[latest_per_key(steam_view(["title_key", *RECENCY_COLUMNS]), "title_key")]
+    # Orden de columnas original, con las derivadas nuevas al final
+    steam = pd.DataFrame({c: (derived[c] if c in derived else steam_df[c]).iloc[rows]
+                          for c in dict.fromkeys([*steam_df.columns, *derived])})
 
     # ---- Twitch ----
-    twitch_df.columns = twitch_df.columns.str.lower()
-    if "game" in twitch_df.columns:
-        twitch_df["game"] = twitch_df["game"].astype(str).str.lower()
-    else:
-        twitch_df["game"] = None
+    # Sólo las columnas necesarias, sin modificar `twitch_df`
+    twitch = twitch_df.rename(columns=str.lower)
 
-    for col in ["hours_watched", "avg_viewers"]:
-        if col in twitch_df.columns:
-            twitch_df[col] = pd.to_numeric(twitch_df[col], errors="coerce")
+    # Modo incremental: sólo se procesan los meses que aún no están en los
+    # agregados parciales guardados
+    store = None
+    if (cfg.get("twitch_aggregation", {}) or {}).get("mode", "full") == "incremental":
+        if all(c in twitch.columns for c in TWITCH_PERIOD_COLUMNS):
+            store = TwitchPartialStore(processed_dir, fmt, compression)
+            stored_partials, stored_periods = store.load()
+            fresh = new_periods(twitch, stored_periods)
+            invalid = int(twitch[TWITCH_PERIOD_COLUMNS].apply(pd.to_numeric, errors="coerce")
+                          .isna().any(axis=1).sum())
+            if invalid:
+                print(f"⚠ {invalid} filas de Twitch sin year/month válidos: "
+                      "no se incluyen en la agregación incremental.")
+            twitch = twitch[fresh]
         else:
-            twitch_df[col] = None
+            print("⚠ Twitch sin columnas year/month: se agrega el histórico completo.")
 
-    # ---- LIMPIEZA: eliminar filas sin nombre/juego ----
-    if "name" in steam_df.columns:
-        steam_df = steam_df[steam_df["name"].notna()].copy()
-    if "game" in twitch_df.columns:
-        twitch_df = twitch_df[twitch_df["game"].notna()].copy()
-
-    # ---- AGREGAR (Twitch): resumir métricas por 'game' para evitar duplicados ----
-    agg_funcs = {
-        "hours_watched": "sum",
-        "hours_streamed": "sum",
-        "peak_viewers": "max",
-        "peak_channels": "max",
-        "streamers": "sum",
-        "avg_viewers": "mean",
-        "avg_channels": "mean",
-        "avg_viewer_ratio": "mean"
-    }
-
-    # Mantener sólo las columnas que existen
-    existing_aggs = {k: v for k, v in agg_funcs.items() if k in twitch_df.columns}
-    if existing_aggs:
-        twitch_agg = twitch_df.groupby("game").agg(existing_aggs).reset_index()
-    else:
-        twitch_agg = twitch_df.drop_duplicates(subset=["game"]).copy()
+    twitch_rows = {"title_key": normalize_titles(twitch["game"]) if "game" in twitch.columns
+                   else pd.Series(None, index=twitch.index, dtype="string")}
+    for col in TWITCH_AGGREGATES:
+        if col in twitch.columns:
+            twitch_rows[col] = pd.to_numeric(twitch[col], errors="coerce")
+        elif col in ("hours_watched", "avg_viewers"):
+            twitch_rows[col] = pd.Series(np.nan, index=twitch.index)
+    if store is not None:
+        twitch_rows.update({c: twitch[c] for c in TWITCH_PERIOD_COLUMNS})
+    twitch_rows = pd.DataFrame(twitch_rows)
+    # ---- LIMPIEZA: eliminar filas sin juego ----
+    twitch_rows = twitch_rows[twitch_rows["title_key"].notna().to_numpy()]
 
-    # ---- DEDUPLICAR Steam: si hay múltiples filas por juego (por ejemplo por mes/año),
-    # mantener la fila más reciente si existen 'year'/'month', sino mantener la primera.
-    if "year" in steam_df.columns and "month" in steam_df.columns:
-        steam_df = steam_df.sort_values(["year", "month"], ascending=[False, False])
-        steam_df = steam_df.drop_duplicates(subset=["game"], keep="first").copy()
+    # ---- AGREGAR (Twitch): resumir métricas por juego para evitar duplicados.
+    # Los agregados parciales (sumas, máximos, suma y conteo de las medias)
+    # permiten sumar meses nuevos sin recalcular el histórico. Los títulos
+    # normalizados se indexan como enteros compactos para la unión.
+    if store is not None:
+        partials = store.fold(twitch_rows, stored_partials, stored_periods)
     else:
-        steam_df = steam_df.drop_duplicates(subset=["game"], keep="first").copy()
-
-    # ---- MERGE ----
-    merged = pd.merge(steam_df, twitch_agg, on="game", how="inner")
+        partials = twitch_partials(twitch_rows)
+    twitch_agg = finalize_partials(partials)
+    twitch_index = KeyIndex(twitch_agg["title_key"])
+    twitch_agg = twitch_agg.drop(columns="title_key")
 
-    merged.to_csv(os.path.join(processed_dir, "merged_data.csv"), index=False)
+    # ---- EMPAREJAMIENTO APROXIMADO (opcional): títulos sin pareja exacta ----
+    matching_cfg = cfg.get("matching", {}) or {}
+    fuzzy_matched = 0
+    if matching_cfg.get("fuzzy", False):
+        steam["title_key"], fuzzy_matched = recover_unmatched(
+            steam["title_key"], twitch_index, processed_dir,
+            matching_cfg.get("threshold", DEFAULT_THRESHOLD),
+            matching_cfg.get("workers"), fmt)
 
-    print("✔ Transformación completada. Guardado en:", processed_dir)
+    # ---- MERGE (por clave de título normalizada) ----
+    joined, join_stats = twitch_index.join(steam, "title_key", twitch_agg)
+    join_stats["fuzzy_matched"] = fuzzy_matched
+    merged = to_analytical_types(joined.drop(columns="title_key"))
+    merged.attrs["join_stats"] = join_stats
+    report_join(join_stats)
+    save_outputs(merged, processed_dir, fmt, compression)
     return merged
 
 
 if __name__ == "__main__":
-    df1 = pd.read_csv("data/raw/steam_raw.csv")
-    df2 = pd.read_csv("data/raw/twitch_raw.csv")
+    from data_ingestion import STEAM_TRANSFORM_COLUMNS, load_raw_data
+
+    df1, df2 = load_raw_data(steam_cols=STEAM_TRANSFORM_COLUMNS)
     transform_data(df1, df2)
@@ -1,53 +1,316 @@
+import os
+import yaml
+import numpy as np
 import pandas as pd
 
 
-def validate_data(df: pd.DataFrame):
-    """Valida un DataFrame y devuelve una lista de errores.
+# Reglas que aplica `validate_data` si no se indican otras. Mismo formato que
+# el bloque `validations` de la configuración: lista de `{regla: parámetros}`.
+DEFAULT_RULES = [
+    {"check_required": {"columns": ["name", "genres", "price"]}},
+    {"check_not_null": {"columns": ["name", "genres", "price"]}},
+    {"check_unique": {"columns": ["name"]}},
+    {"check_positive": {"columns": ["price"]}},
+]
 
-    Reglas aplicadas:
-    - Comprobar columnas requeridas: `name`, `genres`, `price`.
-    - Detectar valores vacíos en las columnas requeridas.
-    - Detección de duplicados por `name` (si existe).
-    - Comprobación de rangos simples para `price` (>=0) cuando exista.
+# Reglas que se evalúan fila a fila sobre una columna
+_ROW_RULES = ("check_not_null", "check_unique", "check_positive")
 
-    Retorna:
-        errors (list): lista de mensajes de error vacía si no hay errores.
+
+def _column_masks(col: pd.Series, rules) -> dict:
+    """Máscaras de filas que incumplen cada regla de `rules` sobre `col`.
+
+    La columna se convierte una sola vez: en las numéricas los nulos y los
+    negativos salen del mismo arreglo. Los nulos no cuentan como negativos;
+    eso lo revisa `check_not_null`.
+    """
+    masks = {}
+    numeric = pd.api.types.is_numeric_dtype(col)
+    if "check_positive" in rules or (numeric and "check_not_null" in rules):
+        values = (col if numeric else pd.to_numeric(col, errors="coerce")).to_numpy(
+            dtype="float64", na_value=np.nan)
+        if "check_positive" in rules:
+            masks["check_positive"] = np.less(values, 0)
+        if numeric and "check_not_null" in rules:
+            masks["check_not_null"] = np.isnan(values)
+    if "check_not_null" in rules and "check_not_null" not in masks:
+        masks["check_not_null"] = col.isna().to_numpy()
+    if "check_unique" in rules:
+        masks["check_unique"] = col.duplicated().to_numpy()
+    return masks
+
+
+def _rules_by_column(pairs) -> dict:
+    """`{columna: [reglas]}` a partir de pares `(regla, columna)`."""
+    by_column = {}
+    for rule, column in pairs:
+        by_column.setdefault(column, []).append(rule)
+    return by_column
+
+
+_MESSAGES = {
+    "check_required": "Falta la columna requerida: {column}",
+    "check_not_null": "Valores vacíos encontrados en '{column}' ({failed} filas).",
+    "check_unique": "Hay juegos duplicados en la columna '{column}' ({failed} filas).",
+    "check_positive": "Existen valores negativos en '{column}' ({failed} filas, inválido).",
+    "ensure_merge_not_empty": "El dataset combinado está vacío.",
+}
+
+
+class ValidationError(ValueError):
+    """Error de validación que detiene el pipeline. `results` tiene el
+    detalle por regla en el formato de `run_rules`."""
+
+    def __init__(self, message: str, results: list = None):
+        super().__init__(message)
+        self.results = results or []
+
+
+class BloomFilter:
+    """Conjunto aproximado de hashes de 64 bits sobre un arreglo de bits.
+
+    No tiene falsos negativos; la tasa de falsos positivos es ~`error_rate`
+    mientras no se superen `capacity` elementos. Usa memoria fija
+    (~1.2 MB por millón de elementos al 1 %).
+    """
+
+    def __init__(self, capacity: int = 2_000_000, error_rate: float = 0.01):
+        self.size = int(-capacity * np.log(error_rate) / np.log(2) ** 2)
+        self.hashes = max(1, round(self.size / capacity * np.log(2)))
+        self.bits = np.zeros((self.size + 7) // 8, dtype=np.uint8)
+
+    def _positions(self, hashes: np.ndarray) -> np.ndarray:
+        # Doble hashing: h1 + i * h2 a partir de las dos mitades del hash
+        h1 = hashes & np.uint64(0xFFFFFFFF)
+        h2 = (hashes >> np.uint64(32)) | np.uint64(1)
+        i = np.arange(self.hashes, dtype=np.uint64)[:, None]
+        return (h1 + i * h2) % np.uint64(self.size)
+
+    def add_and_check(self, hashes: np.ndarray) -> np.ndarray:
+        """Agrega `hashes` (sin repetidos entre sí) y devuelve qué elementos
+        ya estaban (posiblemente)."""
+        pos = self._positions(hashes)
+        byte, bit = pos // np.uint64(8), (pos % np.uint64(8)).astype(np.uint8)
+        present = ((self.bits[byte] >> bit) & 1).all(axis=0).astype(bool)
+        np.bitwise_or.at(self.bits, byte.ravel(), (np.uint8(1) << bit).ravel())
+        return present
+
+
+class ChunkValidator:
+    """Validación por bloques durante la ingesta y la transformación.
+
+    Mantiene conteos acumulados de nulos, negativos y nombres duplicados
+    (con un `BloomFilter`) y lanza `ValidationError` en cuanto la proporción
+    de filas inválidas de alguna columna supera su umbral, sin esperar a
+    terminar de leer. Las proporciones se evalúan desde que se vieron
+    `min_rows` filas (antes serían poco representativas) y siempre en
+    `finish()`.
+
+    Los umbrales son proporciones máximas por columna, p. ej.
+    `ChunkValidator(not_null={"name": 0.05}, unique={"name": 0.2})`. Las
+    columnas que no estén en un bloque se ignoran.
+    """
+
+    def __init__(self, name: str = "stream", not_null: dict = None,
+                 non_negative: dict = None, unique: dict = None,
+                 min_rows: int = 10_000, bloom_capacity: int = 2_000_000):
+        self.name = name
+        self.thresholds = {
+            "check_not_null": dict(not_null or {}),
+            "check_positive": dict(non_negative or {}),
+            "check_unique": dict(unique or {}),
+        }
+        self.min_rows = min_rows
+        self.rows = 0
+        self.counts = {(r, c): 0 for r, cols in self.thresholds.items() for c in cols}
+        self.samples = {key: [] for key in self.counts}
+        self._seen = {c: BloomFilter(bloom_capacity) for c in self.thresholds["check_unique"]}
+
+    @property
+    def columns(self) -> set:
+        """Columnas que revisa el validador."""
+        return {column for _, column in self.counts}
+
+    @classmethod
+    def from_config(cls, cfg: dict, stage: str):
+        """Validador de `stage` según `streaming_validation` en la
+        configuración, o `None` si está deshabilitado o no hay reglas."""
+        stream_cfg = cfg.get("streaming_validation", {}) or {}
+        rules = stream_cfg.get(stage)
+        if not stream_cfg.get("enabled", False) or not rules:
+            return None
+        return cls(stage, rules.get("not_null"), rules.get("non_negative"),
+                   rules.get("unique"), stream_cfg.get("min_rows", 10_000),
+                   stream_cfg.get("bloom_capacity", 2_000_000))
+
+    def _duplicates(self, col: pd.Series) -> np.ndarray:
+        values = col.dropna()
+        hashes = pd.util.hash_pandas_object(values, index=False).to_numpy()
+        mask = np.zeros(len(col), dtype=bool)
+        dup_in_chunk = pd.Series(hashes).duplicated().to_numpy()
+        first = ~dup_in_chunk
+        dup = dup_in_chunk.copy()
+        dup[first] = self._seen[col.name].add_and_check(hashes[first])
+        mask[np.flatnonzero(col.notna().to_numpy())] = dup
+        return mask
+
+    def update(self, chunk: pd.DataFrame, sample_size: int = 5):
+        """Acumula los conteos del bloque y aplica los umbrales."""
+        self.rows += len(chunk)
+        for column, rules in _rules_by_column(self.counts).items():
+            if column not in chunk.columns:
+                continue
+            # Duplicados contra todo lo ya visto, no sólo dentro del bloque
+            masks = _column_masks(chunk[column], [r for r in rules if r != "check_unique"])
+            if "check_unique" in rules:
+                masks["check_unique"] = self._duplicates(chunk[column])
+            for rule, mask in masks.items():
+                failed = int(mask.sum())
+                if failed:
+                    self.counts[(rule, column)] += failed
+                    room = sample_size - len(self.samples[(rule, column)])
+                    if room > 0:
+                        self.samples[(rule, column)] += chunk.index[mask][:room].tolist()
+        if self.rows >= self.min_rows:
+            self._check()
+        return self
+
+    def finish(self) -> list:
+        """Aplica los umbrales sobre el total y devuelve los resultados."""
+        self._check()
+        return self.results()
+
+    def results(self) -> list:
+        out = []
+        for (rule, column), failed in self.counts.items():
+            result = {"rule": rule, "column": column, "failed": failed,
+                      "sample": self.samples[(rule, column)],
+                      "ratio": failed / self.rows if self.rows else 0.0,
+                      "threshold": self.thresholds[rule][column]}
+            if failed:
+                result["message"] = _MESSAGES[rule].format(**result)
+            out.append(result)
+        return out
+
+    def _check(self):
+        exceeded = [r for r in self.results() if r["ratio"] > r["threshold"]]
+        if exceeded:
+            detail = "; ".join(f"{r['message']} {r['ratio']:.1%} > {r['threshold']:.1%}"
+                               for r in exceeded)
+            raise ValidationError(
+                f"Validación en {self.name} tras {self.rows} filas: {detail}", exceeded)
+
+
+def load_rules(config_path: str = "config/pipeline_config.yaml") -> list:
+    """`DEFAULT_RULES` más las reglas del bloque `validations` de la
+    configuración."""
+    if os.path.exists(config_path):
+        with open(config_path, "r", encoding="utf-8") as fh:
+            cfg = yaml.safe_load(fh)
+    else:
+        cfg = {}
+    return DEFAULT_RULES + (cfg.get("validations") or [])
+
+
+def compile_rules(specs: list) -> list:
+    """Convierte reglas en formato de configuración en una lista plana de
+    `(regla, columna)` sin repetidos (`columna` es `None` para las reglas
+    sobre todo el dataset)."""
+    compiled = []
+    for spec in specs:
+        for rule, params in spec.items():
+            if rule == "ensure_merge_not_empty":
+                if params:
+                    compiled.append((rule, None))
+                continue
+            if rule not in _ROW_RULES and rule != "check_required":
+                raise ValueError(f"Regla de validación desconocida: {rule}")
+            for column in (params or {}).get("columns", []):
+                if (rule, column) not in compiled:
+                    compiled.append((rule, column))
+    return compiled
+
+
+def run_rules(df: pd.DataFrame, rules: list, sample_size: int = 5) -> list:
+    """Evalúa las reglas compiladas y devuelve un resultado por regla:
+    `{"rule", "column", "failed", "sample", "message"}`, con `failed` el
+    número de filas que la incumplen y `sample` los índices de algunas.
+
+    Cada columna se extrae y se convierte una sola vez para todas las
+    reglas que la usan (ver `_column_masks`).
     """
-    errors = []
+    masks = {}
+    for column, column_rules in _rules_by_column(rules).items():
+        checks = [r for r in column_rules if r in _ROW_RULES]
+        if checks and column in df.columns:
+            for rule, mask in _column_masks(df[column], checks).items():
+                masks[(rule, column)] = mask
 
-    required_cols = ["name", "genres", "price"]
+    results = []
+    for rule, column in rules:
+        result = {"rule": rule, "column": column, "failed": 0, "sample": []}
+        if rule == "ensure_merge_not_empty":
+            result["failed"] = int(len(df) == 0)
+        elif column not in df.columns:
+            result["failed"] = None if rule != "check_required" else 1
+            if rule != "check_required":
+                result["message"] = f"Falta la columna requerida: {column}"
+        elif rule != "check_required":
+            mask = masks[(rule, column)]
+            result["failed"] = int(mask.sum())
+            if result["failed"]:
+                result["sample"] = df.index[mask][:sample_size].tolist()
+        if result["failed"] and "message" not in result:
+            result["message"] = _MESSAGES[rule].format(**result)
+        results.append(result)
+    return results
+
+
+def report_errors(results: list) -> list:
+    """Mensajes de las reglas que fallaron."""
+    return [r["message"] for r in results if r["failed"] or r["failed"] is None]
+
+
+def validate_report(df: pd.DataFrame, rules: list = None) -> list:
+    """Resultados por regla (ver `run_rules`) de `rules`, o de
+    `DEFAULT_RULES` si no se indican. Si falta alguna columna requerida sólo
+    se reportan esas faltas."""
+    compiled = compile_rules(DEFAULT_RULES if rules is None else rules)
 
     # 1) Columnas requeridas
-    for col in required_cols:
-        if col not in df.columns:
-            errors.append(f"Falta la columna requerida: {col}")
+    required = run_rules(df, [(r, c) for r, c in compiled if r == "check_required"])
 
-    # Si faltan columnas, retornamos errores encontrados hasta ahora
-    if errors:
-        return errors
+    # Si faltan columnas, retornamos lo encontrado hasta ahora
+    if report_errors(required):
+        return required
 
-    # 2) Valores vacíos
-    if df[required_cols].isnull().any(axis=None):
-        errors.append("Valores vacíos encontrados")
+    # 2) Resto de reglas, agrupadas por columna
+    return required + run_rules(df, [(r, c) for r, c in compiled if r != "check_required"])
 
-    # 3) Duplicados por nombre
-    if "name" in df.columns and df["name"].duplicated().sum() > 0:
-        errors.append("Hay juegos duplicados en la columna 'name'.")
 
-    # 4) Rangos
-    if "price" in df.columns:
-        try:
-            invalid_prices = (pd.to_numeric(df["price"], errors="coerce") < 0).sum()
-            if invalid_prices > 0:
-                errors.append("Existen precios negativos (inválido).")
-        except Exception:
-            errors.append("No se pudo validar la columna 'price'.")
+def validate_data(df: pd.DataFrame, rules: list = None):
+    """Valida un DataFrame y devuelve una lista de errores.
 
-    return errors
+    Reglas aplicadas por defecto (`DEFAULT_RULES`):
+    - Comprobar columnas requeridas: `name`, `genres`, `price`.
+    - Detectar valores vacíos en las columnas requeridas.
+    - Detección de duplicados por `name` (si existe).
+    - Comprobación de rangos simples para `price` (>=0) cuando exista.
+
+    `rules` acepta reglas en el formato del bloque `validations` de la
+    configuración (ver `load_rules`). Para conteos por regla e índices de
+    filas inválidas usar `validate_report`.
+
+    Retorna:
+        errors (list): lista de mensajes de error vacía si no hay errores.
+    """
+    return report_errors(validate_report(df, rules))
 
 
 if __name__ == "__main__":
-    df = pd.read_csv("data/processed/merged_data.csv")
+    from storage import read_table
+
+    df = read_table("data/processed/merged_data")
     errs = validate_data(df)
     if errs:
         print("Validación fallida:")
@@ -0,0 +1,203 @@
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from difflib import SequenceMatcher
+import numpy as np
+import pandas as pd
+from pipeline_cache import PipelineCache, stage_key
+from storage import find_table, read_table, write_table
+
+
+DEFAULT_THRESHOLD = 0.9
+NGRAM = 3
+# Candidatos por título que pasan al comparador fino
+MAX_CANDIDATES = 5
+# Por debajo de este número de consultas no compensa lanzar procesos
+MIN_PARALLEL_QUERIES = 2_000
+
+NUMBER_PATTERN = re.compile(r"\d+")
+
+MATCH_COLUMNS = ["query", "match", "score"]
+
+
+def ngrams(text: str, n: int = NGRAM) -> set:
+    """N-gramas de caracteres de `text`, con un espacio de relleno a cada
+    lado para que el inicio y el final de las palabras pesen."""
+    padded = f" {text} "
+    return {padded[i:i + n] for i in range(max(1, len(padded) - n + 1))}
+
+
+class NgramIndex:
+    """Índice invertido de n-gramas sobre claves de título normalizadas.
+
+    Las listas de apariciones se guardan como un único arreglo ordenado por
+    n-grama (`postings`) con sus desplazamientos (`offsets`), así que buscar
+    candidatos es concatenar unas pocas rebanadas y contarlas, sin comparar
+    cada consulta con todos los títulos.
+    """
+
+    def __init__(self, keys, n: int = NGRAM):
+        self.keys = list(keys)
+        self.n = n
+        vocab, grams, docs = {}, [], []
+        self.sizes = np.empty(len(self.keys), dtype=np.int64)
+        for doc, key in enumerate(self.keys):
+            key_grams = ngrams(key, n)
+            self.sizes[doc] = len(key_grams)
+            for gram in key_grams:
+                grams.append(vocab.setdefault(gram, len(vocab)))
+                docs.append(doc)
+        grams = np.asarray(grams, dtype=np.int64)
+        counts = np.bincount(grams, minlength=len(vocab))
+        self.postings = np.asarray(docs, dtype=np.int64)[np.argsort(grams, kind="stable")]
+        self.offsets = np.concatenate([[0], np.cumsum(counts)])
+        self.posting_sizes = counts
+        self.vocab = vocab
+
+    def candidates(self, query: str, k: int = MAX_CANDIDATES):
+        """Hasta `k` posiciones de títulos que más n-gramas comparten con
+        `query`, de mayor a menor.
+
+        Sólo se recorren las listas de la mitad más rara de los n-gramas de
+        la consulta (filtrado por prefijo): un título que no comparta
+        ninguno de ellos no puede compartir la mitad de los n-gramas, y se
+        evitan las listas enormes de n-gramas comunes como " th".
+        """
+        query_grams = ngrams(query, self.n)
+        ids = np.array([self.vocab[g] for g in query_grams if g in self.vocab],
+                       dtype=np.int64)
+        if not len(ids):
+            return ids
+        ids = ids[np.argsort(self.posting_sizes[ids], kind="stable")][:len(query_grams) // 2 + 1]
+        # Se cuentan sólo las apariciones tocadas: el costo depende de las
+        # listas recorridas, no del número de títulos del índice
+        docs, shared = np.unique(
+            np.concatenate([self.postings[self.offsets[i]:self.offsets[i + 1]] for i in ids]),
+            return_counts=True)
+        if len(docs) > k:
+            kth = np.partition(shared, len(shared) - k)[len(shared) - k]
+            docs, shared = docs[shared >= kth], shared[shared >= kth]
+        # Más n-gramas compartidos primero; a igualdad, tamaño más parecido
+        order = np.lexsort((np.abs(self.sizes[docs] - len(query_grams)), -shared))
+        return docs[order[:k]]
+
+    def best_match(self, query: str, threshold: float = DEFAULT_THRESHOLD):
+        """`(título, puntaje)` del mejor candidato o `(None, mejor puntaje)`.
+
+        Los candidatos se puntúan con `SequenceMatcher`; los números del
+        título deben coincidir para no unir secuelas ("halo 2" / "halo 3").
+        """
+        numbers = NUMBER_PATTERN.findall(query)
+        best, best_score = None, 0.0
+        for doc in self.candidates(query):
+            key = self.keys[doc]
+            if NUMBER_PATTERN.findall(key) != numbers:
+                continue
+            score = SequenceMatcher(None, query, key).ratio()
+            if score > best_score:
+                best, best_score = key, score
+        return (best, best_score) if best_score >= threshold else (None, best_score)
+
+
+# Índice compartido por los procesos de `match_titles` (se envía una sola vez
+# a cada proceso en el inicializador, no con cada lote)
+_WORKER_INDEX = None
+
+
+def _init_worker(index: NgramIndex):
+    global _WORKER_INDEX
+    _WORKER_INDEX = index
+
+
+def _match_batch(queries, threshold: float):
+    return [(q, *_WORKER_INDEX.best_match(q, threshold)) for q in queries]
+
+
+def match_titles(queries, keys, threshold: float = DEFAULT_THRESHOLD,
+                 workers: int = None) -> pd.DataFrame:
+    """Empareja cada título de `queries` con el más parecido de `keys`.
+
+    Devuelve una fila por consulta con `match` (o `None` si ninguno supera
+    `threshold`) y su `score`. Cada título de `keys` se asigna como mucho a
+    una consulta (la de mayor puntaje). Con muchas consultas el trabajo se
+    reparte en `workers` procesos.
+    """
+    queries = list(dict.fromkeys(queries))
+    if not queries:
+        return pd.DataFrame(columns=MATCH_COLUMNS)
+    index = NgramIndex(keys)
+    if workers == 1 or len(queries) < MIN_PARALLEL_QUERIES:
+        _init_worker(index)
+        rows = _match_batch(queries, threshold)
+    else:
+        workers = workers or os.cpu_count() or 1
+        size = -(-len(queries) // (workers * 4))
+        batches = [queries[i:i + size] for i in range(0, len(queries), size)]
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(index,)) as pool:
+            rows = [row for batch in pool.map(_match_batch, batches,
+                                              [threshold] * len(batches))
+                    for row in batch]
+
+    table = pd.DataFrame(rows, columns=MATCH_COLUMNS)
+    # Emparejamiento uno a uno: si dos consultas eligen el mismo título se
+    # queda la de mayor puntaje
+    table = table.sort_values("score", ascending=False, kind="stable")
+    taken = table["match"].notna() & table.duplicated(subset="match")
+    table.loc[taken, "match"] = None
+    return table.sort_index().reset_index(drop=True)
+
+
+def cached_match_titles(queries, keys, cache_dir: str,
+                        threshold: float = DEFAULT_THRESHOLD, workers: int = None,
+                        fmt: str = "parquet") -> pd.DataFrame:
+    """`match_titles` con la tabla de emparejamientos guardada en
+    `cache_dir/fuzzy_matches` entre ejecuciones.
+
+    Mientras el conjunto de `keys` y el umbral no cambien, las consultas ya
+    resueltas (incluidas las que no encontraron pareja) se reutilizan y sólo
+    se buscan las nuevas.
+    """
+    base = os.path.join(cache_dir, "fuzzy_matches")
+    cache = PipelineCache(os.path.join(cache_dir, ".fuzzy_cache.json"))
+    index_key = stage_key(sorted(keys), threshold, NGRAM)
+    queries = list(dict.fromkeys(queries))
+
+    known = pd.DataFrame(columns=MATCH_COLUMNS)
+    if cache.lookup("fuzzy_matches", index_key) is not None and find_table(base):
+        known = read_table(base)
+    seen = set(known["query"])
+    pending = [q for q in queries if q not in seen]
+    if pending:
+        taken = set(known["match"].dropna())
+        new = match_titles(pending, [k for k in keys if k not in taken],
+                           threshold, workers)
+        known = pd.concat([known, new], ignore_index=True) if len(known) else new
+        path = write_table(known.astype({"match": object}), base, fmt)
+        cache.store("fuzzy_matches", index_key, [path])
+    return known[known["query"].isin(queries)].reset_index(drop=True)
+
+
+def recover_unmatched(left_keys: pd.Series, index, cache_dir: str,
+                      threshold: float = DEFAULT_THRESHOLD, workers: int = None,
+                      fmt: str = "parquet"):
+    """Reasigna las claves de `left_keys` (Steam) sin pareja exacta en
+    `index` (`join_keys.KeyIndex` de Twitch) a la clave de Twitch sin pareja
+    más parecida.
+
+    Sólo se comparan los títulos que quedaron fuera de la unión exacta.
+    Devuelve las claves reasignadas y el número de emparejamientos nuevos.
+    """
+    codes = index.lookup(left_keys)
+    matched = np.zeros(len(index), dtype=bool)
+    matched[codes[codes >= 0]] = True
+    unmatched_left = left_keys[(codes < 0) & left_keys.notna().to_numpy()].unique()
+    unmatched_right = index.keys[~matched]
+    if not len(unmatched_left) or not len(unmatched_right):
+        return left_keys, 0
+
+    table = cached_match_titles(unmatched_right, unmatched_left, cache_dir,
+                                threshold, workers, fmt)
+    found = table.dropna(subset=["match"])
+    remap = pd.Series(found["query"].to_numpy(), index=found["match"].to_numpy())
+    return left_keys.map(remap).fillna(left_keys), len(found)
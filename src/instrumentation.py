@@ -0,0 +1,136 @@
+import json
+import os
+import sys
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def peak_rss_mb():
+    """Pico de memoria residente de todo el proceso desde su inicio (MB), o
+    `None` si la plataforma no lo expone. No baja entre etapas: lo que sube
+    durante una etapa se registra como `rss_growth_mb`."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux lo reporta en KB, macOS en bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _size(paths) -> int:
+    return sum(os.path.getsize(p) for p in paths if p and os.path.exists(p))
+
+
+class RunReport:
+    """Métricas por etapa de una ejecución del pipeline.
+
+    Cada etapa se mide con `stage()`: tiempo real, tiempo de CPU, memoria,
+    filas de entrada/salida y bytes leídos/escritos. Cada registro se agrega
+    como una línea JSON a `log_file`.
+
+    La memoria se registra como `process_peak_rss_mb` (pico de RSS de todo
+    el proceso hasta el final de la etapa, acumulado con las anteriores),
+    `rss_growth_mb` (cuánto subió ese pico durante la etapa; 0 si la etapa
+    no superó el máximo previo) y, si `trace_memory`, `peak_traced_mb` (pico
+    de `tracemalloc` durante la etapa).
+
+    `bytes_read` se calcula con el tamaño de `inputs`; una etapa que sólo
+    lee parte de ellos puede fijarlo directamente en el registro.
+
+    Uso:
+        report = RunReport("pipeline_execution.log")
+        with report.stage("ingestion", inputs=[steam_file]) as rec:
+            ...
+            rec["rows_out"] = len(df)
+            rec["outputs"] = [ruta_artefacto]
+        report.finish()
+    """
+
+    def __init__(self, log_file: str = None, trace_memory: bool = False):
+        self.log_file = log_file
+        self.trace_memory = trace_memory
+        self.run_id = uuid.uuid4().hex[:12]
+        self.started = time.time()
+        self.stages = []
+
+    @contextmanager
+    def stage(self, name: str, inputs=(), rows_in: int = None):
+        record = {"stage": name, "rows_in": rows_in, "rows_out": None,
+                  "inputs": list(inputs), "outputs": [], "bytes_read": None,
+                  "cached": False}
+        if self.trace_memory:
+            if tracemalloc.is_tracing():
+                tracemalloc.reset_peak()
+            else:
+                tracemalloc.start()
+        rss_before = peak_rss_mb()
+        wall, cpu = time.perf_counter(), time.process_time()
+        status = "ok"
+        try:
+            yield record
+        except BaseException:
+            status = "error"
+            raise
+        finally:
+            record["status"] = status
+            record["wall_s"] = round(time.perf_counter() - wall, 4)
+            record["cpu_s"] = round(time.process_time() - cpu, 4)
+            record["process_peak_rss_mb"] = peak_rss_mb()
+            record["rss_growth_mb"] = (None if rss_before is None
+                                       else record["process_peak_rss_mb"] - rss_before)
+            if self.trace_memory:
+                record["peak_traced_mb"] = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+            inputs = record.pop("inputs")
+            if record["bytes_read"] is None:
+                record["bytes_read"] = _size(inputs)
+            record["bytes_written"] = _size(record.pop("outputs"))
+            self.stages.append(record)
+            self._log(dict(record, event="stage"))
+
+    def finish(self, status: str = "ok") -> dict:
+        """Registra y muestra el resumen de la ejecución."""
+        if self.trace_memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        summary = {
+            "event": "run_summary",
+            "status": status,
+            "wall_s": round(time.time() - self.started, 4),
+            "cpu_s": round(sum(s["cpu_s"] for s in self.stages), 4),
+            "process_peak_rss_mb": peak_rss_mb(),
+            "slowest_stage": max(self.stages, key=lambda s: s["wall_s"])["stage"]
+            if self.stages else None,
+            "stages": len(self.stages),
+        }
+        self._log(summary)
+        print(self.format_summary(summary))
+        return summary
+
+    def format_summary(self, summary: dict) -> str:
+        lines = ["Resumen de la ejecución:",
+                 f"  {'etapa':<16}{'tiempo(s)':>10}{'cpu(s)':>10}{'+rss(MB)':>10}"
+                 f"{'filas in':>12}{'filas out':>12}  caché"]
+        for s in self.stages:
+            rss = f"{s['rss_growth_mb']:.0f}" if s["rss_growth_mb"] is not None else "-"
+            rows_in = s["rows_in"] if s["rows_in"] is not None else "-"
+            rows_out = s["rows_out"] if s["rows_out"] is not None else "-"
+            lines.append(f"  {s['stage']:<16}{s['wall_s']:>10.2f}{s['cpu_s']:>10.2f}{rss:>10}"
+                         f"{rows_in:>12}{rows_out:>12}  {'sí' if s['cached'] else 'no'}")
+        rss = summary["process_peak_rss_mb"]
+        lines.append(f"  Total: {summary['wall_s']:.2f}s ({summary['status']})"
+                     + (f", pico de RSS del proceso {rss:.0f} MB" if rss is not None else ""))
+        return "\n".join(lines)
+
+    def _log(self, record: dict):
+        if not self.log_file:
+            return
+        record = dict(record, run_id=self.run_id,
+                      timestamp=time.strftime("%Y-%m-%dT%H:%M:%S"))
+        os.makedirs(os.path.dirname(self.log_file) or ".", exist_ok=True)
+        with open(self.log_file, "a", encoding="utf-8") as fh:
+            fh.write(json.dumps(record, ensure_ascii=False) + "\n")
@@ -0,0 +1,88 @@
+import re
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+from unidecode import unidecode
+
+
+# Símbolos que aparecen pegados a los títulos y no forman parte del nombre
+TITLE_SYMBOLS_PATTERN = re.compile(r"[™®©℠]")
+# Apóstrofes: "Assassin's" y "Assassins" deben dar la misma clave
+APOSTROPHE_PATTERN = re.compile(r"['`]")
+NON_ALNUM_PATTERN = re.compile(r"[^0-9a-z]+")
+
+
+@lru_cache(maxsize=500_000)
+def normalize_title(title):
+    """Clave de unión de un título: sin marcas registradas, acentos,
+    apóstrofes ni puntuación, en minúsculas y con espacios simples.
+    Devuelve `None` si el título está vacío."""
+    if title is None or (isinstance(title, float) and np.isnan(title)):
+        return None
+    text = unidecode(TITLE_SYMBOLS_PATTERN.sub("", str(title))).lower()
+    text = APOSTROPHE_PATTERN.sub("", text.replace("&", " and "))
+    text = NON_ALNUM_PATTERN.sub(" ", text).strip()
+    return text or None
+
+
+def normalize_titles(titles: pd.Series) -> pd.Series:
+    """Versión por columna de `normalize_title`: cada título distinto se
+    normaliza una sola vez."""
+    codes, uniques = pd.factorize(titles)
+    normalized = np.array([normalize_title(t) for t in uniques] + [None], dtype=object)
+    return pd.Series(normalized[codes], index=titles.index, dtype=object)
+
+
+class KeyIndex:
+    """Índice hash de claves de título normalizadas a enteros compactos.
+
+    Se construye una vez sobre un lado de la unión (Twitch) y se reutiliza
+    para buscar las claves del otro lado sin volver a comparar cadenas:
+    `codes` asigna a cada fila de `keys` su entero (-1 si no tiene clave) y
+    `lookup` devuelve el entero de cada clave buscada (-1 si no está).
+    """
+
+    def __init__(self, keys: pd.Series):
+        codes, uniques = pd.factorize(keys)
+        self.codes = codes
+        self.keys = pd.Index(uniques)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def lookup(self, keys: pd.Series) -> np.ndarray:
+        codes, uniques = pd.factorize(keys)
+        positions = np.append(self.keys.get_indexer(uniques), -1)
+        return positions[codes]
+
+    def join(self, left: pd.DataFrame, on: str, right: pd.DataFrame,
+             suffixes=("_x", "_y")):
+        """Unión interna de `left` (por su columna de claves `on`) con
+        `right`, que debe tener una fila por clave en el orden de `keys`
+        (p. ej. el resultado de `groupby(index.codes)`).
+
+        Devuelve el resultado y las estadísticas de la unión.
+        """
+        if len(right) != len(self.keys):
+            raise ValueError("`right` debe tener una fila por clave del índice")
+        codes = self.lookup(left[on])
+        matched = codes >= 0
+        matched_codes = codes[matched]
+
+        left_part = left[matched].reset_index(drop=True)
+        right_part = right.take(matched_codes).reset_index(drop=True)
+        overlap = left_part.columns.intersection(right_part.columns)
+        if len(overlap):
+            left_part = left_part.rename(columns={c: c + suffixes[0] for c in overlap})
+            right_part = right_part.rename(columns={c: c + suffixes[1] for c in overlap})
+
+        right_matched = len(np.unique(matched_codes))
+        stats = {
+            "left_rows": len(left),
+            "right_keys": len(self.keys),
+            "matched": int(matched.sum()),
+            "unmatched_left": int((~matched).sum()),
+            "unmatched_right": len(self.keys) - right_matched,
+            "match_rate": round(float(matched.mean()), 4) if len(left) else 0.0,
+        }
+        return pd.concat([left_part, right_part], axis=1), stats
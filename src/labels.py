@@ -0,0 +1,6 @@
+# Etiquetas compartidas por el pipeline, los análisis y el dashboard. Este
+# módulo no importa nada para que cualquiera pueda usarlas sin cargar las
+# dependencias de la transformación.
+
+# Etiqueta de los resúmenes calculados sobre todos los géneros
+ALL_GENRES = "(todos)"
@@ -0,0 +1,172 @@
+import numpy as np
+import pandas as pd
+from scipy.stats import chi2, norm, rankdata
+
+
+# Tramos de empate por bloque en las comparaciones de Mann-Whitney
+RUN_BLOCK = 50_000
+
+CORRECTIONS = ("holm", "bonferroni", "fdr_bh", "none")
+
+POSTHOC_COLUMNS = ["test", "group_a", "group_b", "n_a", "n_b", "statistic",
+                   "p_value", "p_adjusted", "reject"]
+
+
+def adjust_pvalues(p_values, method: str = "holm") -> np.ndarray:
+    """Corrige `p_values` por comparaciones múltiples: `holm`, `bonferroni`,
+    `fdr_bh` (Benjamini-Hochberg) o `none`."""
+    p = np.asarray(p_values, dtype=np.float64)
+    m = len(p)
+    if method == "none" or m == 0:
+        return p.copy()
+    if method == "bonferroni":
+        return np.minimum(p * m, 1.0)
+    order = np.argsort(p, kind="stable")
+    adjusted = np.empty(m)
+    if method == "holm":
+        adjusted[order] = np.minimum(np.maximum.accumulate(p[order] * (m - np.arange(m))), 1.0)
+    elif method == "fdr_bh":
+        scaled = p[order] * m / np.arange(1, m + 1)
+        adjusted[order] = np.minimum(np.minimum.accumulate(scaled[::-1])[::-1], 1.0)
+    else:
+        raise ValueError(f"Corrección no soportada: {method} (usar {', '.join(CORRECTIONS)})")
+    return adjusted
+
+
+class RankedGroups:
+    """Valores de una métrica rankeados una sola vez junto con su grupo.
+
+    Kruskal-Wallis sale de las sumas de rangos por grupo; las comparaciones
+    por pares (Dunn y Mann-Whitney) usan esas sumas y los conteos por grupo
+    de cada tramo de valores iguales, sin volver a rankear ningún par. Se
+    ignoran las filas con valor o grupo nulo.
+    """
+
+    def __init__(self, values, groups):
+        values = pd.to_numeric(pd.Series(values), errors="coerce").to_numpy(
+            dtype=np.float64, na_value=np.nan)
+        groups = pd.Series(groups)
+        keep = ~np.isnan(values) & groups.notna().to_numpy()
+        codes, labels = pd.factorize(groups[keep], sort=True)
+        # Sólo los grupos con alguna observación
+        sizes = np.bincount(codes, minlength=len(labels))
+        present = np.flatnonzero(sizes)
+        remap = np.full(len(labels), -1)
+        remap[present] = np.arange(len(present))
+
+        self.values = values[keep]
+        self.codes = remap[codes]
+        self.labels = list(pd.Index(labels)[present])
+        self.sizes = sizes[present]
+        self.ranks = rankdata(self.values)
+        self.rank_sums = np.bincount(self.codes, weights=self.ranks, minlength=len(self.labels))
+
+        # Tramos de valores iguales, en orden ascendente
+        order = np.argsort(self.values, kind="stable")
+        ordered = self.values[order]
+        new = np.ones(len(ordered), dtype=bool)
+        new[1:] = ordered[1:] != ordered[:-1]
+        self._order = order
+        self._runs = np.cumsum(new) - 1
+        ties = np.diff(np.append(np.flatnonzero(new), len(ordered))).astype(np.float64)
+        self.tie_sum = (ties ** 3 - ties).sum()
+
+    def __len__(self):
+        return len(self.values)
+
+    def groups(self):
+        """Valores de cada grupo (en el orden de `labels`)."""
+        order = np.argsort(self.codes, kind="stable")
+        return np.split(self.values[order], np.cumsum(self.sizes)[:-1])
+
+    def kruskal(self):
+        """`(H, p)` de Kruskal-Wallis con corrección por empates (como
+        `scipy.stats.kruskal`); `(None, None)` con menos de 2 grupos."""
+        n, k = len(self), len(self.labels)
+        if k < 2:
+            return None, None
+        h = 12.0 / (n * (n + 1)) * (self.rank_sums ** 2 / self.sizes).sum() - 3 * (n + 1)
+        h /= 1.0 - self.tie_sum / (n ** 3 - n)
+        return float(h), float(chi2.sf(h, k - 1))
+
+    def _pairs(self):
+        return np.triu_indices(len(self.labels), k=1)
+
+    def dunn(self):
+        """Estadístico z y p-valor bilateral de Dunn para cada par de grupos
+        (diferencia de rangos medios con la varianza corregida por empates)."""
+        n = len(self)
+        a, b = self._pairs()
+        mean_ranks = self.rank_sums / self.sizes
+        variance = n * (n + 1) / 12.0 - self.tie_sum / (12.0 * (n - 1))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            z = (mean_ranks[a] - mean_ranks[b]) / np.sqrt(
+                variance * (1.0 / self.sizes[a] + 1.0 / self.sizes[b]))
+        return z, 2 * norm.sf(np.abs(z))
+
+    def _run_counts(self):
+        """Bloques de la matriz tramo × grupo (observaciones de cada grupo
+        en cada tramo de valores iguales), en orden ascendente."""
+        runs, codes = self._runs, self.codes[self._order]
+        k = len(self.labels)
+        for start in range(0, runs[-1] + 1 if len(runs) else 0, RUN_BLOCK):
+            lo, hi = np.searchsorted(runs, [start, start + RUN_BLOCK])
+            counts = np.bincount((runs[lo:hi] - start) * k + codes[lo:hi],
+                                 minlength=min(RUN_BLOCK, runs[-1] + 1 - start) * k)
+            yield counts.reshape(-1, k).astype(np.float64)
+
+    def mann_whitney(self):
+        """Estadístico U y p-valor bilateral asintótico (con corrección por
+        continuidad y empates, como `scipy.stats.mannwhitneyu`) de cada par.
+
+        `U[i, j]` cuenta los pares (valor de i, valor de j) con el de i
+        mayor (los empates suman 1/2): es el producto de los conteos por
+        tramo de i con los conteos acumulados por debajo de j, así que todos
+        los pares salen de unos pocos productos de matrices.
+        """
+        k = len(self.labels)
+        greater = np.zeros((k, k))
+        squares = np.zeros((k, k))
+        cubes = np.zeros(k)
+        below = np.zeros(k)
+        for counts in self._run_counts():
+            cumulative = np.cumsum(counts, axis=0) - counts + below
+            greater += counts.T @ (cumulative + counts / 2)
+            squares += (counts ** 2).T @ counts
+            cubes += (counts ** 3).sum(axis=0)
+            below += counts.sum(axis=0)
+
+        a, b = self._pairs()
+        na, nb = self.sizes[a].astype(np.float64), self.sizes[b].astype(np.float64)
+        u = greater[a, b]
+        u_max = np.maximum(u, na * nb - u)
+        n = na + nb
+        # sum(t³ - t) de los empates dentro de cada par: (x + y)³ por tramo
+        ties = cubes[a] + cubes[b] + 3 * (squares[a, b] + squares[b, a]) - n
+        sigma = np.sqrt(na * nb / 12.0 * ((n + 1) - ties / (n * (n - 1))))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            z = (u_max - na * nb / 2.0 - 0.5) / sigma
+        return u, np.clip(2 * norm.sf(z), 0.0, 1.0)
+
+    def posthoc(self, correction: str = "holm", alpha: float = 0.05,
+                mann_whitney: bool = True) -> pd.DataFrame:
+        """Tabla con todas las comparaciones por pares (Dunn y, si se pide,
+        Mann-Whitney), con p-valores corregidos por `correction` dentro de
+        cada prueba."""
+        if len(self.labels) < 2:
+            return pd.DataFrame(columns=POSTHOC_COLUMNS)
+        a, b = self._pairs()
+        tests = [("dunn", *self.dunn())]
+        if mann_whitney:
+            tests.append(("mannwhitney", *self.mann_whitney()))
+        tables = []
+        for test, statistic, p in tests:
+            adjusted = adjust_pvalues(p, correction)
+            tables.append(pd.DataFrame({
+                "test": test,
+                "group_a": [self.labels[i] for i in a], "group_b": [self.labels[j] for j in b],
+                "n_a": self.sizes[a], "n_b": self.sizes[b],
+                "statistic": statistic, "p_value": p,
+                "p_adjusted": adjusted, "reject": adjusted < alpha,
+            }))
+        return pd.concat(tables, ignore_index=True)
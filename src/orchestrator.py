@@ -1,12 +1,62 @@
 import os
+import sys
+import json
 import yaml
-from data_ingestion import ingest_data
+import aggregates
+import analysis
+import data_ingestion
+import data_transformation
+import data_validation
+import fuzzy_match
+import join_keys
+import labels
+import nonparametric
+import resampling
+import sketches
+import storage
+from data_ingestion import ingest_data, load_raw_data
 from data_transformation import transform_data
-from data_validation import validate_data
-from analysis import run_analysis
+from data_validation import (ChunkValidator, ValidationError, load_rules,
+                             report_errors, validate_report)
+from analysis import analysis_columns, run_analysis
+from instrumentation import RunReport
+from sketches import CatalogueSketch
+from pipeline_cache import PipelineCache, code_digest, config_subset, stage_key
+from storage import find_table, read_table
 
 
-def run_pipeline(config_path: str = "config/pipeline_config.yaml"):
+# Configuración que lee cada etapa: cambiar cualquier otra sección (p. ej.
+# `analysis`, `dashboard` o `monitoring`) no invalida las etapas anteriores
+STAGE_CONFIG = {
+    "ingestion": ["paths.raw_data", "paths.processed_data", "files", "columns", "ingestion",
+                  "storage.raw_format", "storage.compression", "catalogue_stats",
+                  "streaming_validation.enabled", "streaming_validation.min_rows",
+                  "streaming_validation.bloom_capacity", "streaming_validation.ingestion"],
+    "transformation": ["paths.processed_data", "storage.processed_format",
+                       "storage.processed_compression", "execution", "matching",
+                       "twitch_aggregation", "streaming_validation.enabled",
+                       "streaming_validation.min_rows", "streaming_validation.bloom_capacity",
+                       "streaming_validation.transformation"],
+    "validation": ["validations"],
+    "analysis": ["paths.processed_data", "analysis"],
+}
+
+
+def _artifacts(*bases):
+    """Rutas existentes en disco de las tablas indicadas (sin extensión)."""
+    found = [find_table(b) for b in bases]
+    return [f[0] for f in found if f is not None]
+
+
+def run_pipeline(config_path: str = "config/pipeline_config.yaml",
+                 force: bool = False):
+    """Ejecuta el pipeline completo.
+
+    Cada etapa se salta si sus entradas (hash de los archivos fuente,
+    configuración y versión del código) coinciden con una ejecución previa
+    registrada en la caché; en ese caso se reutilizan los artefactos
+    guardados. Con `force=True` se ignora la caché.
+    """
     print("Iniciando pipeline Steam + Twitch...")
 
     # Leer configuración
@@ -21,29 +71,166 @@ def run_pipeline(config_path: str = "config/pipeline_config.yaml"):
     processed_dir = paths.get("processed_data", "data/processed/")
     files = cfg.get("files", {})
 
+    # Motor de la transformación: "pandas" (referencia) o "polars", que lee
+    # las copias raw de forma perezosa sin cargarlas antes en memoria
+    backend = cfg.get("execution", {}).get("backend", "pandas")
+    transform_modules = [data_transformation, aggregates, fuzzy_match, join_keys, storage]
+    if backend == "polars":
+        import polars_backend
+        transform_modules.append(polars_backend)
+    elif backend != "pandas":
+        raise ValueError(f"Backend de ejecución desconocido: {backend}")
+
     steam_file = os.path.join(raw_dir, files.get("steam_dataset", "steam_app_data.csv"))
     twitch_file = os.path.join(raw_dir, files.get("twitch_dataset", "Twitch_game_data.csv"))
 
-    # 1. INGESTA
-    steam_df, twitch_df = ingest_data(steam_file, twitch_file, config_path=config_path)
+    # Métricas por etapa (líneas JSON en paths.log_file)
+    monitoring = cfg.get("monitoring", {})
+    report = RunReport(paths.get("log_file", "pipeline_execution.log"),
+                       trace_memory=monitoring.get("tracemalloc", False))
+
+    try:
+        # Claves de caché encadenadas: cada etapa depende de la anterior
+        cache_cfg = cfg.get("cache", {})
+        cache = PipelineCache(
+            os.path.join(processed_dir, cache_cfg.get("manifest", ".pipeline_cache.json")),
+            enabled=cache_cfg.get("enabled", True) and not force,
+        )
+        with report.stage("cache_keys") as rec:
+            stage_cfg = {stage: config_subset(cfg, keys) for stage, keys in STAGE_CONFIG.items()}
+            ingest_key = stage_key(
+                "ingestion", cache.file_digest(steam_file), cache.file_digest(twitch_file),
+                stage_cfg["ingestion"],
+                # Las estadísticas del catálogo usan el parseo y la
+                # normalización de géneros de data_transformation
+                code_digest(data_ingestion, data_transformation, sketches, storage, labels))
+            transform_key = stage_key("transformation", ingest_key, stage_cfg["transformation"],
+                                      code_digest(*transform_modules))
+            validation_key = stage_key("validation", transform_key, stage_cfg["validation"],
+                                       code_digest(data_validation))
+            analysis_key = stage_key("analysis", transform_key, stage_cfg["analysis"],
+                                     code_digest(analysis, nonparametric, resampling, labels))
+            # Sólo cuenta lo que se leyó para hashear: con (tamaño, mtime)
+            # sin cambios los CSV no se vuelven a leer
+            rec["bytes_read"] = cache.bytes_hashed
+
+        raw_bases = [os.path.join(raw_dir, "steam_raw"), os.path.join(raw_dir, "twitch_raw")]
+        # Estadísticas del catálogo completo de Steam (catalogue_stats),
+        # calculadas durante la ingesta
+        catalogue_bases = [os.path.join(processed_dir, "catalogue_summary"),
+                           os.path.join(processed_dir, "catalogue_years")]
+        merged_base = os.path.join(processed_dir, "merged_data")
+        transform_bases = [merged_base, os.path.join(processed_dir, "genre_cube"),
+                           os.path.join(processed_dir, "top_games")]
+
+        transform_hit = cache.lookup("transformation", transform_key)
+        validation_hit = cache.lookup("validation", validation_key)
+        analysis_hit = cache.lookup("analysis", analysis_key)
+
+        merged_df = None
+        if transform_hit is None:
+            # La validación por bloques (streaming_validation) corta la
+            # ingesta o la transformación en cuanto se supera un umbral
+            try:
+                # 1. INGESTA (con polars la transformación lee las copias raw
+                # por su cuenta, así que no se cargan en memoria)
+                load = backend == "pandas"
+                steam_df = twitch_df = None
+                if cache.lookup("ingestion", ingest_key) is not None:
+                    print("↺ Ingesta sin cambios: se reutilizan las copias raw.")
+                    if load:
+                        with report.stage("ingestion", inputs=_artifacts(*raw_bases)) as rec:
+                            # La copia raw tiene justo las columnas que leyó la
+                            # ingesta: cargarla entera da el mismo merged_data
+                            steam_df, twitch_df = load_raw_data(config_path, raw_dir=raw_dir)
+                            rec.update(cached=True, rows_out=len(steam_df) + len(twitch_df))
+                else:
+                    with report.stage("ingestion", inputs=[steam_file, twitch_file]) as rec:
+                        catalogue = CatalogueSketch.from_config(cfg)
+                        steam_df, twitch_df = ingest_data(
+                            steam_file, twitch_file, config_path=config_path,
+                            validator=ChunkValidator.from_config(cfg, "ingestion"), load=load,
+                            sketch=catalogue)
+                        if catalogue is not None:
+                            catalogue.write(processed_dir)
+                        rec["outputs"] = _artifacts(*raw_bases, *catalogue_bases)
+                        if load:
+                            rec["rows_out"] = len(steam_df) + len(twitch_df)
+                    cache.store("ingestion", ingest_key, _artifacts(*raw_bases, *catalogue_bases))
 
-    # 2. TRANSFORMACIÓN
-    merged_df = transform_data(steam_df, twitch_df, config_path=config_path,
-                               output_dir=processed_dir)
+                # 2. TRANSFORMACIÓN
+                rows_in = len(steam_df) + len(twitch_df) if load else None
+                with report.stage("transformation", rows_in=rows_in,
+                                  inputs=() if load else _artifacts(*raw_bases)) as rec:
+                    validator = ChunkValidator.from_config(cfg, "transformation")
+                    if load:
+                        merged_df = transform_data(
+                            steam_df, twitch_df, config_path=config_path,
+                            output_dir=processed_dir, validator=validator)
+                    else:
+                        merged_df = polars_backend.transform_polars(
+                            raw_dir, config_path=config_path, output_dir=processed_dir,
+                            validator=validator)
+                    rec["outputs"] = _artifacts(*transform_bases)
+                    rec["rows_out"] = len(merged_df)
+                    rec["join"] = merged_df.attrs.get("join_stats")
+                del steam_df, twitch_df
+                cache.store("transformation", transform_key, _artifacts(*transform_bases))
+            except ValidationError as e:
+                print("Pipeline detenido por errores de validación:")
+                print(" -", e)
+                report.finish("validation_failed")
+                return
+        else:
+            print("↺ Transformación sin cambios: se reutiliza", list(transform_hit["artifacts"]))
+            if validation_hit is None or analysis_hit is None:
+                # Si sólo falta el análisis, basta con las columnas que usa
+                columns = None if validation_hit is None else analysis_columns(cfg)
+                with report.stage("transformation", inputs=_artifacts(merged_base)) as rec:
+                    merged_df = read_table(merged_base, columns=columns)
+                    rec.update(cached=True, rows_out=len(merged_df))
 
-    # 3. VALIDACIÓN
-    errors = validate_data(merged_df)
-    if errors:
-        print("Pipeline detenido por errores de validación:")
-        for e in errors:
-            print(" -", e)
-        return
+        # 3. VALIDACIÓN (conteos por regla en validation_report.json)
+        validation_file = os.path.join(processed_dir, "validation_report.json")
+        with report.stage("validation",
+                          rows_in=len(merged_df) if merged_df is not None else None) as rec:
+            if validation_hit is not None:
+                errors = validation_hit["data"].get("errors", [])
+                rec["cached"] = True
+            else:
+                results = validate_report(merged_df, load_rules(config_path))
+                errors = report_errors(results)
+                with open(validation_file, "w", encoding="utf-8") as fh:
+                    json.dump(results, fh, indent=2, ensure_ascii=False, default=str)
+                cache.store("validation", validation_key, [validation_file],
+                            data={"errors": errors})
+            rec["errors"] = len(errors)
+        if errors:
+            print("Pipeline detenido por errores de validación:")
+            for e in errors:
+                print(" -", e)
+            report.finish("validation_failed")
+            return
 
-    # 4. ANÁLISIS
-    run_analysis(merged_df, config_path=config_path)
+        # 4. ANÁLISIS
+        analysis_bases = [os.path.join(processed_dir, "analysis_results"),
+                          os.path.join(processed_dir, "analysis_correlations"),
+                          os.path.join(processed_dir, "analysis_posthoc")]
+        if analysis_hit is not None:
+            print("↺ Análisis sin cambios: se reutiliza", list(analysis_hit["artifacts"]))
+        else:
+            with report.stage("analysis", rows_in=len(merged_df)) as rec:
+                result = run_analysis(merged_df, config_path=config_path, force=force)
+                rec["outputs"] = _artifacts(*analysis_bases)
+                rec["rows_out"] = len(result)
+            cache.store("analysis", analysis_key, _artifacts(*analysis_bases))
 
-    print("Pipeline completado con éxito.")
+        print("Pipeline completado con éxito.")
+        report.finish()
+    except Exception:
+        report.finish("error")
+        raise
 
 
 if __name__ == "__main__":
-    run_pipeline()
+    run_pipeline(force="--force" in sys.argv[1:])
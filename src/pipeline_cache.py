@@ -0,0 +1,118 @@
+import hashlib
+import inspect
+import json
+import os
+
+
+def _sha256_file(path: str, block_size: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(block_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def stage_key(*parts) -> str:
+    """Clave estable a partir de cualquier combinación de valores
+    serializables (hashes, configuración, versión de código...)."""
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def config_subset(cfg: dict, keys) -> dict:
+    """Valores de `cfg` en las claves indicadas (`"seccion"` o
+    `"seccion.clave"`), para que la clave de una etapa sólo dependa de la
+    configuración que esa etapa lee. Las ausentes quedan como `None`."""
+    subset = {}
+    for key in keys:
+        value = cfg
+        for part in key.split("."):
+            value = value.get(part) if isinstance(value, dict) else None
+        subset[key] = value
+    return subset
+
+
+def code_digest(*objs) -> str:
+    """Versión del código de una etapa: hash de los archivos fuente de los
+    módulos indicados."""
+    h = hashlib.sha256()
+    for path in sorted({inspect.getsourcefile(o) for o in objs}):
+        with open(path, "rb") as fh:
+            h.update(fh.read())
+    return h.hexdigest()
+
+
+class PipelineCache:
+    """Caché de etapas del pipeline persistida como JSON.
+
+    Cada etapa guarda la clave con la que se ejecutó, los artefactos que
+    produjo y datos opcionales (p. ej. errores de validación). Una etapa se
+    considera vigente si su clave coincide y sus artefactos siguen en disco
+    sin cambios.
+
+    Los hashes de archivos de entrada se memorizan por (tamaño, mtime) para
+    no volver a leer archivos grandes que no cambiaron; `bytes_hashed`
+    cuenta sólo los bytes que sí hubo que leer.
+    """
+
+    def __init__(self, manifest_path: str, enabled: bool = True):
+        self.manifest_path = manifest_path
+        self.enabled = enabled
+        self.manifest = {"files": {}, "stages": {}}
+        self.bytes_hashed = 0
+        if os.path.exists(manifest_path):
+            try:
+                with open(manifest_path, "r", encoding="utf-8") as fh:
+                    self.manifest = json.load(fh)
+            except (OSError, ValueError):
+                pass
+
+    @staticmethod
+    def _stat(path: str) -> dict:
+        st = os.stat(path)
+        return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+    def file_digest(self, path: str) -> str:
+        """SHA-256 del contenido de `path`, reutilizando el valor guardado si
+        el archivo no cambió de tamaño ni de fecha de modificación."""
+        key = os.path.abspath(path)
+        stat = self._stat(path)
+        known = self.manifest["files"].get(key)
+        if known and {k: known[k] for k in stat} == stat:
+            return known["sha256"]
+        digest = _sha256_file(path)
+        self.bytes_hashed += stat["size"]
+        self.manifest["files"][key] = dict(stat, sha256=digest)
+        self._save()
+        return digest
+
+    def lookup(self, stage: str, key: str):
+        """Entrada de la etapa si sigue vigente para `key`, si no `None`."""
+        if not self.enabled:
+            return None
+        entry = self.manifest["stages"].get(stage)
+        if not entry or entry.get("key") != key:
+            return None
+        for path, stat in entry.get("artifacts", {}).items():
+            if not os.path.exists(path) or self._stat(path) != stat:
+                return None
+        return entry
+
+    def store(self, stage: str, key: str, artifacts=(), data=None):
+        """Registra una ejecución de la etapa con sus artefactos."""
+        self.manifest["stages"][stage] = {
+            "key": key,
+            "artifacts": {p: self._stat(p) for p in artifacts if os.path.exists(p)},
+            "data": data or {},
+        }
+        self._save()
+
+    def drop(self, stage: str):
+        """Olvida la ejecución registrada de la etapa, si la hay."""
+        if self.manifest["stages"].pop(stage, None) is not None:
+            self._save()
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.manifest_path) or ".", exist_ok=True)
+        with open(self.manifest_path, "w", encoding="utf-8") as fh:
+            json.dump(self.manifest, fh, indent=2)
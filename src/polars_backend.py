@@ -0,0 +1,229 @@
+import os
+import yaml
+import pandas as pd
+import polars as pl
+from aggregates import TWITCH_AGGREGATES
+from data_ingestion import steam_columns
+from data_transformation import (GENRE_DESCRIPTION_PATTERN, GENRE_NORMALIZER,
+                                 RECENCY_COLUMNS, report_join, save_outputs,
+                                 to_analytical_types)
+from fuzzy_match import DEFAULT_THRESHOLD, recover_unmatched
+from join_keys import KeyIndex, normalize_titles
+from storage import find_table, read_schema
+
+
+# Backend alternativo de `transform_data` sobre Polars. Ejecuta el mismo plan
+# (derivar columnas, filtrar, deduplicar, agregar Twitch y unir) como una
+# consulta perezosa sobre las copias raw: Polars sólo lee de disco las
+# columnas y filas que el plan necesita y lo ejecuta en varios hilos.
+# `transform_data` (pandas) sigue siendo la implementación de referencia.
+
+
+# Columnas de precio que el plan calcula en centavos
+CENT_COLUMNS = ["price_final", "price_initial", "price"]
+
+
+def scan_table(base: str) -> pl.LazyFrame:
+    """Consulta perezosa sobre la tabla `base` guardada con `storage`."""
+    found = find_table(base)
+    if found is None:
+        raise FileNotFoundError(f"No existe la tabla {base}")
+    path, fmt = found
+    if fmt == "parquet":
+        return pl.scan_parquet(path)
+    if fmt == "feather":
+        return pl.scan_ipc(path)
+    return pl.scan_csv(path, infer_schema_length=10_000)
+
+
+def _pandas_batch(func):
+    """Aplica una función de pandas sobre cada lote de una columna de texto
+    (reutiliza la normalización de la implementación de referencia)."""
+    def apply(batch: pl.Series) -> pl.Series:
+        result = func(batch.to_pandas())
+        return pl.Series(batch.name, result.to_numpy(dtype=object), dtype=pl.String)
+    return apply
+
+
+def _price_field(pattern: str) -> pl.Expr:
+    return pl.col("price_overview").cast(pl.String).str.extract(pattern, 1)
+
+
+def _steam_plan(lf: pl.LazyFrame) -> pl.LazyFrame:
+    """Columnas derivadas y filtros de Steam, igual que `transform_data`."""
+    schema = lf.collect_schema()
+    derived = []
+
+    if "genres" in schema:
+        genres = pl.col("genres").cast(pl.String)
+        raw = pl.coalesce(genres.str.extract(GENRE_DESCRIPTION_PATTERN, 1),
+                          genres.str.extract(GENRE_DESCRIPTION_PATTERN, 2))
+        genre = raw.str.replace_all(r"\\(.)", "$1").map_batches(
+            _pandas_batch(GENRE_NORMALIZER.normalize_column),
+            return_dtype=pl.String, is_elementwise=True)
+        derived += [genres.fill_null(genre).alias("genres"), genre.alias("genre")]
+    else:
+        derived.append(pl.lit(None, dtype=pl.String).alias("genre"))
+
+    names = pl.col("name").cast(pl.String) if "name" in schema else pl.lit(None, dtype=pl.String)
+    derived += [
+        names.str.to_lowercase().alias("game"),
+        names.map_batches(_pandas_batch(normalize_titles), return_dtype=pl.String,
+                          is_elementwise=True).alias("title_key"),
+    ]
+
+    # Los precios quedan en centavos: se pasan a unidades de moneda al final
+    # (`CENT_COLUMNS`), porque Polars divide por constantes multiplicando por
+    # el inverso y el redondeo no coincidiría con pandas
+    if "price_overview" in schema:
+        number = r"""['"]{}['"]\s*:\s*(-?\d+)"""
+        derived += [
+            _price_field(number.format("final")).cast(pl.Float64).alias("price_final"),
+            _price_field(number.format("initial")).cast(pl.Float64).alias("price_initial"),
+            _price_field(number.format("discount_percent")).cast(pl.Float64)
+            .alias("discount_percent"),
+            _price_field(r"""['"]currency['"]\s*:\s*['"]([^'"]*)['"]""").alias("currency"),
+        ]
+        price = pl.col("price_final")
+    else:
+        price = pl.lit(None, dtype=pl.Float64)
+
+    # Si el juego es gratuito y no tenemos precio, asignar 0 (mismo criterio
+    # que `is_free == True` en pandas)
+    free = pl.lit(False)
+    if "is_free" in schema:
+        if schema["is_free"] == pl.Boolean:
+            free = pl.col("is_free").fill_null(False)
+        elif schema["is_free"].is_numeric():
+            free = (pl.col("is_free") == 1).fill_null(False)
+
+    lf = lf.with_columns(derived).with_columns(
+        pl.when(free & price.is_null()).then(0.0).otherwise(price).alias("price"))
+
+    # Eliminar filas sin 'price', sin 'genres' o sin nombre
+    keep = pl.col("price").is_not_null()
+    if "genres" in schema:
+        keep &= pl.col("genres").is_not_null()
+    if "name" in schema:
+        keep &= pl.col("name").is_not_null()
+    return lf.filter(keep)
+
+
+def _latest_per_key(df: pl.DataFrame, key: str) -> pl.DataFrame:
+    """Registro más reciente por `key` (ver `latest_per_key`)."""
+    if all(c in df.columns for c in RECENCY_COLUMNS):
+        rank = pl.lit(0.0)
+        for col in RECENCY_COLUMNS:
+            dense = pl.col(col).cast(pl.Float64, strict=False).rank("dense").fill_null(0)
+            rank = rank * (dense.max() + 1) + dense
+        # El rango se materializa antes de compararlo por grupo: dentro de
+        # `over` se volvería a calcular sólo con las filas de cada juego
+        df = (df.with_columns(rank.alias("_rank"))
+              .filter(pl.col("_rank") == pl.col("_rank").max().over(key))
+              .drop("_rank"))
+    return df.unique(subset=key, keep="first", maintain_order=True)
+
+
+def _twitch_plan(lf: pl.LazyFrame) -> pl.LazyFrame:
+    """Métricas de Twitch agregadas por clave de título."""
+    lf = lf.rename(str.lower)
+    schema = lf.collect_schema()
+    metrics, aggs = [], []
+    for col, how in TWITCH_AGGREGATES.items():
+        if col in schema:
+            expr = pl.col(col)
+            if not schema[col].is_numeric():
+                expr = expr.cast(pl.Float64, strict=False)
+        elif col in ("hours_watched", "avg_viewers"):
+            expr = pl.lit(None, dtype=pl.Float64)
+        else:
+            continue
+        metrics.append(expr.alias(col))
+        aggs.append(getattr(pl.col(col), how)())
+    title = pl.col("game").cast(pl.String) if "game" in schema else pl.lit(None, dtype=pl.String)
+    title_key = title.map_batches(_pandas_batch(normalize_titles), return_dtype=pl.String,
+                                  is_elementwise=True).alias("title_key")
+    return (lf.select(title_key, *metrics)
+            .filter(pl.col("title_key").is_not_null())
+            .group_by("title_key").agg(aggs))
+
+
+def transform_polars(raw_dir: str, config_path: str = "config/pipeline_config.yaml",
+                     output_dir: str = None, validator=None) -> pd.DataFrame:
+    """`transform_data` ejecutado con Polars sobre las copias raw de
+    `raw_dir` (`steam_raw`, `twitch_raw`).
+
+    De Steam sólo se leen las columnas de `columns.steam` y las que necesita
+    la transformación; los filtros se aplican durante la lectura, en varios
+    hilos y por lotes, así que el archivo completo nunca se carga. Devuelve y
+    guarda el mismo `merged_data` que la implementación pandas.
+    """
+    if os.path.exists(config_path):
+        with open(config_path, "r", encoding="utf-8") as fh:
+            cfg = yaml.safe_load(fh)
+    else:
+        cfg = {}
+
+    processed_dir = output_dir or cfg.get("paths", {}).get("processed_data", "data/processed/")
+    os.makedirs(processed_dir, exist_ok=True)
+    storage_cfg = cfg.get("storage", {})
+    fmt = storage_cfg.get("processed_format", "csv")
+    compression = storage_cfg.get("processed_compression")
+    if (cfg.get("twitch_aggregation", {}) or {}).get("mode", "full") == "incremental":
+        print("⚠ El backend polars no soporta la agregación incremental: "
+              "se agrega el histórico completo de Twitch.")
+
+    steam_base = os.path.join(raw_dir, "steam_raw")
+    steam_scan = scan_table(steam_base)
+    wanted = steam_columns(cfg)
+    steam_scan = steam_scan.select([c for c in steam_scan.collect_schema() if c in wanted])
+    steam, twitch_agg = pl.collect_all(
+        [_steam_plan(steam_scan), _twitch_plan(scan_table(os.path.join(raw_dir, "twitch_raw")))],
+        engine="streaming")
+
+    if validator is not None:
+        validator.update(steam.select([c for c in validator.columns if c in steam.columns])
+                         .to_pandas())
+        validator.finish()
+
+    steam = _latest_per_key(steam, "title_key")
+
+    # Emparejamiento aproximado (opcional), como en `transform_data`
+    matching_cfg = cfg.get("matching", {}) or {}
+    fuzzy_matched = 0
+    if matching_cfg.get("fuzzy", False):
+        keys, fuzzy_matched = recover_unmatched(
+            steam["title_key"].to_pandas(), KeyIndex(twitch_agg["title_key"].to_pandas()),
+            processed_dir, matching_cfg.get("threshold", DEFAULT_THRESHOLD),
+            matching_cfg.get("workers"), fmt)
+        steam = steam.with_columns(pl.Series("title_key", keys.to_numpy(dtype=object),
+                                             dtype=pl.String))
+
+    joined = steam.join(twitch_agg, on="title_key", how="inner", maintain_order="left")
+    join_stats = {
+        "left_rows": steam.height,
+        "right_keys": twitch_agg.height,
+        "matched": joined.height,
+        "unmatched_left": steam.height - joined.height,
+        "unmatched_right": twitch_agg.height - joined["title_key"].n_unique(),
+        "match_rate": round(joined.height / steam.height, 4) if steam.height else 0.0,
+        "fuzzy_matched": fuzzy_matched,
+    }
+
+    merged = joined.drop("title_key").to_pandas()
+    # Mismos tipos que la implementación pandas antes de compactarlos
+    for col in [c for c in CENT_COLUMNS if c in merged.columns]:
+        merged[col] = merged[col] / 100
+    for col in [c for c in ["game", "currency"] if c in merged.columns]:
+        merged[col] = merged[col].astype("string")
+    # Las columnas booleanas recuperan el tipo pandas de la copia raw
+    # ("bool" o "boolean", según si admitía nulos)
+    raw_types = (read_schema(steam_base) or {}).get("columns", {})
+    for col, dtype in joined.schema.items():
+        if dtype == pl.Boolean:
+            merged[col] = merged[col].astype(raw_types.get(col, "boolean"))
+    merged = to_analytical_types(merged)
+    merged.attrs["join_stats"] = join_stats
+    report_join(join_stats)
+    save_outputs(merged, processed_dir, fmt, compression)
+    return merged
@@ -0,0 +1,217 @@
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from scipy.stats import rankdata
+
+
+# Celdas (remuestras × filas) por lote: acota la memoria de cada lote
+BATCH_CELLS = 2_000_000
+# Por debajo de este total de celdas no compensa lanzar procesos
+MIN_PARALLEL_CELLS = 20_000_000
+
+DEFAULT_RESAMPLES = 2000
+DEFAULT_CONFIDENCE = 0.95
+DEFAULT_SEED = 42
+
+
+def rank_ties(values: np.ndarray):
+    """Rangos promedio de `values` y su estructura de empates: orden de
+    las observaciones, inicio de cada tramo de valores iguales en ese orden
+    y tramo de cada observación."""
+    order = np.argsort(values, kind="stable")
+    ordered = values[order]
+    new = np.ones(len(values), dtype=bool)
+    new[1:] = ordered[1:] != ordered[:-1]
+    starts = np.flatnonzero(new)
+    codes = np.empty(len(values), dtype=np.int64)
+    codes[order] = np.cumsum(new) - 1
+    return rankdata(values), (order, starts, codes)
+
+
+def bootstrap_indices(rng, strata, size: int) -> np.ndarray:
+    """Índices de `size` remuestras con reemplazo (una por fila), dentro de
+    cada estrato de tamaños `strata` (observaciones contiguas)."""
+    offsets = np.cumsum([0] + list(strata[:-1]))
+    return np.concatenate([rng.integers(0, n, (size, n)) + start
+                           for start, n in zip(offsets, strata)], axis=1)
+
+
+def _counts(idx: np.ndarray) -> np.ndarray:
+    """Veces que aparece cada observación en cada remuestra."""
+    size, n = idx.shape
+    flat = (idx + (np.arange(size) * n)[:, None]).ravel()
+    return np.bincount(flat, minlength=size * n).reshape(size, n).astype(np.float64)
+
+
+def _weighted_ranks(counts: np.ndarray, ties):
+    """Rangos promedio de cada observación dentro de cada remuestra
+    (`counts` = repeticiones por observación) sin volver a ordenar: salen
+    de los conteos acumulados por tramo de empate. Devuelve también el
+    tamaño de cada tramo en cada remuestra."""
+    order, starts, codes = ties
+    tied = np.add.reduceat(counts[:, order], starts, axis=1)
+    ranks = np.cumsum(tied, axis=1) - tied + (tied + 1) / 2
+    return ranks[:, codes], tied
+
+
+def _weighted_corr(rx: np.ndarray, ry: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """Correlación de Pearson por fila con pesos por observación."""
+    total = weights.sum(axis=1, keepdims=True)
+    dx = rx - (weights * rx).sum(axis=1, keepdims=True) / total
+    dy = ry - (weights * ry).sum(axis=1, keepdims=True) / total
+    wx = weights * dx
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return ((wx * dy).sum(axis=1)
+                / np.sqrt((wx * dx).sum(axis=1) * (weights * dy * dy).sum(axis=1)))
+
+
+def _kruskal_h(rank_sums: np.ndarray, sizes: np.ndarray, n: int,
+               tie_sum) -> np.ndarray:
+    """H de Kruskal-Wallis con corrección por empates a partir de las sumas
+    de rangos por grupo y de sum(t³ - t) de los tramos de empate."""
+    h = 12.0 / (n * (n + 1)) * (rank_sums ** 2 / sizes).sum(axis=1) - 3 * (n + 1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return h / (1.0 - tie_sum / (n ** 3 - n))
+
+
+# Estadísticos por lote: reciben los datos, un generador y el número de
+# remuestras del lote, y devuelven un valor por remuestra. Los rangos se
+# calculan una sola vez: en las permutaciones no cambian y en el bootstrap
+# se deducen de las repeticiones de cada observación
+
+def _spearman_bootstrap(data, rng, size):
+    counts = _counts(bootstrap_indices(rng, [len(data["rx"])], size))
+    rx = _weighted_ranks(counts, data["x_ties"])[0]
+    ry = _weighted_ranks(counts, data["y_ties"])[0]
+    return _weighted_corr(rx, ry, counts)
+
+
+def _spearman_permutation(data, rng, size):
+    rx, ry = data["rx"], data["ry"]
+    idx = rng.permuted(np.broadcast_to(np.arange(len(ry)), (size, len(ry))), axis=1)
+    return _weighted_corr(rx[None, :], ry[idx], np.ones((1, len(rx))))
+
+
+def _kruskal_bootstrap(data, rng, size):
+    # Remuestreo estratificado: cada grupo conserva su tamaño
+    sizes = data["sizes"]
+    counts = _counts(bootstrap_indices(rng, sizes, size))
+    ranks, tied = _weighted_ranks(counts, data["ties"])
+    sums = np.add.reduceat(counts * ranks, data["starts"], axis=1)
+    return _kruskal_h(sums, sizes, len(data["ranks"]), (tied ** 3 - tied).sum(axis=1))
+
+
+def _kruskal_permutation(data, rng, size):
+    ranks = data["ranks"]
+    idx = rng.permuted(np.broadcast_to(np.arange(len(ranks)), (size, len(ranks))), axis=1)
+    sums = np.add.reduceat(ranks[idx], data["starts"], axis=1)
+    return _kruskal_h(sums, data["sizes"], len(ranks), data["tie_sum"])
+
+
+STATISTICS = {
+    "spearman_bootstrap": _spearman_bootstrap,
+    "spearman_permutation": _spearman_permutation,
+    "kruskal_bootstrap": _kruskal_bootstrap,
+    "kruskal_permutation": _kruskal_permutation,
+}
+
+
+# Datos compartidos por los procesos (se envían una vez en el inicializador)
+_WORKER_DATA = None
+
+
+def _init_worker(data: dict):
+    global _WORKER_DATA
+    _WORKER_DATA = data
+
+
+def _run_batch(kind: str, seed, size: int) -> np.ndarray:
+    return STATISTICS[kind](_WORKER_DATA, np.random.default_rng(seed), size)
+
+
+def resample(kind: str, data: dict, n_resamples: int = DEFAULT_RESAMPLES,
+             seed: int = DEFAULT_SEED, workers: int = None) -> np.ndarray:
+    """Valores del estadístico `kind` (ver `STATISTICS`) sobre `n_resamples`
+    remuestras de `data`.
+
+    Las remuestras se generan por lotes de matrices de índices y cada lote
+    se calcula vectorizado. Cada lote tiene su propia semilla derivada de
+    `seed`, así que el resultado no depende de `workers` ni del orden en que
+    terminen los procesos.
+    """
+    rows = max(np.size(v) for v in data.values() if isinstance(v, np.ndarray))
+    size = max(1, min(n_resamples, BATCH_CELLS // max(1, rows)))
+    sizes = [min(size, n_resamples - start) for start in range(0, n_resamples, size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+    if workers == 1 or n_resamples * rows < MIN_PARALLEL_CELLS:
+        _init_worker(data)
+        batches = [_run_batch(kind, s, n) for s, n in zip(seeds, sizes)]
+    else:
+        workers = workers or os.cpu_count() or 1
+        # `spawn`: `run_analysis` llama aquí desde hilos de su pool, y un
+        # `fork` con otros hilos en marcha puede heredar locks tomados
+        with ProcessPoolExecutor(max_workers=workers,
+                                 mp_context=multiprocessing.get_context("spawn"),
+                                 initializer=_init_worker, initargs=(data,)) as pool:
+            batches = list(pool.map(_run_batch, [kind] * len(sizes), seeds, sizes))
+    return np.concatenate(batches)
+
+
+def _interval(values: np.ndarray, confidence: float):
+    alpha = (1 - confidence) / 2
+    values = values[np.isfinite(values)]
+    if not len(values):
+        return None, None
+    low, high = np.quantile(values, [alpha, 1 - alpha])
+    return float(low), float(high)
+
+
+def spearman_resampling(x, y, n_resamples: int = DEFAULT_RESAMPLES,
+                        confidence: float = DEFAULT_CONFIDENCE,
+                        seed: int = DEFAULT_SEED, workers: int = None) -> dict:
+    """Intervalo bootstrap (percentil) y p-valor por permutaciones (bilateral)
+    de la correlación de Spearman entre `x` e `y`, sin filas con nulos."""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    keep = ~(np.isnan(x) | np.isnan(y))
+    if keep.sum() < 3:
+        return {"ci_low": None, "ci_high": None, "perm_p": None}
+    rx, x_ties = rank_ties(x[keep])
+    ry, y_ties = rank_ties(y[keep])
+    data = {"rx": rx, "ry": ry, "x_ties": x_ties, "y_ties": y_ties}
+
+    observed = _weighted_corr(rx[None, :], ry[None, :], np.ones((1, len(rx))))[0]
+    low, high = _interval(resample("spearman_bootstrap", data, n_resamples, seed, workers),
+                          confidence)
+    permuted = resample("spearman_permutation", data, n_resamples, seed + 1, workers)
+    perm_p = (1 + np.sum(np.abs(permuted) >= abs(observed) - 1e-12)) / (1 + n_resamples)
+    return {"ci_low": low, "ci_high": high, "perm_p": float(perm_p)}
+
+
+def kruskal_resampling(groups, n_resamples: int = DEFAULT_RESAMPLES,
+                       confidence: float = DEFAULT_CONFIDENCE,
+                       seed: int = DEFAULT_SEED, workers: int = None) -> dict:
+    """Intervalo bootstrap (estratificado por grupo) y p-valor por
+    permutaciones del estadístico H de Kruskal-Wallis de `groups` (lista
+    de arreglos, uno por grupo)."""
+    groups = [np.asarray(g, dtype=np.float64) for g in groups]
+    groups = [g[~np.isnan(g)] for g in groups]
+    groups = [g for g in groups if len(g)]
+    if len(groups) < 2:
+        return {"ci_low": None, "ci_high": None, "perm_p": None}
+    sizes = np.array([len(g) for g in groups])
+    ranks, ties = rank_ties(np.concatenate(groups))
+    tied = np.diff(np.append(ties[1], len(ranks))).astype(np.float64)
+    data = {"ranks": ranks, "ties": ties, "sizes": sizes,
+            "starts": np.cumsum(np.append(0, sizes[:-1])),
+            "tie_sum": (tied ** 3 - tied).sum()}
+
+    observed = _kruskal_h(np.add.reduceat(ranks, data["starts"])[None, :], sizes,
+                          len(ranks), data["tie_sum"])[0]
+    low, high = _interval(resample("kruskal_bootstrap", data, n_resamples, seed, workers),
+                          confidence)
+    permuted = resample("kruskal_permutation", data, n_resamples, seed + 1, workers)
+    perm_p = (1 + np.sum(permuted >= observed - 1e-12)) / (1 + n_resamples)
+    return {"ci_low": low, "ci_high": high, "perm_p": float(perm_p)}
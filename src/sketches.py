@@ -0,0 +1,334 @@
+import os
+import math
+import numpy as np
+import pandas as pd
+import yaml
+from data_ingestion import DEFAULT_CHUNKSIZE, iter_steam_chunks
+from data_transformation import GENRE_NORMALIZER, extract_genre_column, parse_price_overview
+from labels import ALL_GENRES
+from storage import write_table
+
+
+# Estadísticas del catálogo completo de Steam con memoria acotada: cada
+# bloque de la ingesta actualiza resúmenes combinables (momentos, cuantiles
+# aproximados y conteo aproximado de distintos) por género, sin guardar
+# las filas.
+
+QUANTILES = [0.25, 0.5, 0.75, 0.9]
+# Año de lanzamiento dentro de `release_date` ("{'date': '26 Jul, 2012'}")
+RELEASE_YEAR_PATTERN = r"(?<!\d)((?:19|20)\d{2})(?!\d)"
+
+DEFAULT_KLL_K = 200
+DEFAULT_HLL_P = 12
+
+
+class Moments:
+    """Conteo, media, varianza, mínimo y máximo acumulados por bloques
+    (Welford, combinando bloques con la fórmula de Chan)."""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def _combine(self, count, mean, m2, low, high):
+        if not count:
+            return
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta ** 2 * self.count * count / total
+        self.count = total
+        self.min = min(self.min, low)
+        self.max = max(self.max, high)
+
+    def update(self, values: np.ndarray):
+        values = values[~np.isnan(values)]
+        if len(values):
+            mean = values.mean()
+            self._combine(len(values), mean, ((values - mean) ** 2).sum(),
+                          values.min(), values.max())
+
+    def merge(self, other: "Moments"):
+        self._combine(other.count, other.mean, other.m2, other.min, other.max)
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else math.nan
+
+
+class KLLSketch:
+    """Cuantiles aproximados con memoria O(k log(n/k)) (sketch KLL).
+
+    El nivel `h` guarda elementos que representan a 2^h valores. Cuando un
+    nivel supera su capacidad se ordena y se promueve la mitad de sus
+    elementos (los pares o los impares, al azar) al nivel siguiente. La
+    capacidad decrece geométricamente hacia los niveles bajos, así que el
+    error de rango es del orden de 1/k. Dos sketches se combinan juntando
+    sus niveles.
+    """
+
+    def __init__(self, k: int = DEFAULT_KLL_K, seed: int = 0):
+        self.k = k
+        self.n = 0
+        self.levels = [np.empty(0)]
+        self.rng = np.random.default_rng(seed)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - 1 - level
+        return max(2, int(math.ceil(self.k * (2 / 3) ** depth)))
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) <= self._capacity(level):
+                level += 1
+                continue
+            if level + 1 == len(self.levels):
+                self.levels.append(np.empty(0))
+            items = np.sort(items)
+            # Con un número impar de elementos uno se queda en el nivel
+            keep, items = items[:len(items) % 2], items[len(items) % 2:]
+            promoted = items[self.rng.integers(2)::2]
+            self.levels[level] = keep
+            self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            # Al crecer la altura bajan las capacidades: volver a empezar
+            level = 0
+
+    def update(self, values: np.ndarray):
+        values = values[~np.isnan(values)]
+        self.n += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+
+    def merge(self, other: "KLLSketch"):
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.n += other.n
+        self._compress()
+
+    def quantiles(self, qs) -> np.ndarray:
+        items = np.concatenate(self.levels)
+        if not len(items):
+            return np.full(len(qs), np.nan)
+        weights = np.concatenate([np.full(len(lv), 2.0 ** h) for h, lv in enumerate(self.levels)])
+        order = np.argsort(items, kind="stable")
+        cumulative = np.cumsum(weights[order])
+        ranks = np.asarray(qs, dtype=np.float64) * cumulative[-1]
+        positions = np.minimum(np.searchsorted(cumulative, ranks, side="left"), len(items) - 1)
+        return items[order][positions]
+
+
+class HyperLogLog:
+    """Conteo aproximado de valores distintos con 2^p registros de un byte
+    (error relativo ≈ 1.04 / sqrt(2^p)). Se combina con el máximo por
+    registro."""
+
+    def __init__(self, p: int = DEFAULT_HLL_P):
+        # Los bits bajos del hash (64 - p) se convierten a float sin pérdida
+        if not 11 <= p <= 18:
+            raise ValueError("HyperLogLog: p debe estar entre 11 y 18")
+        self.p = p
+        self.registers = np.zeros(1 << p, dtype=np.uint8)
+
+    def update(self, values: pd.Series):
+        values = values.dropna()
+        if not len(values):
+            return
+        hashes = pd.util.hash_pandas_object(values, index=False).to_numpy()
+        bits = 64 - self.p
+        index = (hashes >> np.uint64(bits)).astype(np.int64)
+        rest = (hashes & np.uint64((1 << bits) - 1)).astype(np.float64)
+        # Posición del primer 1 de los bits restantes (frexp da su longitud)
+        rank = (bits - np.frexp(rest)[1] + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other: "HyperLogLog"):
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self) -> int:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(2.0 ** -self.registers.astype(np.float64))
+        zeros = np.count_nonzero(self.registers == 0)
+        if estimate <= 2.5 * m and zeros:
+            # Corrección para cardinalidades pequeñas (conteo lineal)
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+
+class GenreSketch:
+    """Resúmenes de un género: filas, gratuitos y de pago, precios de los
+    juegos de pago, nombres distintos y juegos por año de lanzamiento."""
+
+    def __init__(self, kll_k: int = DEFAULT_KLL_K, hll_p: int = DEFAULT_HLL_P):
+        self.rows = 0
+        self.free = 0
+        self.paid = 0
+        self.prices = Moments()
+        self.quantiles = KLLSketch(kll_k)
+        self.names = HyperLogLog(hll_p)
+        self.years = pd.DataFrame(columns=["games", "free", "paid"], dtype=np.int64)
+
+    def update(self, names: pd.Series, price: np.ndarray, free: np.ndarray, years: pd.Series):
+        paid = price > 0
+        self.rows += len(price)
+        self.free += int(free.sum())
+        self.paid += int(paid.sum())
+        self.prices.update(price[paid])
+        self.quantiles.update(price[paid])
+        self.names.update(names)
+        by_year = pd.DataFrame({"games": 1, "free": free, "paid": paid},
+                               index=years.to_numpy()).groupby(level=0).sum()
+        self.years = by_year.astype(np.int64) if self.years.empty else \
+            self.years.add(by_year, fill_value=0).astype(np.int64)
+
+    def merge(self, other: "GenreSketch"):
+        self.rows += other.rows
+        self.free += other.free
+        self.paid += other.paid
+        self.prices.merge(other.prices)
+        self.quantiles.merge(other.quantiles)
+        self.names.merge(other.names)
+        self.years = other.years.copy() if self.years.empty else \
+            self.years.add(other.years, fill_value=0).astype(np.int64)
+
+
+class CatalogueSketch:
+    """Estadísticas por género del catálogo completo de Steam, alimentadas
+    bloque a bloque (p. ej. desde `ingest_data`) con memoria acotada: la
+    memoria depende del número de géneros y de `kll_k`/`hll_p`, no de las
+    filas. Se puede combinar con otro sketch (p. ej. de otra parte del
+    archivo) con `merge`.
+    """
+
+    # Columnas de Steam que usa `update`
+    COLUMNS = ["name", "genres", "price_overview", "is_free", "release_date"]
+
+    def __init__(self, kll_k: int = DEFAULT_KLL_K, hll_p: int = DEFAULT_HLL_P):
+        self.kll_k = kll_k
+        self.hll_p = hll_p
+        self.genres = {}
+
+    @classmethod
+    def from_config(cls, cfg: dict):
+        """Sketch según `catalogue_stats` en la configuración, o `None` si
+        está deshabilitado."""
+        stats_cfg = cfg.get("catalogue_stats", {}) or {}
+        if not stats_cfg.get("enabled", False):
+            return None
+        return cls(stats_cfg.get("kll_k", DEFAULT_KLL_K), stats_cfg.get("hll_p", DEFAULT_HLL_P))
+
+    def _genre(self, genre: str) -> GenreSketch:
+        if genre not in self.genres:
+            self.genres[genre] = GenreSketch(self.kll_k, self.hll_p)
+        return self.genres[genre]
+
+    def update(self, chunk: pd.DataFrame):
+        """Acumula un bloque de Steam crudo (columnas `COLUMNS`; las que
+        falten se tratan como nulas)."""
+        def column(name):
+            if name in chunk.columns:
+                return chunk[name]
+            return pd.Series(None, index=chunk.index, dtype=object)
+
+        genre = GENRE_NORMALIZER.normalize_column(extract_genre_column(column("genres")))
+        price = parse_price_overview(column("price_overview"))["price_final"].to_numpy()
+        is_free = column("is_free")
+        if is_free.dtype == object or pd.api.types.is_string_dtype(is_free):
+            is_free = is_free.astype("string").str.strip().str.lower() == "true"
+        free = is_free.fillna(False).to_numpy(dtype=bool)
+        # Mismo criterio que `transform_data`: gratuito sin precio -> 0
+        price = np.where(free & np.isnan(price), 0.0, price)
+        free = free | (price == 0)
+        years = pd.to_numeric(column("release_date").astype("string")
+                              .str.extract(RELEASE_YEAR_PATTERN)[0]).astype("Int64")
+        names = column("name")
+
+        self._genre(ALL_GENRES).update(names, price, free, years)
+        # Filas de cada género con un solo ordenamiento del bloque
+        codes, labels = pd.factorize(genre)
+        order = np.argsort(codes, kind="stable")
+        starts = np.searchsorted(codes[order], np.arange(len(labels) + 1))
+        for code, label in enumerate(labels):
+            rows = order[starts[code]:starts[code + 1]]
+            self._genre(label).update(names.iloc[rows], price[rows], free[rows],
+                                      years.iloc[rows])
+
+    def merge(self, other: "CatalogueSketch"):
+        for genre, sketch in other.genres.items():
+            self._genre(genre).merge(sketch)
+
+    def summary(self) -> pd.DataFrame:
+        """Una fila por género (y `(todos)`): juegos, nombres distintos
+        (aproximado), gratuitos, de pago y distribución de precios de los
+        juegos de pago (cuantiles aproximados)."""
+        rows = []
+        for genre, sketch in self.genres.items():
+            quantiles = sketch.quantiles.quantiles(QUANTILES)
+            rows.append({
+                "genre": genre, "games": sketch.rows,
+                "distinct_names": sketch.names.estimate(),
+                "free": sketch.free, "paid": sketch.paid,
+                "price_mean": sketch.prices.mean if sketch.prices.count else np.nan,
+                "price_std": sketch.prices.std,
+                "price_min": sketch.prices.min if sketch.prices.count else np.nan,
+                **{f"price_p{int(q * 100)}": v for q, v in zip(QUANTILES, quantiles)},
+                "price_max": sketch.prices.max if sketch.prices.count else np.nan,
+            })
+        return pd.DataFrame(rows).sort_values("games", ascending=False, kind="stable") \
+            .reset_index(drop=True)
+
+    def years(self) -> pd.DataFrame:
+        """Juegos, gratuitos y de pago por género y año de lanzamiento."""
+        tables = [sketch.years.rename_axis("release_year").reset_index().assign(genre=genre)
+                  for genre, sketch in self.genres.items() if not sketch.years.empty]
+        if not tables:
+            return pd.DataFrame(columns=["genre", "release_year", "games", "free", "paid"])
+        table = pd.concat(tables, ignore_index=True)
+        table["release_year"] = table["release_year"].astype("int64")
+        return table[["genre", "release_year", "games", "free", "paid"]] \
+            .sort_values(["genre", "release_year"]).reset_index(drop=True)
+
+    def write(self, directory: str, fmt: str = "csv", compression: str = None):
+        """Guarda `catalogue_summary` y `catalogue_years` en `directory` y
+        devuelve sus rutas."""
+        os.makedirs(directory, exist_ok=True)
+        paths = [write_table(self.summary(), os.path.join(directory, "catalogue_summary"),
+                             fmt, compression),
+                 write_table(self.years(), os.path.join(directory, "catalogue_years"),
+                             fmt, compression)]
+        print("✔ Estadísticas del catálogo guardadas en:", directory)
+        return paths
+
+
+def sketch_steam(steam_file: str, chunksize: int = DEFAULT_CHUNKSIZE,
+                 kll_k: int = DEFAULT_KLL_K, hll_p: int = DEFAULT_HLL_P) -> CatalogueSketch:
+    """Estadísticas del catálogo leyendo el CSV de Steam por bloques, sin
+    pasar por la ingesta."""
+    sketch = CatalogueSketch(kll_k, hll_p)
+    for chunk in iter_steam_chunks(steam_file, CatalogueSketch.COLUMNS, chunksize):
+        sketch.update(chunk)
+    return sketch
+
+
+if __name__ == "__main__":
+    config_path = "config/pipeline_config.yaml"
+    if os.path.exists(config_path):
+        with open(config_path, "r", encoding="utf-8") as fh:
+            cfg = yaml.safe_load(fh)
+    else:
+        cfg = {}
+    paths = cfg.get("paths", {})
+    stats_cfg = cfg.get("catalogue_stats", {}) or {}
+    steam_file = os.path.join(paths.get("raw_data", "data/raw/"),
+                              cfg.get("files", {}).get("steam_dataset", "steam_app_data.csv"))
+    sketch = sketch_steam(steam_file, cfg.get("ingestion", {}).get("chunksize", DEFAULT_CHUNKSIZE),
+                          stats_cfg.get("kll_k", DEFAULT_KLL_K),
+                          stats_cfg.get("hll_p", DEFAULT_HLL_P))
+    sketch.write(paths.get("processed_data", "data/processed/"))
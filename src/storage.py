@@ -0,0 +1,193 @@
+import os
+import json
+import pandas as pd
+
+
+# Extensiones por formato soportado. Parquet y Feather (Arrow IPC) guardan
+# los tipos y permiten leer sólo algunas columnas sin parsear texto.
+FORMATS = {
+    "parquet": ".parquet",
+    "feather": ".feather",
+    "csv": ".csv",
+}
+
+DEFAULT_COMPRESSION = {
+    "parquet": "zstd",
+    "feather": "lz4",
+    "csv": None,
+}
+
+
+def table_path(base: str, fmt: str) -> str:
+    """Ruta del archivo para la tabla `base` (sin extensión) en `fmt`."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Formato de almacenamiento no soportado: {fmt}")
+    return base + FORMATS[fmt]
+
+
+def schema_path(base: str) -> str:
+    """Ruta del manifiesto de esquema de la tabla `base`."""
+    return base + ".schema.json"
+
+
+def write_schema(base: str, fmt: str, columns: dict, rows: int):
+    """Guarda junto a la tabla un manifiesto con su formato, número de filas
+    y el tipo de cada columna."""
+    manifest = {
+        "file": os.path.basename(table_path(base, fmt)),
+        "format": fmt,
+        "rows": int(rows),
+        "columns": {str(c): str(d) for c, d in columns.items()},
+    }
+    with open(schema_path(base), "w", encoding="utf-8") as fh:
+        json.dump(manifest, fh, indent=2, ensure_ascii=False)
+
+
+def read_schema(base: str):
+    """Manifiesto de esquema de la tabla `base`, o `None` si no existe."""
+    path = schema_path(base)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def find_table(base: str):
+    """Devuelve `(ruta, formato)` de la tabla `base`; `None` si no hay.
+
+    Si existe manifiesto de esquema se usa el formato que indica (así no se
+    lee una versión vieja en otro formato); si no, la primera versión en
+    disco, prefiriendo los formatos columnares.
+    """
+    schema = read_schema(base)
+    if schema is not None and os.path.exists(table_path(base, schema["format"])):
+        return table_path(base, schema["format"]), schema["format"]
+    for fmt in FORMATS:
+        path = table_path(base, fmt)
+        if os.path.exists(path):
+            return path, fmt
+    return None
+
+
+def write_table(df: pd.DataFrame, base: str, fmt: str = "csv",
+                compression: str = None) -> str:
+    """Guarda `df` como `base` + extensión del formato y devuelve la ruta."""
+    path = table_path(base, fmt)
+    compression = compression or DEFAULT_COMPRESSION[fmt]
+    if fmt == "parquet":
+        df.to_parquet(path, index=False, compression=compression)
+    elif fmt == "feather":
+        df.reset_index(drop=True).to_feather(path, compression=compression)
+    else:
+        df.to_csv(path, index=False)
+    write_schema(base, fmt, df.dtypes.to_dict(), len(df))
+    return path
+
+
+def read_table(base: str, columns=None, fmt: str = None) -> pd.DataFrame:
+    """Lee la tabla `base` cargando sólo `columns` (si se indican).
+
+    Si no se indica `fmt` se usa el del manifiesto de esquema o el primer
+    formato disponible en disco. Los CSV con manifiesto se leen con los
+    tipos guardados, sin necesidad de convertir columnas después.
+    """
+    if fmt is None:
+        found = find_table(base)
+        if found is None:
+            raise FileNotFoundError(f"No existe ninguna versión de la tabla: {base}")
+        path, fmt = found
+    else:
+        path = table_path(base, fmt)
+
+    if columns is not None and fmt != "csv":
+        # Ignorar columnas pedidas que no existan en la tabla
+        available = set(table_columns(path, fmt))
+        columns = [c for c in columns if c in available]
+
+    if fmt == "parquet":
+        return pd.read_parquet(path, columns=columns)
+    if fmt == "feather":
+        return pd.read_feather(path, columns=columns)
+
+    schema = read_schema(base)
+    dtypes = schema["columns"] if schema and schema["format"] == "csv" else {}
+    wanted = set(columns) if columns is not None else None
+    return pd.read_csv(path, usecols=(lambda c: c in wanted) if wanted is not None else None,
+                       dtype={c: d for c, d in dtypes.items()
+                              if wanted is None or c in wanted},
+                       low_memory=False)
+
+
+def table_columns(path: str, fmt: str) -> list:
+    """Nombres de columnas de una tabla columnar sin leer sus datos."""
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        return pq.read_schema(path).names
+    import pyarrow as pa
+    with pa.memory_map(path) as source:
+        return pa.ipc.open_file(source).schema.names
+
+
+class TableWriter:
+    """Escritor incremental: agrega bloques de un DataFrame a una misma tabla.
+
+    Uso:
+        with TableWriter(base, "parquet") as writer:
+            for chunk in chunks:
+                writer.write(chunk)
+    """
+
+    def __init__(self, base: str, fmt: str = "csv", compression: str = None):
+        self.path = table_path(base, fmt)
+        self.fmt = fmt
+        self.compression = compression or DEFAULT_COMPRESSION[fmt]
+        self.base = base
+        self._writer = None
+        self._schema = None
+        self._first = True
+        self._dtypes = None
+        self._rows = 0
+
+    def write(self, chunk: pd.DataFrame):
+        if self._dtypes is None:
+            self._dtypes = chunk.dtypes.to_dict()
+        self._rows += len(chunk)
+        if self.fmt == "csv":
+            chunk.to_csv(self.path, index=False,
+                         mode="w" if self._first else "a", header=self._first)
+            self._first = False
+            return
+
+        import pyarrow as pa
+
+        table = pa.Table.from_pandas(chunk, preserve_index=False)
+        if self._writer is None:
+            # Columnas vacías en el primer bloque se fijan como texto para
+            # que los bloques siguientes puedan convertirse al mismo esquema
+            fields = [pa.field(f.name, pa.string()) if pa.types.is_null(f.type) else f
+                      for f in table.schema]
+            self._schema = pa.schema(fields, metadata=table.schema.metadata)
+            self._writer = self._open(pa)
+        self._writer.write_table(table.cast(self._schema))
+
+    def _open(self, pa):
+        if self.fmt == "parquet":
+            import pyarrow.parquet as pq
+            return pq.ParquetWriter(self.path, self._schema,
+                                    compression=self.compression)
+        options = pa.ipc.IpcWriteOptions(
+            compression=None if self.compression == "uncompressed" else self.compression)
+        return pa.ipc.new_file(self.path, self._schema, options=options)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if self._dtypes is not None:
+            write_schema(self.base, self.fmt, self._dtypes, self._rows)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,145 @@
+import sys
+import os
+import pandas as pd
+import yaml
+
+# Asegurar que pytest encuentre los módulos de src
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), "src"))
+
+from aggregates import (build_genre_cube, build_top_games, finalize_partials,
+                        merge_partials, twitch_partials, TwitchPartialStore)
+from data_transformation import transform_data
+from storage import find_table, read_table
+
+
+DF = pd.DataFrame({
+    "name": [f"juego {i}" for i in range(8)],
+    "genre": pd.Categorical(["Acción"] * 5 + ["Indie"] * 3),
+    "hours_watched": [10, 20, 30, 40, 50, 5, 6, 7],
+    "avg_viewers": [1.0, 2.0, 3.0, 4.0, None, 5.0, 6.0, 7.0],
+    "price": [0.0, 9.99, 19.99, 4.99, 0.0, 1.0, 2.0, 3.0],
+})
+
+
+def test_genre_cube_matches_groupby():
+    cube = build_genre_cube(DF).set_index("genre")
+
+    expected = DF.groupby("genre", observed=True)
+    assert cube["n_games"].tolist() == [5, 3]
+    assert cube["hours_watched_sum"].tolist() == expected["hours_watched"].sum().tolist()
+    assert cube["avg_viewers_count"].tolist() == [4, 3]
+    assert cube["avg_viewers_p50"].tolist() == expected["avg_viewers"].median().tolist()
+    # Mediana global de avg_viewers = 4.0
+    assert cube["popular_count"].tolist() == [0, 3]
+
+
+def test_cube_sums_reproduce_global_mean():
+    cube = build_genre_cube(DF)
+
+    mean = cube["price_sum"].sum() / cube["price_count"].sum()
+    assert abs(mean - DF["price"].mean()) < 1e-9
+
+
+def test_genre_cube_without_genres_is_empty():
+    full = build_genre_cube(DF)
+    no_genre = DF.assign(genre=pd.Categorical([None] * len(DF), categories=["Acción"]))
+
+    for df in (DF.iloc[:0], no_genre):
+        cube = build_genre_cube(df)
+        assert cube.empty
+        assert list(cube.columns) == list(full.columns)
+
+
+def test_top_games_per_genre():
+    top = build_top_games(DF, n=2)
+
+    assert top["name"].tolist() == ["juego 4", "juego 3", "juego 7", "juego 6"]
+
+
+def test_cube_uses_dashboard_labels_without_changing_merged_genres(tmp_path):
+    steam = pd.DataFrame({"name": ["Halo", "Portal", "Doom"],
+                          "genres": ["[{'id': '1', 'description': 'Acción'}]",
+                                     "[{'id': '2', 'description': 'Akcja'}]",
+                                     "[{'id': '1', 'description': 'Action'}]"],
+                          "price_overview": ["{'final': 999}"] * 3})
+    twitch = pd.DataFrame({"Game": ["halo", "portal", "doom"],
+                           "hours_watched": [10, 20, 30], "avg_viewers": [1.0, 2.0, 3.0]})
+
+    merged = transform_data(steam, twitch, config_path="no_existe.yaml",
+                            output_dir=str(tmp_path))
+    cube = read_table(str(tmp_path / "genre_cube"), fmt=find_table(str(tmp_path / "genre_cube"))[1])
+
+    # merged_data conserva los géneros de GENRE_MAP; sólo el cubo une las variantes
+    assert sorted(merged["genre"].astype(str)) == ["Accion", "Acción", "Akcja"]
+    assert cube.set_index("genre")["n_games"].to_dict() == {"Acción": 3}
+
+
+TWITCH = pd.DataFrame({
+    "title_key": ["halo", "portal", "halo", "halo", "portal"],
+    "month": [1, 1, 2, 3, 3],
+    "year": [2020] * 5,
+    "hours_watched": [10, 20, 30, 40, 50],
+    "peak_viewers": [5, 9, 7, 3, 1],
+    "avg_viewers": [1.0, 2.0, None, 4.0, 6.0],
+})
+
+
+def test_merged_partials_match_full_groupby():
+    parts = [twitch_partials(TWITCH[TWITCH["month"] == m]) for m in [1, 2, 3]]
+
+    result = finalize_partials(merge_partials(*parts)).set_index("title_key").sort_index()
+    expected = TWITCH.groupby("title_key").agg(
+        {"hours_watched": "sum", "peak_viewers": "max", "avg_viewers": "mean"})
+
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False, check_names=False)
+
+
+def test_incremental_transform_folds_new_months(tmp_path):
+    config = tmp_path / "config.yaml"
+    config.write_text(yaml.safe_dump({"twitch_aggregation": {"mode": "incremental"}}))
+    steam = pd.DataFrame({"name": ["Halo", "Portal"],
+                          "genres": ["[{'id': '1', 'description': 'Action'}]"] * 2,
+                          "price_overview": ["{'final': 999}"] * 2})
+    twitch = TWITCH.rename(columns={"title_key": "Game"})
+
+    def run(rows, out):
+        return transform_data(steam.copy(), rows.copy(), config_path=str(config),
+                              output_dir=str(out)).set_index("name").sort_index()
+
+    run(twitch[twitch["month"] < 3], tmp_path / "inc")
+    incremental = run(twitch, tmp_path / "inc")
+    full = run(twitch, tmp_path / "full")
+
+    assert incremental["hours_watched"].tolist() == [80, 70]
+    pd.testing.assert_frame_equal(incremental, full)
+    # Sin meses nuevos el resultado no cambia
+    pd.testing.assert_frame_equal(run(twitch, tmp_path / "inc"), full)
+
+
+def test_partial_store_rebuilds_when_key_normalization_changes(tmp_path, monkeypatch):
+    store = TwitchPartialStore(str(tmp_path))
+    store.fold(TWITCH, None, pd.DataFrame(columns=["year", "month"]))
+    assert store.load()[0] is not None
+
+    monkeypatch.setattr(TwitchPartialStore, "_keys_version", staticmethod(lambda: "otra"))
+    partials, periods = store.load()
+    assert partials is None and periods.empty
+
+
+def test_incremental_transform_skips_invalid_periods(tmp_path):
+    config = tmp_path / "config.yaml"
+    config.write_text(yaml.safe_dump({"twitch_aggregation": {"mode": "incremental"}}))
+    steam = pd.DataFrame({"name": ["Halo", "Portal"],
+                          "genres": ["[{'id': '1', 'description': 'Action'}]"] * 2,
+                          "price_overview": ["{'final': 999}"] * 2})
+    twitch = TWITCH.rename(columns={"title_key": "Game"}).astype({"month": object})
+    twitch.loc[1, "month"] = None
+    twitch.loc[4, "month"] = "n/d"
+
+    def run():
+        return transform_data(steam.copy(), twitch.copy(), config_path=str(config),
+                              output_dir=str(tmp_path)).set_index("name").sort_index()
+
+    first = run()
+    assert first["hours_watched"].tolist() == [80]
+    pd.testing.assert_frame_equal(run(), first)
@@ -0,0 +1,151 @@
+import sys
+import os
+import numpy as np
+import pandas as pd
+import pytest
+import yaml
+from scipy.stats import kendalltau, spearmanr
+
+# Asegurar que pytest encuentre los módulos de src
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), "src"))
+
+import analysis
+from analysis import correlation_matrix, run_analysis
+from labels import ALL_GENRES
+
+
+def _sample(n=120, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "genre": pd.Categorical(rng.choice(["Acción", "Indie", "RPG"], n)),
+        "price": rng.choice([0.0, 4.99, 9.99, 19.99], n),
+        "hours_watched": rng.integers(1, 1000, n),
+        "avg_viewers": rng.gamma(2.0, 10.0, n),
+        "streamers": rng.integers(1, 20, n),
+    })
+    df.loc[3, "avg_viewers"] = np.nan
+    return df
+
+
+@pytest.mark.parametrize("max_rows", [10_000, 0])
+def test_correlation_matrix_matches_scipy(monkeypatch, max_rows):
+    # Con max_rows=0 Kendall usa `kendalltau` por pareja en todos los grupos
+    monkeypatch.setattr(analysis, "KENDALL_MATRIX_MAX_ROWS", max_rows)
+    df = _sample()
+
+    table = correlation_matrix(df, by="genre", kendall=True)
+
+    complete = df.dropna()
+    assert set(table["genre"]) == {ALL_GENRES, "Acción", "Indie", "RPG"}
+    assert len(table) == 4 * 2 * 6
+    for row in table.itertuples():
+        sub = complete if row.genre == ALL_GENRES else complete[complete["genre"] == row.genre]
+        if row.method == "spearman":
+            coef, p = spearmanr(sub[row.x], sub[row.y])
+        else:
+            coef, p = kendalltau(sub[row.x], sub[row.y], method="asymptotic")
+        assert row.n == len(sub)
+        assert row.coef == pytest.approx(coef, abs=1e-10)
+        assert row.p_value == pytest.approx(p, abs=1e-10)
+
+
+def test_correlation_matrix_skips_small_groups_and_missing_columns():
+    df = _sample().drop(columns="streamers")
+    genre = df["genre"].astype(object)
+    genre[:5] = "Raro"
+    genre[:3] = None
+    df["genre"] = genre.astype("category")
+
+    table = correlation_matrix(df, by="genre", min_rows=5)
+
+    assert "Raro" not in set(table["genre"])
+    assert set(table["x"]) | set(table["y"]) == {"price", "hours_watched", "avg_viewers"}
+
+
+def test_run_analysis_writes_correlation_table(tmp_path):
+    run_analysis(_sample(), output=str(tmp_path), config_path="no_existe.yaml")
+
+    table = pd.read_csv(tmp_path / "analysis_correlations.csv")
+    assert list(table.columns) == ["genre", "method", "x", "y", "n", "coef", "p_value"]
+    assert (table["method"] == "spearman").all()
+
+
+def test_run_analysis_adds_resampling_columns(tmp_path):
+    config = tmp_path / "config.yaml"
+    config.write_text(yaml.safe_dump({"analysis": {
+        "correlation_matrix": False,
+        "resampling": {"enabled": True, "n_resamples": 200, "seed": 1},
+    }}))
+
+    summary = run_analysis(_sample(), output=str(tmp_path), config_path=str(config))
+
+    stats = summary.set_index(["analysis", "statistic"])["value"]
+    assert stats["spearman", "ci_low"] <= stats["spearman", "corr"] <= stats["spearman", "ci_high"]
+    assert stats["kruskal", "ci_low"] <= stats["kruskal", "stat"] <= stats["kruskal", "ci_high"]
+    assert 0 < stats["spearman", "perm_p"] <= 1 and 0 < stats["kruskal", "perm_p"] <= 1
+    assert not (tmp_path / "analysis_correlations.csv").exists()
+
+
+def test_concurrent_resampling_analyses_share_workers(tmp_path, monkeypatch):
+    config = tmp_path / "config.yaml"
+    config.write_text(yaml.safe_dump({"analysis": {
+        "workers": 2, "correlation_matrix": False, "posthoc": {"enabled": False},
+        "resampling": {"enabled": True, "workers": 4},
+    }}))
+    workers = {}
+
+    def fake(name):
+        def run(*args, **options):
+            workers[name] = options["workers"]
+            return {}
+        return run
+
+    monkeypatch.setattr(analysis, "spearman_resampling", fake("spearman"))
+    monkeypatch.setattr(analysis, "kruskal_resampling", fake("kruskal"))
+    run_analysis(_sample(), output=str(tmp_path), config_path=str(config))
+
+    # Spearman y Kruskal corren a la vez: entre los dos no pasan de 4 procesos
+    assert workers == {"spearman": 2, "kruskal": 2}
+
+
+def test_run_analysis_honours_config_flags(tmp_path):
+    config = tmp_path / "config.yaml"
+    cfg = {"analysis": {"use_spearman": False, "posthoc": {"enabled": False}}}
+    config.write_text(yaml.safe_dump(cfg))
+
+    summary = run_analysis(_sample(), output=str(tmp_path), config_path=str(config))
+
+    assert list(summary.columns) == ["analysis", "statistic", "value"]
+    assert set(summary["analysis"]) == {"kruskal"}
+    assert not (tmp_path / "analysis_posthoc.csv").exists()
+    assert (tmp_path / "analysis_correlations.csv").exists()
+    assert set(analysis.analysis_columns(cfg)) == \
+        set(analysis.CORRELATION_COLUMNS) | {"genre"}
+
+    # Al desactivar un análisis se borran sus tablas anteriores
+    cfg["analysis"]["correlation_matrix"] = False
+    config.write_text(yaml.safe_dump(cfg))
+    run_analysis(_sample(), output=str(tmp_path), config_path=str(config))
+    assert not (tmp_path / "analysis_correlations.csv").exists()
+
+
+def test_run_analysis_skips_unchanged_analyses(tmp_path, monkeypatch):
+    calls = []
+    for name, spec in analysis.ANALYSES.items():
+        monkeypatch.setitem(spec, "func", lambda df, cfg, name=name, func=spec["func"]:
+                            calls.append(name) or func(df, cfg))
+    df = _sample()
+
+    first = run_analysis(df, output=str(tmp_path), config_path="no_existe.yaml")
+    assert sorted(calls) == ["correlations", "kruskal", "posthoc", "spearman"]
+
+    # Sólo cambia `price`: únicamente la matriz de correlaciones lo usa
+    calls.clear()
+    df["price"] = df["price"] * 2 + 1
+    second = run_analysis(df, output=str(tmp_path), config_path="no_existe.yaml")
+    assert calls == ["correlations"]
+    pd.testing.assert_frame_equal(first, second)
+
+    calls.clear()
+    run_analysis(df, output=str(tmp_path), config_path="no_existe.yaml", force=True)
+    assert len(calls) == 4
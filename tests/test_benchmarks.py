@@ -0,0 +1,66 @@
+import sys
+import os
+import pandas as pd
+
+# Asegurar que pytest encuentre los módulos de src y benchmarks
+ROOT = os.path.dirname(os.path.dirname(__file__))
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, "src"))
+
+from benchmarks.run_benchmarks import baseline_problems, compare, machine_info
+from benchmarks.synthetic import make_steam, make_twitch, write_sources
+from data_ingestion import ingest_data
+from data_transformation import extract_genre, parse_price_overview, transform_data
+from data_validation import validate_data
+
+
+def test_generators_are_deterministic():
+    pd.testing.assert_frame_equal(make_steam(500, seed=3), make_steam(500, seed=3))
+    pd.testing.assert_frame_equal(make_twitch(480, 500, seed=3), make_twitch(480, 500, seed=3))
+    assert not make_steam(500, seed=3).equals(make_steam(500, seed=4))
+
+
+def test_steam_strings_use_real_quoting():
+    steam = make_steam(2000, seed=0)
+
+    genres = steam["genres"].dropna()
+    assert genres.map(extract_genre).notna().all()
+    assert genres.str.contains("\"Hack 'n' Slash\"", regex=False).any()
+    prices = parse_price_overview(steam["price_overview"])
+    assert prices["price_final"].notna().sum() == steam["price_overview"].notna().sum()
+
+
+def test_synthetic_sources_run_through_pipeline(tmp_path):
+    steam_file, twitch_file = write_sources(str(tmp_path / "input"), 2400, seed=1)
+
+    steam_df, twitch_df = ingest_data(steam_file, twitch_file, config_path="no_existe.yaml",
+                                      output_dir=str(tmp_path / "raw"), mode="streaming")
+    merged = transform_data(steam_df, twitch_df, config_path="no_existe.yaml",
+                            output_dir=str(tmp_path / "processed"))
+
+    assert len(steam_df) == 2400 and len(twitch_df) == 2400
+    assert len(merged) > 0
+    assert validate_data(merged) == []
+
+
+def test_compare_flags_slow_stages():
+    baselines = {"machine": machine_info(),
+                 "scales": {"10k": {"ingest_data": 1.0, "transform_data": 2.0}}}
+    results = {"10k": {"ingest_data": 1.1, "transform_data": 3.0}}
+
+    assert baseline_problems(results, baselines, machine_info()) == []
+    assert compare(results, baselines, tolerance=0.25) == [("10k", "transform_data", 2.0, 3.0)]
+    # Diferencias por debajo de la holgura absoluta no cuentan
+    assert compare({"10k": {"ingest_data": 0.08}},
+                   {"scales": {"10k": {"ingest_data": 0.02}}}, tolerance=0.5) == []
+
+
+def test_missing_or_foreign_baseline_is_not_comparable():
+    results = {"10k": {"ingest_data": 1.1, "run_analysis": 0.5}}
+    machine = machine_info()
+    baselines = {"machine": machine, "scales": {"10k": {"ingest_data": 1.0}}}
+
+    assert baseline_problems(results, {}, machine)
+    assert baseline_problems(results, dict(baselines, machine=dict(machine, cpus=-1)), machine)
+    assert baseline_problems(results, baselines, machine) == \
+        ["Sin línea base para 10k: run_analysis."]
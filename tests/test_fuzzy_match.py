@@ -0,0 +1,73 @@
+import sys
+import os
+import pandas as pd
+import yaml
+
+# Asegurar que pytest encuentre los módulos de src
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), "src"))
+
+import fuzzy_match
+from fuzzy_match import NgramIndex, cached_match_titles, match_titles
+from data_transformation import transform_data
+
+
+KEYS = ["halo 2", "halo 3", "the witcher 3 wild hunt",
+        "counter strike global offensive", "portal"]
+
+
+def test_ngram_index_candidates_and_sequels():
+    index = NgramIndex(KEYS)
+
+    assert index.keys[index.candidates("witcher 3 wild hunt")[0]] == "the witcher 3 wild hunt"
+    assert index.best_match("halo  2", threshold=0.85)[0] == "halo 2"
+    # Los números deben coincidir: "portal 2" no es "portal"
+    assert index.best_match("portal 2")[0] is None
+    assert index.best_match("halo 4")[0] is None
+
+
+def test_match_titles_is_one_to_one():
+    table = match_titles(["counter strike global offensiv", "counter strike global offensiva"],
+                         KEYS, threshold=0.85, workers=1)
+
+    assert table["query"].tolist() == ["counter strike global offensiv",
+                                       "counter strike global offensiva"]
+    assert table["match"].notna().sum() == 1
+
+
+def test_cached_match_titles_only_matches_new_queries(tmp_path, monkeypatch):
+    first = cached_match_titles(["witcher 3 wild hunt", "zzz"], KEYS, str(tmp_path))
+    assert first["match"].tolist()[0] == "the witcher 3 wild hunt"
+
+    calls = []
+    original = fuzzy_match.match_titles
+
+    def spy(queries, *args, **kwargs):
+        calls.append(list(queries))
+        return original(queries, *args, **kwargs)
+
+    monkeypatch.setattr(fuzzy_match, "match_titles", spy)
+    again = cached_match_titles(["witcher 3 wild hunt", "zzz", "halo  2"], KEYS,
+                                str(tmp_path))
+
+    assert calls == [["halo  2"]]
+    assert again["match"].isna().tolist() == [False, True, False]
+    assert again["match"].dropna().tolist() == ["the witcher 3 wild hunt", "halo 2"]
+
+
+def test_transform_recovers_fuzzy_matches(tmp_path):
+    config = tmp_path / "config.yaml"
+    config.write_text(yaml.safe_dump({"matching": {"fuzzy": True, "threshold": 0.85}}))
+    steam = pd.DataFrame({
+        "name": ["The Witcher 3: Wild Hunt", "Halo 3", "Portal"],
+        "genres": ["[{'id': '1', 'description': 'RPG'}]"] * 3,
+        "price_overview": ["{'final': 999}"] * 3,
+    })
+    twitch = pd.DataFrame({"Game": ["Witcher 3 Wild Hunt", "Halo 2", "Portal"],
+                           "Hours_watched": [10, 20, 30], "Avg_viewers": [1.0, 2.0, 3.0]})
+
+    merged = transform_data(steam, twitch, config_path=str(config),
+                            output_dir=str(tmp_path))
+
+    assert sorted(merged["name"].tolist()) == ["Portal", "The Witcher 3: Wild Hunt"]
+    assert merged.attrs["join_stats"]["fuzzy_matched"] == 1
+    assert (tmp_path / "fuzzy_matches.csv").exists()
@@ -0,0 +1,133 @@
+import sys
+import os
+import pandas as pd
+import pytest
+import yaml
+
+# Asegurar que pytest encuentre los módulos de src
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), "src"))
+
+from data_validation import ChunkValidator, ValidationError
+from data_ingestion import (ingest_data, iter_steam_chunks, load_raw_data,
+                            read_steam_parallel, split_csv_ranges)
+
+
+def _write_sources(tmp_path):
+    steam = pd.DataFrame({
+        "name": ["Halo", "Minecraft", "Dota 2"],
+        "genres": ["[{'id': '1', 'description': 'Action'}]"] * 3,
+        "price_overview": ["{'currency': 'USD', 'initial': 999, 'final': 999}"] * 3,
+        "is_free": ["False", "False", "True"],
+        "detailed_description": ["texto largo"] * 3,
+    })
+    twitch = pd.DataFrame({
+        "Game": ["Halo", "Dota 2"],
+        "Hours_watched": [10, 20],
+        "Avg_viewers": [1, 2],
+    })
+    steam_file = tmp_path / "steam.csv"
+    twitch_file = tmp_path / "twitch.csv"
+    steam.to_csv(steam_file, index=False)
+    twitch.to_csv(twitch_file, index=False)
+    return str(steam_file), str(twitch_file)
+
+
+def test_iter_steam_chunks_projects_columns(tmp_path):
+    steam_file, _ = _write_sources(tmp_path)
+
+    chunks = list(iter_steam_chunks(steam_file, {"name", "is_free", "genre"},
+                                    chunksize=2))
+
+    assert [len(c) for c in chunks] == [2, 1]
+    assert list(chunks[0].columns) == ["name", "is_free"]
+    assert str(chunks[0]["is_free"].dtype) == "boolean"
+
+
+def test_ingest_streaming_matches_full(tmp_path):
+    steam_file, twitch_file = _write_sources(tmp_path)
+
+    full, _ = ingest_data(steam_file, twitch_file, config_path="no_existe.yaml",
+                          output_dir=str(tmp_path / "full"), mode="full")
+    streamed, _ = ingest_data(steam_file, twitch_file, config_path="no_existe.yaml",
+                              output_dir=str(tmp_path / "stream"),
+                              mode="streaming", chunksize=2)
+
+    assert "detailed_description" not in streamed.columns
+    assert streamed["name"].tolist() == full["name"].tolist()
+    assert streamed["is_free"].tolist() == full["is_free"].tolist()
+    assert len(pd.read_csv(tmp_path / "stream" / "steam_raw.csv")) == 3
+
+
+def test_ingest_writes_columnar_raw_store(tmp_path):
+    steam_file, twitch_file = _write_sources(tmp_path)
+    raw_dir = tmp_path / "raw"
+    config = tmp_path / "config.yaml"
+    config.write_text(yaml.safe_dump({
+        "paths": {"raw_data": str(raw_dir)},
+        "ingestion": {"mode": "streaming", "chunksize": 2},
+        "storage": {"raw_format": "parquet"},
+    }))
+
+    ingest_data(steam_file, twitch_file, config_path=str(config))
+    steam_df, twitch_df = load_raw_data(str(config), steam_cols=["name", "is_free", "no_existe"])
+
+    assert (raw_dir / "steam_raw.parquet").exists()
+    assert not (raw_dir / "steam_raw.csv").exists()
+    assert list(steam_df.columns) == ["name", "is_free"]
+    assert steam_df["is_free"].tolist() == [False, False, True]
+    assert len(twitch_df) == 2
+
+
+def test_split_csv_ranges_respects_quoted_newlines(tmp_path):
+    df = pd.DataFrame({
+        "name": [f'Juego "{i}"' if i % 3 == 0 else f"Juego, {i}" for i in range(200)],
+        "detailed_description": ["una\nlinea \"dos\"\n" if i % 2 else "texto" for i in range(200)],
+    })
+    path = tmp_path / "steam.csv"
+    df.to_csv(path, index=False)
+
+    _, ranges = split_csv_ranges(str(path), part_bytes=64)
+    result = read_steam_parallel(str(path), workers=2, part_bytes=64)
+
+    assert len(ranges) > 10
+    assert ranges[-1][1] == os.path.getsize(path)
+    assert result["name"].tolist() == df["name"].tolist()
+    assert result["detailed_description"].tolist() == df["detailed_description"].tolist()
+
+
+def test_ingest_parallel_matches_streaming(tmp_path):
+    steam_file, twitch_file = _write_sources(tmp_path)
+
+    streamed, _ = ingest_data(steam_file, twitch_file, config_path="no_existe.yaml",
+                              output_dir=str(tmp_path / "stream"), mode="streaming")
+    parallel, twitch = ingest_data(steam_file, twitch_file, config_path="no_existe.yaml",
+                                   output_dir=str(tmp_path / "parallel"), mode="parallel",
+                                   workers=2)
+
+    pd.testing.assert_frame_equal(parallel, streamed)
+    assert len(twitch) == 2
+
+
+def test_ingest_streaming_stops_on_invalid_chunk(tmp_path):
+    steam_file, twitch_file = _write_sources(tmp_path)
+    pd.concat([pd.read_csv(steam_file)] * 3).to_csv(steam_file, index=False)
+    validator = ChunkValidator(unique={"name": 0.1}, min_rows=1)
+
+    with pytest.raises(ValidationError):
+        ingest_data(steam_file, twitch_file, config_path="no_existe.yaml",
+                    output_dir=str(tmp_path / "raw"), mode="streaming",
+                    chunksize=3, validator=validator)
+    # Se detuvo en el segundo bloque, sin leer el resto
+    assert validator.rows == 6
+
+
+def test_parallel_validation_samples_use_file_row_numbers(tmp_path):
+    names = [f"juego {i}" for i in range(40)]
+    names[5] = names[27] = None
+    path = tmp_path / "steam.csv"
+    pd.DataFrame({"name": names, "is_free": ["False"] * 40}).to_csv(path, index=False)
+    validator = ChunkValidator(not_null={"name": 0.5}, min_rows=1)
+
+    read_steam_parallel(str(path), workers=2, part_bytes=64, validator=validator)
+
+    assert validator.samples[("check_not_null", "name")] == [5, 27]
@@ -0,0 +1,78 @@
+import sys
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.stats import false_discovery_control, kruskal, mannwhitneyu, norm, rankdata
+
+# Asegurar que pytest encuentre los módulos de src
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), "src"))
+
+import nonparametric
+from nonparametric import RankedGroups, adjust_pvalues
+
+
+RNG = np.random.default_rng(11)
+VALUES = np.round(RNG.gamma(2.0, 5.0, 400))
+GENRES = pd.Series(RNG.choice(["Acción", "Indie", "RPG", "MMO", "Carreras"], 400))
+VALUES[:5] = np.nan
+GENRES[5:9] = None
+
+
+def test_kruskal_matches_scipy():
+    ranked = RankedGroups(VALUES, GENRES)
+
+    expected = kruskal(*ranked.groups())
+    assert ranked.labels == sorted(GENRES.dropna().unique())
+    assert ranked.kruskal() == pytest.approx((expected.statistic, expected.pvalue))
+    assert RankedGroups(VALUES, ["Acción"] * len(VALUES)).kruskal() == (None, None)
+
+
+@pytest.mark.parametrize("block", [50_000, 3])
+def test_mann_whitney_matches_scipy(monkeypatch, block):
+    monkeypatch.setattr(nonparametric, "RUN_BLOCK", block)
+    ranked = RankedGroups(VALUES, GENRES)
+
+    u, p = ranked.mann_whitney()
+
+    groups = ranked.groups()
+    pairs = zip(*np.triu_indices(len(groups), k=1))
+    expected = [mannwhitneyu(groups[i], groups[j], method="asymptotic") for i, j in pairs]
+    np.testing.assert_allclose(u, [e.statistic for e in expected])
+    np.testing.assert_allclose(p, [e.pvalue for e in expected])
+
+
+def test_dunn_matches_direct_formula():
+    ranked = RankedGroups(VALUES, GENRES)
+
+    z, p = ranked.dunn()
+
+    values = np.concatenate(ranked.groups())
+    ranks = np.split(rankdata(values), np.cumsum(ranked.sizes)[:-1])
+    n = len(values)
+    ties = np.unique(values, return_counts=True)[1]
+    variance = n * (n + 1) / 12 - (ties ** 3 - ties).sum() / (12 * (n - 1))
+    expected = [(ranks[i].mean() - ranks[j].mean())
+                / np.sqrt(variance * (1 / len(ranks[i]) + 1 / len(ranks[j])))
+                for i, j in zip(*np.triu_indices(len(ranks), k=1))]
+    np.testing.assert_allclose(z, expected)
+    np.testing.assert_allclose(p, 2 * norm.sf(np.abs(expected)))
+
+
+def test_adjust_pvalues():
+    p = np.array([0.01, 0.04, 0.03, 0.005])
+
+    np.testing.assert_allclose(adjust_pvalues(p, "holm"), [0.03, 0.06, 0.06, 0.02])
+    np.testing.assert_allclose(adjust_pvalues(p, "bonferroni"), [0.04, 0.16, 0.12, 0.02])
+    np.testing.assert_allclose(adjust_pvalues(p, "fdr_bh"), false_discovery_control(p))
+    with pytest.raises(ValueError):
+        adjust_pvalues(p, "sidak")
+
+
+def test_posthoc_table_has_every_pair():
+    table = RankedGroups(VALUES, GENRES).posthoc(correction="holm", alpha=0.05)
+
+    assert list(table.columns) == nonparametric.POSTHOC_COLUMNS
+    assert len(table) == 2 * 10
+    assert (table["p_adjusted"] >= table["p_value"]).all()
+    assert (table["reject"] == (table["p_adjusted"] < 0.05)).all()
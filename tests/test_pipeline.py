@@ -0,0 +1,148 @@
+import sys
+import os
+import json
+import pandas as pd
+import pytest
+import yaml
+
+# Asegurar que pytest encuentre los módulos de src
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), "src"))
+
+import orchestrator
+from storage import find_table, read_table
+
+
+def _setup(tmp_path):
+    raw_dir = tmp_path / "raw"
+    processed_dir = tmp_path / "processed"
+    raw_dir.mkdir()
+    names = ["Halo", "Minecraft", "Dota 2", "Portal", "Celeste", "Hades"]
+    genres = ["Action", "Adventure", "Action", "Adventure", "Indie", "Indie"]
+    pd.DataFrame({
+        "name": names,
+        "genres": [f"[{{'id': '1', 'description': '{g}'}}]" for g in genres],
+        "price_overview": [f"{{'currency': 'USD', 'initial': {p}, 'final': {p}, "
+                           f"'discount_percent': 0}}" for p in [999, 1999, 0, 499, 1999, 2499]],
+        "is_free": ["False"] * 6,
+        "release_date": [f"{{'coming_soon': False, 'date': '1 Jan, {y}'}}"
+                         for y in range(2015, 2021)],
+        "detailed_description": ["texto largo"] * 6,
+    }).to_csv(raw_dir / "steam_app_data.csv", index=False)
+    pd.DataFrame({
+        "Game": names * 2,
+        "Month": [1] * 6 + [2] * 6,
+        "Year": [2020] * 12,
+        "Hours_watched": range(10, 130, 10),
+        "Avg_viewers": range(1, 13),
+    }).to_csv(raw_dir / "Twitch_game_data.csv", index=False)
+
+    config = tmp_path / "config.yaml"
+    config.write_text(yaml.safe_dump({
+        "paths": {"raw_data": str(raw_dir) + "/", "processed_data": str(processed_dir) + "/",
+                  "log_file": str(tmp_path / "pipeline_execution.log")},
+        "storage": {"raw_format": "parquet"},
+    }))
+    return str(config), processed_dir
+
+
+def test_pipeline_rerun_uses_cache(tmp_path, monkeypatch):
+    config, processed_dir = _setup(tmp_path)
+
+    orchestrator.run_pipeline(config)
+    assert (processed_dir / "analysis_results.csv").exists()
+
+    def fail(*args, **kwargs):
+        raise AssertionError("la etapa no debía ejecutarse")
+
+    for stage in ["ingest_data", "transform_data", "validate_report", "run_analysis"]:
+        monkeypatch.setattr(orchestrator, stage, fail)
+
+    orchestrator.run_pipeline(config)
+
+
+@pytest.mark.parametrize("mode", ["full", "streaming"])
+def test_pipeline_cached_ingestion_keeps_merged_columns(tmp_path, mode):
+    config, processed_dir = _setup(tmp_path)
+    cfg = yaml.safe_load(open(config))
+    cfg["ingestion"] = {"mode": mode}
+    cfg["columns"] = {"steam": ["name", "release_date"]}
+    with open(config, "w") as fh:
+        yaml.safe_dump(cfg, fh)
+
+    orchestrator.run_pipeline(config)
+    merged_base = str(processed_dir / "merged_data")
+    cold = read_table(merged_base)
+
+    # Sin merged_data la transformación se repite sobre las copias raw
+    os.remove(find_table(merged_base)[0])
+    orchestrator.run_pipeline(config)
+    warm = read_table(merged_base)
+
+    assert list(warm.columns) == list(cold.columns)
+    assert "release_date" in warm.columns
+    assert ("detailed_description" in warm.columns) == (mode == "full")
+
+
+def _update_config(config, section, value):
+    cfg = yaml.safe_load(open(config))
+    cfg[section] = value
+    with open(config, "w") as fh:
+        yaml.safe_dump(cfg, fh)
+
+
+def _count_calls(monkeypatch, stage):
+    calls = []
+    original = getattr(orchestrator, stage)
+    monkeypatch.setattr(orchestrator, stage,
+                        lambda *a, **k: calls.append(1) or original(*a, **k))
+    return calls
+
+
+def test_pipeline_config_change_invalidates_cache(tmp_path, monkeypatch):
+    config, _ = _setup(tmp_path)
+    orchestrator.run_pipeline(config)
+    ingestions = _count_calls(monkeypatch, "ingest_data")
+    transforms = _count_calls(monkeypatch, "transform_data")
+    analyses = _count_calls(monkeypatch, "run_analysis")
+
+    # Sólo cambia la configuración del análisis: el resto se reutiliza
+    _update_config(config, "analysis", {"use_spearman": True})
+    orchestrator.run_pipeline(config)
+    assert (len(ingestions), len(transforms), len(analyses)) == (0, 0, 1)
+
+    # Secciones ajenas al pipeline no invalidan nada
+    _update_config(config, "dashboard", {"title": "otro"})
+    orchestrator.run_pipeline(config)
+    assert (len(ingestions), len(transforms), len(analyses)) == (0, 0, 1)
+
+    # La transformación y las etapas siguientes dependen de `matching`
+    _update_config(config, "matching", {"fuzzy": False, "threshold": 0.8})
+    orchestrator.run_pipeline(config)
+    assert (len(ingestions), len(transforms), len(analyses)) == (0, 1, 2)
+
+
+def test_pipeline_writes_stage_metrics(tmp_path):
+    config, _ = _setup(tmp_path)
+
+    orchestrator.run_pipeline(config)
+    orchestrator.run_pipeline(config)
+
+    records = [json.loads(line) for line in open(tmp_path / "pipeline_execution.log")]
+    stages = [r for r in records if r["event"] == "stage"]
+    summaries = [r for r in records if r["event"] == "run_summary"]
+
+    assert len(summaries) == 2 and summaries[0]["status"] == "ok"
+    first_run = [r for r in stages if r["run_id"] == summaries[0]["run_id"]]
+    assert [r["stage"] for r in first_run] == \
+        ["cache_keys", "ingestion", "transformation", "validation", "analysis"]
+    ingestion = first_run[1]
+    assert ingestion["rows_out"] == 18 and ingestion["bytes_read"] > 0
+    assert ingestion["bytes_written"] > 0
+    assert first_run[2]["rows_out"] == 6
+    assert all(r["wall_s"] >= 0 and r["cpu_s"] >= 0 for r in stages)
+    second_run = [r for r in stages if r["run_id"] == summaries[1]["run_id"]]
+    assert [r["stage"] for r in second_run] == ["cache_keys", "validation"]
+    assert second_run[1]["cached"]
+    # Los CSV sólo se hashean la primera vez; el pico de RSS es del proceso
+    assert first_run[0]["bytes_read"] > 0 and second_run[0]["bytes_read"] == 0
+    assert all(r["rss_growth_mb"] is None or r["rss_growth_mb"] >= 0 for r in stages)
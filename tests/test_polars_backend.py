@@ -0,0 +1,78 @@
+import sys
+import os
+import pandas as pd
+import pytest
+import yaml
+
+# Asegurar que pytest encuentre los módulos de src
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), "src"))
+
+pytest.importorskip("polars")
+
+from data_ingestion import ingest_data, load_raw_data, steam_columns
+from data_transformation import transform_data
+from polars_backend import transform_polars
+
+
+def _write_sources(tmp_path):
+    steam = pd.DataFrame({
+        "name": ["Halo", "Minecraft", "Dota 2", "Halo", "Portal", None],
+        "genres": ["[{'id': '1', 'description': 'Action'}]",
+                   "[{'id': '4', 'description': \"Hack 'n' Slash\"}]",
+                   '[{"id": "23", "description": "Indie"}]',
+                   "[{'id': '2', 'description': 'Strategy'}]",
+                   None,
+                   "[{'id': '1', 'description': 'Action'}]"],
+        "price_overview": ["{'currency': 'USD', 'initial': 1999, 'final': 999, "
+                           "'discount_percent': 50}",
+                           "{'currency': 'EUR', 'initial': 2249, 'final': 2249}",
+                           None,
+                           "{'final': 1499, 'currency': 'USD'}",
+                           "{'final': 999}",
+                           "{'final': 999}"],
+        "is_free": [False, False, True, False, False, False],
+        "year": [2019, 2020, 2020, 2021, 2020, 2020],
+        "month": [1, 5, 3, 2, 1, 1],
+    })
+    twitch = pd.DataFrame({
+        "Game": ["Halo", "halo", "Dota 2", "Minecraft", "Celeste"],
+        "Year": [2020, 2020, 2020, 2021, 2020],
+        "Month": [1, 2, 1, 1, 1],
+        "Hours_watched": [10, 20, 300, 40, 5],
+        "Hours_streamed": [1, 2, 30, 4, 1],
+        "Peak_viewers": [5, 8, 90, 12, 2],
+        "Avg_viewers": [1.5, 2.5, 30.0, 4.0, 0.5],
+        "Streamers": [3, 4, 20, 6, 1],
+        "Avg_channels": [1.0, 2.0, 10.0, 3.0, 1.0],
+        "Avg_viewer_ratio": [1.1, 1.3, 3.0, 1.2, 0.9],
+    })
+    steam_file = tmp_path / "steam.csv"
+    twitch_file = tmp_path / "twitch.csv"
+    steam.to_csv(steam_file, index=False)
+    twitch.to_csv(twitch_file, index=False)
+    return str(steam_file), str(twitch_file)
+
+
+def test_polars_backend_matches_pandas(tmp_path):
+    steam_file, twitch_file = _write_sources(tmp_path)
+    raw_dir = str(tmp_path / "raw")
+    config = tmp_path / "config.yaml"
+    config.write_text(yaml.safe_dump({
+        "storage": {"raw_format": "parquet", "processed_format": "feather"},
+        "matching": {"fuzzy": False},
+    }))
+
+    assert ingest_data(steam_file, twitch_file, config_path=str(config),
+                       output_dir=raw_dir, load=False) == (None, None)
+    steam, twitch = load_raw_data(str(config), steam_cols=sorted(steam_columns({})),
+                                  raw_dir=raw_dir)
+    expected = transform_data(steam, twitch, config_path=str(config),
+                              output_dir=str(tmp_path / "pandas"))
+    result = transform_polars(raw_dir, config_path=str(config),
+                              output_dir=str(tmp_path / "polars"))
+
+    assert len(expected) == 3
+    pd.testing.assert_frame_equal(result.reset_index(drop=True),
+                                  expected.reset_index(drop=True),
+                                  check_like=True, rtol=1e-12)
+    assert result.attrs["join_stats"] == expected.attrs["join_stats"]
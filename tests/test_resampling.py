@@ -0,0 +1,70 @@
+import sys
+import os
+import numpy as np
+import pytest
+from scipy.stats import kruskal, spearmanr
+
+# Asegurar que pytest encuentre los módulos de src
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), "src"))
+
+import resampling
+from resampling import (bootstrap_indices, kruskal_resampling, rank_ties, resample,
+                        spearman_resampling)
+
+
+RNG = np.random.default_rng(7)
+# Valores redondeados para que haya empates
+X = np.round(RNG.gamma(1.0, 10.0, 80))
+Y = X + np.round(RNG.normal(0.0, 5.0, 80))
+GROUPS = [np.round(RNG.gamma(2.0, scale, n)) for scale, n in [(3.0, 20), (4.0, 35), (3.0, 25)]]
+
+
+def test_spearman_bootstrap_matches_scipy_on_same_resamples():
+    rx, x_ties = rank_ties(X)
+    ry, y_ties = rank_ties(Y)
+    data = {"rx": rx, "ry": ry, "x_ties": x_ties, "y_ties": y_ties}
+
+    values = resampling.STATISTICS["spearman_bootstrap"](data, np.random.default_rng(3), 40)
+
+    idx = bootstrap_indices(np.random.default_rng(3), [len(X)], 40)
+    np.testing.assert_allclose(values, [spearmanr(X[i], Y[i])[0] for i in idx])
+
+
+def test_kruskal_bootstrap_matches_scipy_on_same_resamples():
+    sizes = np.array([len(g) for g in GROUPS])
+    ranks, ties = rank_ties(np.concatenate(GROUPS))
+    data = {"ranks": ranks, "ties": ties, "sizes": sizes, "starts": np.array([0, 20, 55])}
+
+    values = resampling.STATISTICS["kruskal_bootstrap"](data, np.random.default_rng(3), 40)
+
+    values_all = np.concatenate(GROUPS)
+    idx = bootstrap_indices(np.random.default_rng(3), sizes, 40)
+    expected = [kruskal(*np.split(values_all[i], [20, 55]))[0] for i in idx]
+    np.testing.assert_allclose(values, expected)
+
+
+def test_resampling_is_deterministic_across_workers(monkeypatch):
+    # Lotes pequeños para que haya varios y se repartan entre procesos
+    monkeypatch.setattr(resampling, "BATCH_CELLS", 2_000)
+    monkeypatch.setattr(resampling, "MIN_PARALLEL_CELLS", 0)
+    rx, x_ties = rank_ties(X)
+    ry, y_ties = rank_ties(Y)
+    data = {"rx": rx, "ry": ry, "x_ties": x_ties, "y_ties": y_ties}
+
+    serial = resample("spearman_bootstrap", data, 200, seed=1, workers=1)
+    parallel = resample("spearman_bootstrap", data, 200, seed=1, workers=2)
+
+    np.testing.assert_array_equal(serial, parallel)
+
+
+def test_intervals_and_permutation_p_values():
+    spearman = spearman_resampling(X, Y, n_resamples=500)
+    independent = spearman_resampling(X, RNG.permutation(Y), n_resamples=500)
+    groups = kruskal_resampling(GROUPS, n_resamples=500)
+
+    assert spearman["ci_low"] <= spearmanr(X, Y)[0] <= spearman["ci_high"]
+    assert spearman["perm_p"] == pytest.approx(1 / 501)
+    assert independent["perm_p"] > 0.05
+    assert groups["ci_low"] <= kruskal(*GROUPS)[0] <= groups["ci_high"]
+    assert 0 < groups["perm_p"] <= 1
+    assert kruskal_resampling(GROUPS[:1])["perm_p"] is None
@@ -0,0 +1,123 @@
+import sys
+import os
+import numpy as np
+import pandas as pd
+import pytest
+
+# Asegurar que pytest encuentre los módulos de src
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), "src"))
+
+from data_ingestion import ingest_data
+from labels import ALL_GENRES
+from sketches import CatalogueSketch, HyperLogLog, KLLSketch, Moments, sketch_steam
+
+
+RNG = np.random.default_rng(11)
+
+
+def _steam(n=400, seed=0):
+    rng = np.random.default_rng(seed)
+    genres = rng.choice(["Action", "Indie", "RPG"], n)
+    cents = rng.choice([0, 499, 999, 1999], n)
+    return pd.DataFrame({
+        "name": [f"Juego {i % 350}" for i in range(n)],
+        "genres": [f"[{{'id': '1', 'description': '{g}'}}]" for g in genres],
+        "price_overview": [None if c == 0 else
+                           f"{{'currency': 'USD', 'initial': {c}, 'final': {c}}}"
+                           for c in cents],
+        "is_free": np.where(cents == 0, "True", "False"),
+        "release_date": [f"{{'coming_soon': False, 'date': '1 Jan, {y}'}}"
+                         for y in rng.integers(2010, 2015, n)],
+    })
+
+
+def test_moments_match_numpy_across_chunks_and_merge():
+    values = RNG.lognormal(2.0, 1.0, 5_000)
+    first, second = Moments(), Moments()
+    for chunk in np.array_split(values[:3_000], 7):
+        first.update(chunk)
+    second.update(values[3_000:])
+    first.merge(second)
+
+    assert first.count == len(values)
+    assert first.mean == pytest.approx(values.mean())
+    assert first.std == pytest.approx(values.std(ddof=1))
+    assert (first.min, first.max) == (values.min(), values.max())
+
+
+def test_kll_quantiles_have_small_rank_error():
+    values = RNG.lognormal(2.0, 1.0, 200_000)
+    sketch, other = KLLSketch(200, seed=1), KLLSketch(200, seed=2)
+    for chunk in np.array_split(values[:150_000], 15):
+        sketch.update(chunk)
+    other.update(values[150_000:])
+    sketch.merge(other)
+
+    qs = np.array([0.05, 0.25, 0.5, 0.75, 0.95])
+    ranks = np.searchsorted(np.sort(values), sketch.quantiles(qs)) / len(values)
+    assert np.abs(ranks - qs).max() < 0.02
+    # Memoria acotada: unos pocos k elementos, no las filas
+    assert sum(len(level) for level in sketch.levels) < 1_000
+
+
+def test_hyperloglog_estimate_and_merge():
+    names = pd.Series([f"juego {i}" for i in RNG.integers(0, 50_000, 120_000)])
+    left, right = HyperLogLog(12), HyperLogLog(12)
+    left.update(names[:60_000])
+    right.update(names[60_000:])
+    left.merge(right)
+
+    assert left.estimate() == pytest.approx(names.nunique(), rel=0.05)
+    small = HyperLogLog(12)
+    small.update(pd.Series(["a", "b", "a", None]))
+    assert small.estimate() == 2
+    with pytest.raises(ValueError):
+        HyperLogLog(4)
+
+
+def test_catalogue_sketch_counts_match_exact_computation():
+    steam = _steam()
+    sketch = CatalogueSketch()
+    for start in range(0, len(steam), 150):
+        sketch.update(steam.iloc[start:start + 150])
+
+    summary = sketch.summary().set_index("genre")
+    prices = steam["price_overview"].str.extract(r"'final': (\d+)")[0].astype(float) / 100
+    genre = steam["genres"].str.extract(r"'description': '(\w+)'")[0] \
+        .map({"Action": "Acción", "Indie": "Indie", "RPG": "RPG"})
+
+    total = summary.loc[ALL_GENRES]
+    assert total["games"] == len(steam)
+    assert total["free"] == prices.isna().sum()
+    assert total["paid"] == prices.notna().sum()
+    assert total["distinct_names"] == pytest.approx(350, rel=0.05)
+    assert total["price_mean"] == pytest.approx(prices.mean())
+    assert total["price_p50"] == prices.median()
+    for name, group in genre.groupby(genre):
+        assert summary.loc[name, "games"] == len(group)
+        assert summary.loc[name, "price_max"] == prices[group.index].max()
+
+    years = sketch.years()
+    year = steam["release_date"].str.extract(r"(\d{4})")[0].astype(int)
+    assert years.loc[years["genre"] == ALL_GENRES].set_index("release_year")["games"] \
+        .to_dict() == year.value_counts().sort_index().to_dict()
+    assert set(years["genre"]) == {ALL_GENRES, "Acción", "Indie", "RPG"}
+
+
+def test_ingest_streaming_feeds_catalogue_sketch(tmp_path):
+    steam_file = tmp_path / "steam.csv"
+    twitch_file = tmp_path / "twitch.csv"
+    _steam().to_csv(steam_file, index=False)
+    pd.DataFrame({"Game": ["Juego 1"], "Hours_watched": [10]}).to_csv(twitch_file, index=False)
+
+    sketch = CatalogueSketch()
+    ingest_data(str(steam_file), str(twitch_file), config_path="no_existe.yaml",
+                output_dir=str(tmp_path / "raw"), mode="streaming", chunksize=100,
+                sketch=sketch, load=False)
+    paths = sketch.write(str(tmp_path / "processed"))
+
+    direct = sketch_steam(str(steam_file), chunksize=400)
+    pd.testing.assert_frame_equal(sketch.summary(), direct.summary())
+    assert [os.path.basename(p) for p in paths] == ["catalogue_summary.csv",
+                                                     "catalogue_years.csv"]
+    assert len(pd.read_csv(paths[0])) == 4
@@ -0,0 +1,200 @@
+import sys
+import os
+import pandas as pd
+import yaml
+
+# Asegurar que pytest encuentre los módulos de src
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), "src"))
+
+from data_transformation import (GENRE_NORMALIZER, extract_genre, extract_genre_column,
+                                 latest_per_key, normalize_genre, parse_price_overview,
+                                 transform_data)
+from join_keys import KeyIndex, normalize_titles
+from storage import read_schema, read_table
+
+
+GENRES = pd.Series([
+    "[{'id': '1', 'description': 'Action'}, {'id': '37', 'description': 'Free to Play'}]",
+    "[{'id': '4', 'description': \"Hack 'n' Slash\"}]",
+    '[{"id": "23", "description": "Indie"}]',
+    "sin formato",
+    None,
+])
+
+
+def test_extract_genre_handles_quoting():
+    assert [extract_genre(g) for g in GENRES] == \
+        ["Action", "Hack 'n' Slash", "Indie", None, None]
+
+
+def test_extract_genre_column_matches_scalar():
+    result = extract_genre_column(GENRES)
+
+    expected = [extract_genre(g) for g in GENRES]
+    assert [None if pd.isna(v) else v for v in result] == expected
+
+
+def test_normalize_genre_keeps_map_priority():
+    # "action" va antes que "adventure" en el mapa aunque aparezca después
+    assert normalize_genre("Adventure, Action") == "Acción"
+    assert normalize_genre("Massively Multiplayer") == "MMO"
+    assert normalize_genre("  Animación ") == "Animacion"
+    assert normalize_genre(None) == "Desconocido"
+
+
+def test_normalize_column_matches_scalar():
+    genres = pd.Series(["Action", None, "Indie", "Action", "Racing"], index=[5, 6, 7, 8, 9])
+
+    result = GENRE_NORMALIZER.normalize_column(genres)
+
+    assert result.index.tolist() == genres.index.tolist()
+    assert result.tolist() == [normalize_genre(g) for g in genres]
+
+
+def test_parse_price_overview_typed_columns():
+    values = pd.Series([
+        "{'currency': 'EUR', 'initial': 1999, 'final': 999, 'discount_percent': 50, "
+        "'initial_formatted': '19,99€', 'final_formatted': '9,99€'}",
+        "{'final': 499, 'currency': 'USD'}",
+        None,
+    ])
+
+    prices = parse_price_overview(values)
+
+    assert prices.loc[0].tolist() == [9.99, 19.99, 50.0, "EUR"]
+    assert prices.loc[1, "price_final"] == 4.99
+    assert prices.loc[1, "currency"] == "USD"
+    assert prices.loc[2].isna().all()
+    assert str(prices["currency"].dtype) == "category"
+
+
+def test_transform_writes_typed_artifact(tmp_path):
+    config = tmp_path / "config.yaml"
+    config.write_text(yaml.safe_dump({"storage": {"processed_format": "feather"}}))
+    steam = pd.DataFrame({
+        "name": ["Halo", "Portal"],
+        "genres": GENRES[:2].tolist(),
+        "price_overview": ["{'currency': 'USD', 'initial': 999, 'final': 999}"] * 2,
+    })
+    twitch = pd.DataFrame({
+        "Game": ["halo", "portal", "halo"],
+        "Hours_watched": [10, 20, 30],
+        "Avg_viewers": [1.5, 2.0, 2.5],
+    })
+
+    merged = transform_data(steam, twitch, config_path=str(config),
+                            output_dir=str(tmp_path))
+    loaded = read_table(str(tmp_path / "merged_data"))
+
+    assert (tmp_path / "merged_data.feather").exists()
+    assert read_schema(str(tmp_path / "merged_data"))["rows"] == 2
+    assert str(loaded["genre"].dtype) == "category"
+    assert str(loaded["hours_watched"].dtype) == "int8"
+    assert loaded["price"].tolist() == merged["price"].tolist()
+
+
+def test_csv_artifact_restores_types(tmp_path):
+    config = tmp_path / "config.yaml"
+    config.write_text(yaml.safe_dump({"storage": {"processed_format": "csv"}}))
+    steam = pd.DataFrame({"name": ["Halo"], "genres": GENRES[:1].tolist(),
+                          "price_overview": ["{'final': 999}"]})
+    twitch = pd.DataFrame({"Game": ["halo"], "Hours_watched": [10], "Avg_viewers": [1.0]})
+
+    transform_data(steam, twitch, config_path=str(config), output_dir=str(tmp_path))
+    loaded = read_table(str(tmp_path / "merged_data"), columns=["genre", "hours_watched"])
+
+    assert list(loaded.columns) == ["genre", "hours_watched"]
+    assert str(loaded["genre"].dtype) == "category"
+    assert str(loaded["hours_watched"].dtype) == "int8"
+
+
+def test_normalize_titles_unifies_variants():
+    titles = pd.Series(["Assassin's Creed®: Origins", "ASSASSINS CREED ORIGINS",
+                        "Pokémon™ Sword & Shield", None, "™"])
+
+    assert normalize_titles(titles).tolist() == [
+        "assassins creed origins", "assassins creed origins",
+        "pokemon sword and shield", None, None]
+
+
+def test_key_index_join_reports_stats():
+    index = KeyIndex(pd.Series(["halo", "portal", "halo", "celeste"]))
+    right = pd.DataFrame({"hours_watched": [40, 20, 5]})  # una fila por clave
+    left = pd.DataFrame({"title_key": ["portal", "dota 2", "halo"], "price": [1, 2, 3]})
+
+    joined, stats = index.join(left, "title_key", right)
+
+    assert joined["title_key"].tolist() == ["portal", "halo"]
+    assert joined["hours_watched"].tolist() == [20, 40]
+    assert stats["matched"] == 2
+    assert stats["unmatched_left"] == 1
+    assert stats["unmatched_right"] == 1
+
+
+def test_transform_joins_on_normalized_titles(tmp_path):
+    steam = pd.DataFrame({
+        "name": ["Halo™", "Assassin's Creed: Origins", "Portal"],
+        "genres": GENRES[:3].tolist(),
+        "price_overview": ["{'final': 999}"] * 3,
+    })
+    twitch = pd.DataFrame({"Game": ["halo", "Assassins Creed Origins", "Celeste"],
+                           "Hours_watched": [10, 20, 30], "Avg_viewers": [1.0, 2.0, 3.0]})
+
+    merged = transform_data(steam, twitch, config_path="no_existe.yaml",
+                            output_dir=str(tmp_path))
+
+    assert sorted(merged["hours_watched"].tolist()) == [10, 20]
+    assert "title_key" not in merged.columns
+    assert merged.attrs["join_stats"]["unmatched_left"] == 1
+
+
+def test_latest_per_key_matches_sort_and_drop_duplicates():
+    df = pd.DataFrame({
+        "game": ["halo", "portal", "halo", "halo", None, "portal", None],
+        "year": [2020, 2019, 2021, 2021, 2018, None, 2019],
+        "month": [5, 1, 2, 7, 1, 12, 3],
+    })
+
+    latest = df[latest_per_key(df, "game")]
+    expected = df.sort_values(["year", "month"], ascending=False, kind="stable") \
+        .drop_duplicates(subset=["game"])
+
+    assert sorted(latest.index) == sorted(expected.index)
+    assert latest_per_key(df.drop(columns="year"), "game").tolist() == \
+        [True, True, False, False, True, False, False]
+
+
+def test_latest_per_key_by_chunks_matches_full():
+    df = pd.DataFrame({"game": list("abcabcab"), "year": [1, 2, 3, 3, 1, 2, 5, 0],
+                       "month": [1] * 8})
+
+    survivors = df.iloc[:0]
+    for start in range(0, len(df), 3):
+        block = pd.concat([survivors, df.iloc[start:start + 3]])
+        survivors = block[latest_per_key(block, "game")]
+
+    assert sorted(survivors.index) == sorted(df.index[latest_per_key(df, "game")])
+
+
+def test_transform_does_not_modify_inputs(tmp_path):
+    steam = pd.DataFrame({
+        "name": ["Halo", "Halo", None, "Portal"],
+        "genres": GENRES[:4].tolist(),
+        "price_overview": ["{'final': 999}", "{'final': 499}", None, None],
+        "is_free": [False, False, False, True],
+        "year": [2019, 2020, 2020, 2020],
+        "month": [1, 1, 1, 1],
+    })
+    twitch = pd.DataFrame({"Game": ["Halo", "Portal"], "Hours_watched": ["10", "20"],
+                           "Avg_viewers": [1.0, 2.0]})
+    steam_before, twitch_before = steam.copy(), twitch.copy()
+
+    merged = transform_data(steam, twitch, config_path="no_existe.yaml",
+                            output_dir=str(tmp_path))
+
+    pd.testing.assert_frame_equal(steam, steam_before)
+    pd.testing.assert_frame_equal(twitch, twitch_before)
+    result = merged.set_index("name")
+    assert result.loc["Halo", "price"] == 4.99  # registro más reciente
+    assert result.loc["Portal", "price"] == 0  # gratuito sin precio
+    assert result["hours_watched"].tolist() == [10, 20]
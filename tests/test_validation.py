@@ -5,7 +5,9 @@ import pandas as pd
 # Asegurar que pytest encuentre el módulo
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
-from src.data_validation import validate_data
+import pytest
+from src.data_validation import (ChunkValidator, ValidationError, validate_data,
+                                 validate_report)
 
 
 
@@ -40,3 +42,94 @@ def test_validate_data_empty_values():
 
     errors = validate_data(df)
     assert "Valores vacíos encontrados" in errors[0]
+
+
+def test_validate_report_counts_and_samples():
+    df = pd.DataFrame({
+        "name": ["Halo", "Halo", "Portal", "Celeste"],
+        "genres": ["Action", "Action", None, "Indie"],
+        "price": [30, -1, 20, -5],
+        "hours_watched": [1.0, None, 3.0, None],
+    }, index=[10, 11, 12, 13])
+    rules = [
+        {"check_required": {"columns": ["name", "genres", "price"]}},
+        {"check_not_null": {"columns": ["genres", "hours_watched"]}},
+        {"check_unique": {"columns": ["name"]}},
+        {"check_positive": {"columns": ["price", "hours_watched"]}},
+        {"ensure_merge_not_empty": True},
+    ]
+
+    report = {(r["rule"], r["column"]): r for r in validate_report(df, rules)}
+
+    assert report[("check_not_null", "hours_watched")]["failed"] == 2
+    assert report[("check_not_null", "hours_watched")]["sample"] == [11, 13]
+    assert report[("check_unique", "name")]["sample"] == [11]
+    assert report[("check_positive", "price")]["failed"] == 2
+    assert report[("check_positive", "hours_watched")]["failed"] == 0
+    assert report[("ensure_merge_not_empty", None)]["failed"] == 0
+
+
+def test_validate_data_with_config_rules():
+    df = pd.DataFrame({"name": [], "genres": [], "price": []})
+
+    errors = validate_data(df, rules=[{"ensure_merge_not_empty": True},
+                                      {"check_not_null": {"columns": ["avg_viewers"]}}])
+
+    assert "El dataset combinado está vacío." in errors
+    assert "Falta la columna requerida: avg_viewers" in errors
+
+
+def test_chunk_validator_counts_across_chunks():
+    validator = ChunkValidator(not_null={"name": 0.5}, non_negative={"price": 0.5},
+                               unique={"name": 0.5}, min_rows=1)
+    validator.update(pd.DataFrame({"name": ["Halo", "Portal", None], "price": [1, -1, 2]}))
+    validator.update(pd.DataFrame({"name": ["Halo", "Hades"], "price": [3, 4]}, index=[3, 4]))
+
+    results = {(r["rule"], r["column"]): r for r in validator.finish()}
+    assert results[("check_not_null", "name")]["failed"] == 1
+    assert results[("check_positive", "price")]["sample"] == [1]
+    # El duplicado de otro bloque también se detecta
+    assert results[("check_unique", "name")]["failed"] == 1
+    assert results[("check_unique", "name")]["sample"] == [3]
+
+
+def test_chunk_validator_fails_fast():
+    validator = ChunkValidator("ingestion", not_null={"name": 0.1}, min_rows=4)
+    bad = pd.DataFrame({"name": [None, None]})
+
+    validator.update(bad)  # aún no hay filas suficientes
+    with pytest.raises(ValidationError) as info:
+        validator.update(bad)
+    assert info.value.results[0]["failed"] == 4
+    assert "ingestion" in str(info.value)
+
+
+def test_chunk_validator_from_config():
+    cfg = {"streaming_validation": {"enabled": True,
+                                    "transformation": {"non_negative": {"price": 0}}}}
+
+    assert ChunkValidator.from_config(cfg, "ingestion") is None
+    assert ChunkValidator.from_config({}, "transformation") is None
+    validator = ChunkValidator.from_config(cfg, "transformation")
+    with pytest.raises(ValidationError):
+        validator.update(pd.DataFrame({"price": [-1.0]})).finish()
+
+
+def test_not_null_and_positive_share_one_conversion():
+    df = pd.DataFrame({
+        "name": ["a", "b", "c", "d"],
+        "genres": ["x"] * 4,
+        "price": pd.array([1.0, None, -2.0, 3.0], dtype="Float64"),
+        "label": ["1", None, "-5", "n/d"],
+    })
+    rules = [{"check_not_null": {"columns": ["price", "label"]}},
+             {"check_positive": {"columns": ["price", "label"]}}]
+
+    failed = {(r["rule"], r["column"]): (r["failed"], r["sample"])
+              for r in validate_report(df, rules)}
+
+    assert failed[("check_not_null", "price")] == (1, [1])
+    assert failed[("check_positive", "price")] == (1, [2])
+    # "n/d" no es nulo ni negativo
+    assert failed[("check_not_null", "label")] == (1, [1])
+    assert failed[("check_positive", "label")] == (1, [2])